@@ -0,0 +1,64 @@
+"""
+LLM 클라이언트 커넥션 풀 검증
+
+로컬 Stub 서버에 call_llm을 N번 호출하고, 서버가 받은 TCP 커넥션 수를 비교한다.
+- pooled : 프로세스 전역 클라이언트 재사용 (src.backends.OpenAIBackend)
+- fresh  : 호출마다 OpenAI() 새로 생성 (기존 방식)
+
+사용 예:
+    python -m scripts.bench_client_pool --calls 50 --threads 4
+"""
+import os
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from scripts.stub_llm_server import StubLLMServer
+
+
+def _fresh_call(system_prompt: str, user_prompt: str) -> str:
+    from openai import OpenAI
+    client = OpenAI()
+    try:
+        resp = client.chat.completions.create(
+            model="stub",
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+        )
+        return resp.choices[0].message.content
+    finally:
+        client.close()
+
+
+def run(mode: str, calls: int, threads: int) -> dict:
+    server = StubLLMServer().start()
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+
+    from src.utils import call_llm, close_llm_client
+    close_llm_client()  # 이전 모드에서 만든 풀 초기화
+
+    fn = (lambda i: call_llm("sys", f"q{i}")) if mode == "pooled" else (lambda i: _fresh_call("sys", f"q{i}"))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as ex:
+        list(ex.map(fn, range(calls)))
+    elapsed = time.perf_counter() - start
+
+    close_llm_client()
+    server.stop()
+    return {"mode": mode, "elapsed": elapsed, **server.stats}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    for mode in ("fresh", "pooled"):
+        r = run(mode, args.calls, args.threads)
+        print(f"{r['mode']:8s}: requests={r['requests']:4d}  connections={r['connections']:4d}  "
+              f"time={r['elapsed']:.3f}s")
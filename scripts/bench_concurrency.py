@@ -0,0 +1,58 @@
+"""
+동시 실행 배치 러너 벤치마크 (네트워크 없음)
+
+LLM 백엔드를 지연 분포가 있는 MockBackend로 교체하고 (캐시 / 스케줄러 / 사용량 기록 경로는 그대로),
+run_samples를 worker 수별로 실행해 처리 시간과 결과 순서를 확인한다.
+
+사용 예:
+    python -m scripts.bench_concurrency --samples 32 --latency 0.05 --workers 1 4 16
+    python -m scripts.bench_concurrency --samples 256 --workers 256 --async
+    python -m scripts.bench_concurrency --latency lognormal:0.5,0.4 --workers 16 64
+"""
+import time
+import asyncio
+import argparse
+
+from src.backends import MockBackend, set_backend
+from scripts.run_batch import run_samples, arun_samples
+
+
+def make_dataset(n: int):
+    context = [(f"Doc {d}", [f"Sentence {s} of doc {d}." for s in range(4)]) for d in range(10)]
+    return [
+        {"question": f"When was the director of film {i} born?", "answer": "1970",
+         "context": context, "type": "bridge", "level": "easy"}
+        for i in range(n)
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--samples", type=int, default=32)
+    parser.add_argument("--latency", default="0.05", help="지연 분포 (src.backends.parse_latency 형식)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="arun_samples (이벤트 루프 하나) 로 실행")
+    args = parser.parse_args()
+
+    set_backend(MockBackend(latency=args.latency))
+    dataset = make_dataset(args.samples)
+    idxs = list(range(args.samples))
+
+    report = []
+    for workers in args.workers:
+        order = []
+        on_result = lambda k, info: order.append(info["index"])
+        start = time.perf_counter()
+        if args.use_async:
+            asyncio.run(arun_samples(dataset, idxs, on_result, concurrency=workers))
+        else:
+            run_samples(dataset, idxs, on_result, num_workers=workers)
+        elapsed = time.perf_counter() - start
+        assert order == idxs, "results out of order"
+        report.append((workers, elapsed))
+
+    mode = "async" if args.use_async else "threads"
+    print(f"\n{'='*50}")
+    for workers, elapsed in report:
+        print(f"{mode} workers={workers:3d}: {elapsed:.2f}s ({args.samples / elapsed:.1f} q/s)")
@@ -0,0 +1,160 @@
+"""
+Open-domain 코퍼스 인덱스 (src.corpus_index) 쿼리 지연 벤치마크
+
+- --index: 이미 만든 인덱스 (scripts/build_corpus_index.py), 쿼리는 --dataset 질문들
+- --synthetic N: 문단 N개짜리 합성 코퍼스를 만들어 측정 (Zipf 분포 어휘, 문단 = 제목 + 4문장)
+  쿼리는 임의 문단의 제목 + 본문 단어 몇 개 → 원래 문단이 top-k에 드는 비율도 함께 출력
+  --synthetic-dim을 주면 임의 정규화 벡터를 붙여 hybrid 경로(벡터 내적 + fusion) 지연도 측정 (품질 의미 없음)
+  --ivf-lists를 주면 벡터에 IVF를 만들어 CORPUS_IVF_PROBE개 클러스터만 검색 (없으면 flat)
+
+지표: 빌드 시간 / 디스크 크기, 인덱스 열기 시간, 쿼리 지연 mean / p50 / p95 / p99, 최대 RSS
+
+사용 예:
+    python -m scripts.bench_corpus_index --synthetic 2000000 --out index/synthetic_2m
+    python -m scripts.bench_corpus_index --synthetic 2000000 --out index/synthetic_2m --synthetic-dim 384 --queries 200
+    python -m scripts.bench_corpus_index --synthetic 2000000 --out index/synthetic_2m --synthetic-dim 384 --ivf-lists 1024
+    python -m scripts.bench_corpus_index --index index/wiki --dataset data/hotpot_dev_distractor_v1.json
+"""
+import json
+import time
+import random
+import resource
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+from src.metrics import percentiles
+from src.corpus_index import CorpusIndex, build_corpus_index, build_ivf
+
+
+def synthetic_paragraphs(n: int, vocab_size: int, seed: int = 0):
+    """Zipf 분포 단어로 만든 (title, sentences) n개 (제목 끝 번호로 유일)"""
+    rng = np.random.default_rng(seed)
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    vocab = ["".join(rng.choice(letters, size=rng.integers(4, 10))) for _ in range(vocab_size)]
+    chunk = 10_000
+    for start in range(0, n, chunk):
+        m = min(chunk, n - start)
+        words = np.minimum(rng.zipf(1.2, size=(m, 50)), vocab_size) - 1
+        for i in range(m):
+            w = [vocab[j] for j in words[i]]
+            title = f"{w[0].title()} {w[1].title()} {start + i}"
+            sentences = [" ".join(w[2 + s * 12: 14 + s * 12]) + "." for s in range(4)]
+            yield title, sentences
+
+
+def attach_random_vectors(index_dir: Path, dim: int, seed: int = 0) -> None:
+    """shard마다 임의 정규화 벡터 (hybrid 경로 지연 측정용)"""
+    rng = np.random.default_rng(seed)
+    meta = json.loads((index_dir / "index.json").read_text())
+    for name in meta["shards"]:
+        for stale in ("ivf_centroids.npy", "ivf_offsets.npy", "ivf_ids.npy"):
+            (index_dir / name / stale).unlink(missing_ok=True)
+        n = json.loads((index_dir / name / "meta.json").read_text())["docs"]
+        with open(index_dir / name / "vectors.f32", "wb") as f:
+            for start in range(0, n, 100_000):
+                block = rng.standard_normal((min(100_000, n - start), dim)).astype(np.float32)
+                f.write((block / np.linalg.norm(block, axis=1, keepdims=True)).tobytes())
+    meta.update(model="synthetic-random", dim=dim)
+    meta.pop("ivf_lists", None)
+    (index_dir / "index.json").write_text(json.dumps(meta, indent=2))
+
+
+def synthetic_queries(index: CorpusIndex, n: int, seed: int = 0):
+    """(쿼리, 원래 문단 번호): 제목 + 본문에서 임의 단어 4개"""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(n):
+        gid = rng.randrange(len(index))
+        title, sentences = index.doc(gid)
+        words = " ".join(sentences).rstrip(".").split()
+        queries.append((f"{title.rsplit(' ', 1)[0]} " + " ".join(rng.sample(words, 4)), gid))
+    return queries
+
+
+def dataset_queries(path: Path, n: int):
+    from src.dataset import open_hotpot_qa
+    data = open_hotpot_qa(path)
+    return [(data[i]["question"], None) for i in range(min(n, len(data)))]
+
+
+def max_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(index: CorpusIndex, queries, k: int, hybrid: bool, dim: int):
+    rng = np.random.default_rng(1)
+    latencies, found = [], 0
+    for query, gid in queries:
+        qv = None
+        if hybrid and dim:
+            qv = rng.standard_normal(dim).astype(np.float32)
+            qv /= np.linalg.norm(qv)
+        start = time.perf_counter()
+        hits = index.search(query, k=k, hybrid=hybrid, query_vector=qv)
+        latencies.append(time.perf_counter() - start)
+        found += gid is not None and gid in {h["id"] for h in hits}
+    return latencies, found
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--index", type=Path, help="기존 인덱스 디렉터리")
+    parser.add_argument("--dataset", type=Path, default=Path("data/hotpot_dev_distractor_v1.json"))
+    parser.add_argument("--synthetic", type=int, default=0, help="합성 코퍼스 문단 수")
+    parser.add_argument("--synthetic-dim", type=int, default=0, help="합성 인덱스에 붙일 임의 벡터 차원 (0이면 BM25만)")
+    parser.add_argument("--vocab", type=int, default=500_000, help="합성 코퍼스 어휘 수")
+    parser.add_argument("--ivf-lists", type=int, default=0, help="shard별 IVF 클러스터 수 (0이면 flat 벡터 검색)")
+    parser.add_argument("--shard-size", type=int, default=500_000)
+    parser.add_argument("--out", type=Path, default=Path("index/synthetic"))
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        index_dir = args.out
+        meta_path = index_dir / "index.json"
+        if meta_path.exists() and json.loads(meta_path.read_text())["docs"] == args.synthetic:
+            print(f"[BENCH] Reusing {index_dir}")
+        else:
+            start = time.perf_counter()
+            build_corpus_index(synthetic_paragraphs(args.synthetic, args.vocab), index_dir, shard_size=args.shard_size)
+            print(f"[BENCH] Built {args.synthetic} paragraphs in {time.perf_counter() - start:.1f}s")
+        meta = json.loads(meta_path.read_text())
+        if args.synthetic_dim and meta.get("dim") != args.synthetic_dim:
+            attach_random_vectors(index_dir, args.synthetic_dim)
+            meta = json.loads(meta_path.read_text())
+        if args.synthetic_dim and args.ivf_lists and meta.get("ivf_lists") != args.ivf_lists:
+            if meta.get("ivf_lists"):
+                attach_random_vectors(index_dir, args.synthetic_dim)  # IVF 재배치 전 순서로 다시
+            start = time.perf_counter()
+            build_ivf(index_dir, args.ivf_lists)
+            print(f"[BENCH] Built IVF ({args.ivf_lists} lists/shard) in {time.perf_counter() - start:.1f}s")
+    elif args.index:
+        index_dir = args.index
+    else:
+        parser.error("--index or --synthetic is required")
+
+    start = time.perf_counter()
+    index = CorpusIndex(index_dir)
+    open_time = time.perf_counter() - start
+    size = sum(f.stat().st_size for f in index_dir.rglob("*") if f.is_file())
+    queries = synthetic_queries(index, args.queries) if args.synthetic else dataset_queries(args.dataset, args.queries)
+
+    print(f"\n{'='*78}")
+    print(f"{len(index)} paragraphs, {len(index.shards)} shards, {size / 1e9:.2f} GB on disk, "
+          f"open={open_time * 1000:.1f} ms, vectors={index.model or 'none'}, "
+          f"ivf={index.meta.get('ivf_lists') or 'flat'}")
+    print(f"{len(queries)} queries, k={args.k}")
+    print(f"{'='*78}")
+    print(f"{'mode':7s} {'mean ms':>8s} {'p50':>8s} {'p95':>8s} {'p99':>8s}  found@k")
+    modes = [("bm25", False)] + ([("hybrid", True)] if index.has_vectors else [])
+    for name, hybrid in modes:
+        run(index, queries[:20], args.k, hybrid, index.meta.get("dim") or 0)  # page cache 예열
+        latencies, found = run(index, queries, args.k, hybrid, index.meta.get("dim") or 0)
+        p = percentiles(latencies)
+        hit = f"{found / len(queries):.1%}" if args.synthetic else "-"
+        print(f"{name:7s} {sum(latencies) / len(latencies) * 1000:8.2f} {p['p50'] * 1000:8.2f} "
+              f"{p['p95'] * 1000:8.2f} {p['p99'] * 1000:8.2f}  {hit}")
+    print(f"\nmax RSS: {max_rss_mb():.0f} MB")
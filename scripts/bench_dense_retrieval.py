@@ -0,0 +1,105 @@
+"""
+Dense 검색 (SEARCHER_MODE=dense) 벤치마크: 순위 품질 + 인코더 비용 (LLM 호출 없음)
+
+1) 품질: HotpotQA 질문마다 10개 문단을 BM25 / dense로 순위화해 supporting-fact 문단 recall@k 비교
+   (계획이 없으므로 질문 자체를 쿼리로 사용)
+2) 비용: 같은 질문들을 --workers 스레드로 동시에 순위화
+   - unbatched : 질문마다 따로 인코더 호출, 캐시 없음
+   - batched   : 질문 간 micro-batching, 빈 임베딩 캐시 (cold)
+   - cached    : 같은 캐시로 한 번 더 (warm, 쿼리만 인코딩)
+   질문당 wall time, 인코더 호출 수 / 인코딩한 텍스트 수, 캐시 hit rate
+
+sentence-transformers가 설치되어 있어야 하고 처음 실행 시 DENSE_MODEL을 내려받는다.
+
+사용 예:
+    python -m scripts.bench_dense_retrieval --samples 500
+    DENSE_MODEL=BAAI/bge-small-en-v1.5 python -m scripts.bench_dense_retrieval --samples 200 --workers 16
+"""
+import time
+import argparse
+import tempfile
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils import DATASET_PATH
+from src.dataset import open_hotpot_qa
+from src.retrieval import BM25Index
+from src.dense import DenseEncoder, DenseIndex, EmbeddingCache, DENSE_MODEL
+
+KS = (1, 2, 3, 5)
+
+
+def gold_titles(item):
+    return {title for title, _ in item["supporting_facts"]}
+
+
+def recall_at_k(ranked_titles, gold):
+    """k별 (찾은 gold 문단 수, 두 문단 모두 찾았는지)"""
+    return {k: (len(gold & set(ranked_titles[:k])), gold <= set(ranked_titles[:k])) for k in KS}
+
+
+def rank_all(items, encoder: DenseEncoder, workers: int):
+    """질문들을 동시에 dense 순위화 → (질문별 순위 제목 리스트, wall 초)"""
+    def one(item):
+        index = DenseIndex(item["context"], encoder)
+        return [index.titles[i] for i, _ in index.rank(item["question"])]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        ranked = list(ex.map(one, items))
+    return ranked, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dataset", type=Path, default=DATASET_PATH)
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    data = open_hotpot_qa(args.dataset)
+    items = [data[i] for i in range(min(args.samples, len(data)))]
+    items = [item for item in items if gold_titles(item)]
+
+    tmp = Path(tempfile.mkdtemp())
+    unbatched = DenseEncoder(batch_size=1, window=0.0)
+    batched = DenseEncoder(cache=EmbeddingCache(tmp / "embeddings.sqlite"))
+    unbatched.encode(["warm up"])  # 모델 로드는 측정에서 제외
+    batched._model = unbatched._model
+
+    # ---------- 비용 ----------
+    runs = {}
+    for name, encoder in (("unbatched", unbatched), ("batched", batched), ("cached", batched)):
+        before = encoder.stats_snapshot()
+        ranked, wall = rank_all(items, encoder, args.workers)
+        runs[name] = ranked
+        after = encoder.stats_snapshot()
+        calls = after["calls"] - before["calls"]
+        texts = after["texts"] - before["texts"]
+        line = (f"{name:10s}: {wall / len(items) * 1000:7.2f} ms/question  {len(items) / wall:7.1f} q/s  "
+                f"encoder calls={calls:5d}  texts={texts:6d}")
+        if encoder.cache is not None:
+            line += f"  cache={encoder.cache.stats()}"
+        print(line)
+
+    # ---------- 품질 ----------
+    hits = {m: {k: [0, 0] for k in KS} for m in ("bm25", "dense")}
+    n_gold = 0
+    for item, dense_titles in zip(items, runs["batched"]):
+        gold = gold_titles(item)
+        n_gold += len(gold)
+        bm25 = BM25Index(item["context"])
+        bm25_titles = [bm25.titles[i] for i, _ in bm25.rank(item["question"])]
+        for mode, titles in (("bm25", bm25_titles), ("dense", dense_titles)):
+            for k, (found, both) in recall_at_k(titles, gold).items():
+                hits[mode][k][0] += found
+                hits[mode][k][1] += both
+
+    print(f"\n{'='*70}")
+    print(f"Questions: {len(items)}, supporting paragraphs: {n_gold}, model: {DENSE_MODEL}")
+    print(f"{'='*70}")
+    print(f"{'mode':6s} " + "  ".join(f"{f'R@{k}':>6s} {f'both@{k}':>7s}" for k in KS))
+    for mode, by_k in hits.items():
+        print(f"{mode:6s} " + "  ".join(
+            f"{by_k[k][0] / n_gold:6.1%} {by_k[k][1] / len(items):7.1%}" for k in KS
+        ))
@@ -0,0 +1,91 @@
+"""
+Extractor 문장 필터 벤치마크 (LLM 호출 없음)
+
+HotpotQA supporting_facts가 있는 문서마다 Extractor 프롬프트를 두 방식으로 만들어 비교한다.
+- truncate : 본문 앞 1500자 (기존)
+- filter   : 질문과 겹치는 상위 N개 문장 (src.retrieval.select_evidence_sentences)
+
+지표
+- 추출 1회당 프롬프트 토큰 수
+- supporting-fact recall: 해당 문서의 정답 근거 문장이 프롬프트에 온전히 포함된 비율
+
+사용 예:
+    python -m scripts.bench_evidence_filter --samples 500 --top-n 4
+"""
+import argparse
+from pathlib import Path
+
+from src.utils import count_tokens, DATASET_PATH
+from src.dataset import open_hotpot_qa
+from src.prompts import get_extractor_prompt
+from src.retrieval import select_evidence_sentences, format_indexed_sentences
+
+TRUNCATE_CHARS = 1500
+
+
+def truncated_sentence_ids(sentences):
+    """앞 1500자 안에 온전히 들어간 문장 인덱스 (" ".join 기준)"""
+    kept, offset = set(), 0
+    for i, sentence in enumerate(sentences):
+        end = offset + len(sentence)
+        if end <= TRUNCATE_CHARS:
+            kept.add(i)
+        offset = end + 1
+    return kept
+
+
+def extractor_prompt(step: str, title: str, doc_text: str) -> str:
+    return get_extractor_prompt(
+        current_step=step,
+        prev_context="",
+        reference_instruction="",
+        doc_title=title,
+        doc_text=doc_text,
+        task_text="Extract information that answers the current step"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dataset", type=Path, default=DATASET_PATH)
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--top-n", type=int, default=4)
+    args = parser.parse_args()
+
+    data = open_hotpot_qa(args.dataset)
+    dataset = [data[i] for i in range(min(args.samples, len(data)))]
+
+    stats = {m: {"tokens": 0, "hit": 0} for m in ("truncate", "filter")}
+    n_extractions = 0
+    n_facts = 0
+
+    for item in dataset:
+        docs = dict(item["context"])
+        gold = {}
+        for title, sent_id in item["supporting_facts"]:
+            gold.setdefault(title, set()).add(sent_id)
+
+        for title, sent_ids in gold.items():
+            sentences = docs.get(title)
+            if not sentences:
+                continue
+            # 계획이 없으므로 질문 자체를 step으로 사용
+            step = item["question"]
+            n_extractions += 1
+            n_facts += len(sent_ids)
+
+            text = " ".join(sentences)[:TRUNCATE_CHARS]
+            stats["truncate"]["tokens"] += count_tokens(extractor_prompt(step, title, text))
+            stats["truncate"]["hit"] += len(sent_ids & truncated_sentence_ids(sentences))
+
+            selected = select_evidence_sentences(sentences, step, [], top_n=args.top_n)
+            text = format_indexed_sentences(selected)
+            stats["filter"]["tokens"] += count_tokens(extractor_prompt(step, title, text))
+            stats["filter"]["hit"] += len(sent_ids & {i for i, _ in selected})
+
+    print(f"\n{'='*60}")
+    print(f"Questions: {len(dataset)}, extractions: {n_extractions}, supporting facts: {n_facts}")
+    print(f"{'='*60}")
+    for mode, s in stats.items():
+        print(f"{mode:9s}: {s['tokens'] / max(n_extractions, 1):7.1f} prompt tokens/extraction, "
+              f"supporting-fact recall={s['hit'] / max(n_facts, 1):.4f}")
@@ -0,0 +1,56 @@
+"""
+그래프 컴파일 오버헤드 벤치마크
+
+1) build_graph() 한 번의 비용 (StateGraph 구성 + compile)
+2) 질문당 재컴파일(기존) vs get_app() 재사용 시 run_question 오버헤드
+   - LLM 백엔드는 지연 0의 MockBackend → 순수 오케스트레이션 비용만 측정
+
+사용 예:
+    python -m scripts.bench_graph_compile --questions 2000
+"""
+import time
+import argparse
+
+from src import graph
+from src.backends import MockBackend, set_backend
+from scripts.bench_concurrency import make_dataset
+
+
+def time_per_question(dataset, rebuild: bool) -> float:
+    original = graph.get_app
+    if rebuild:
+        graph.get_app = graph.build_graph  # 기존 동작: 질문마다 compile
+    try:
+        start = time.perf_counter()
+        for sample in dataset:
+            graph.run_question(sample["question"], sample["context"])
+        return (time.perf_counter() - start) / len(dataset)
+    finally:
+        graph.get_app = original
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--compiles", type=int, default=50)
+    parser.add_argument("--questions", type=int, default=200)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    for _ in range(args.compiles):
+        graph.build_graph()
+    compile_cost = (time.perf_counter() - start) / args.compiles
+
+    set_backend(MockBackend())
+    dataset = make_dataset(args.questions)
+    graph.get_app()  # warm-up
+
+    per_q_rebuild = time_per_question(dataset, rebuild=True)
+    per_q_cached = time_per_question(dataset, rebuild=False)
+
+    print(f"\n{'='*60}")
+    print(f"build_graph()            : {compile_cost * 1000:.2f} ms")
+    print(f"run_question (rebuild)   : {per_q_rebuild * 1000:.2f} ms/question")
+    print(f"run_question (cached app): {per_q_cached * 1000:.2f} ms/question")
+    saved = per_q_rebuild - per_q_cached
+    print(f"saved                    : {saved * 1000:.2f} ms/question "
+          f"→ {saved * 7405:.1f}s over the 7,405-question dev set")
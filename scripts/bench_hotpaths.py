@@ -0,0 +1,228 @@
+"""
+LLM 호출 사이에서 도는 코드 (hot path) 마이크로 벤치마크
+
+LLM 응답이 캐시 / replay로 즉시 돌아오면 남는 임계 경로:
+- evaluate (EM / F1)
+- _extract_keywords_hybrid (재계획 전략)
+- _analyze_failure_pattern
+- synthesis / 독립 step 판별 문자열 매칭 (node_reasoner)
+- 실패 문서 제외 제목 필터 (node_searcher)
+- src.prompts 프롬프트 조립
+- JSON 코드 펜스 제거 + 파싱
+
+입력 크기 두 가지:
+- hotpot: 실제 HotpotQA 질문들 (데이터가 없으면 10문서짜리 합성 질문)
+- large : 문서 수백 개짜리 합성 context (--docs)
+
+timeit으로 케이스마다 autorange → repeat 후 호출당 최소 / 중앙값 (µs).
+--save로 결과를 JSON에 저장하고 다른 버전에서 --compare로 비교 (asv 스타일).
+
+사용 예:
+    python -m scripts.bench_hotpaths
+    python -m scripts.bench_hotpaths --filter prompt --docs 1000
+    python -m scripts.bench_hotpaths --save bench/base.json
+    python -m scripts.bench_hotpaths --compare bench/base.json
+"""
+import json
+import timeit
+import random
+import argparse
+from pathlib import Path
+
+import src.nodes as nodes
+import src.prompts as prompts
+from src.utils import evaluate
+
+_WORDS = ("river north film album band county museum journal station park school "
+          "league novel opera bridge island valley castle church festival").split()
+
+
+def synthetic_context(n_docs: int, rng: random.Random):
+    """제목 2~3단어 + 문장 3~6개짜리 문서 n_docs개"""
+    context = []
+    for d in range(n_docs):
+        title = " ".join(rng.choice(_WORDS).title() for _ in range(rng.randint(2, 3))) + f" {d}"
+        sentences = [
+            f"{title} is a {rng.choice(_WORDS)} founded in {rng.randint(1800, 2020)} "
+            f"near the {rng.choice(_WORDS)} of {rng.choice(_WORDS).title()}."
+            for _ in range(rng.randint(3, 6))
+        ]
+        context.append((title, sentences))
+    return context
+
+
+def load_hotpot(path: Path, n: int, rng: random.Random):
+    from src.dataset import open_hotpot_qa
+    try:
+        data = open_hotpot_qa(path)
+        return [data[i] for i in range(min(n, len(data)))], "HotpotQA"
+    except FileNotFoundError:
+        items = [
+            {"question": f"When was the director of the {rng.choice(_WORDS)} film {i} born?",
+             "answer": str(rng.randint(1900, 2000)), "context": synthetic_context(10, rng)}
+            for i in range(n)
+        ]
+        return items, "synthetic (10 docs)"
+
+
+def make_state(item, rng: random.Random):
+    """재계획 직전 상황 비슷한 state (step 답변 2개, 실패 문서 절반)"""
+    titles = [title for title, _ in item["context"]]
+    return {
+        "question": item["question"],
+        "hotpot_context": item["context"],
+        "plan": [
+            "Identify the director of the film.",
+            "Find the birth date of the director (from step 1).",
+            "Compare the dates from step 1 and 2 to determine which came first.",
+        ],
+        "step_idx": 1,
+        "step_answers": [
+            {"step_idx": 0, "step": "Identify the director of the film.", "answer": "John Smith Jr.",
+             "evidence": [item["context"][0][1][0]]},
+            {"step_idx": 1, "step": "Find the birth date.", "answer": "partially known: March 1970",
+             "evidence": []},
+        ],
+        "current_evidence": ["The document does not provide the birth date."] * 3,
+        "retry_count": {"step_1": 6},
+        "failed_documents": {1: rng.sample(titles, len(titles) // 2)},
+    }
+
+
+def planner_reply(fenced: bool, n_steps: int = 3) -> str:
+    body = json.dumps({"plan": [f"Find fact {i} about the subject (from step {i})." for i in range(n_steps)]},
+                      indent=2)
+    return f"```json\n{body}\n```" if fenced else body
+
+
+def answer_reply(fenced: bool) -> str:
+    body = json.dumps({"question_type": "when", "final_answer": "March 3, 1970",
+                       "reasoning": "Step 2 gives the birth date of the director identified in step 1. " * 3},
+                      indent=2)
+    return f"```json\n{body}\n```" if fenced else body
+
+
+def build_cases(items, states, label: str):
+    """(이름, 인자 없는 함수, 함수 한 번에 처리하는 입력 수) 목록"""
+    evidence_text = "\n".join(f"- {s}" for s in items[0]["context"][0][1])
+    steps = [step for state in states for step in state["plan"]]
+    pairs = [(item["answer"] + " (born)", item["answer"]) for item in items]
+    replan_args = dict(
+        question=states[0]["question"],
+        plan_str=json.dumps(states[0]["plan"], indent=2),
+        current_step_idx=1,
+        progress_str=json.dumps([{"step": a["step"], "answer": a["answer"]} for a in states[0]["step_answers"]]),
+        found_entities_str=json.dumps(["John Smith Jr."]),
+        promising_evidence_str=json.dumps([evidence_text]),
+        useful_docs_str=json.dumps([items[0]["context"][0][0]]),
+        failure_analysis="Failure patterns detected: Only partial information available",
+        dynamic_strategy="1. Search directly for information about these entities: John Smith Jr.",
+        replan_count=1,
+    )
+    titles = [title for title, _ in items[0]["context"]]
+    titles_str = "\n".join(f"{i}. {t}" for i, t in enumerate(titles, 1))
+    doc_text = " ".join(items[0]["context"][0][1])
+    batch_items = [(step, evidence_text) for step in steps[:16]]
+    replies = [planner_reply(True), planner_reply(False), answer_reply(True), answer_reply(False)]
+    verdicts = "```json\n" + json.dumps({"verdicts": ["yes", "no"] * 8}) + "\n```"
+
+    def run_evaluate():
+        for pred, gold in pairs:
+            evaluate(pred, gold)
+
+    def run_keywords():
+        for state in states:
+            nodes._extract_keywords_hybrid(state["question"], state)
+
+    def run_failure():
+        for state in states:
+            nodes._analyze_failure_pattern(state, state["step_answers"], state["current_evidence"])
+
+    def run_synthesis():
+        for step in steps:
+            nodes._is_synthesis_step(step)
+
+    def run_step_group():
+        for state in states:
+            nodes._independent_step_group(state["plan"], 0)
+
+    def run_title_filter():
+        for state in states:
+            nodes._available_docs(state["hotpot_context"], state["failed_documents"][1])
+
+    def run_prompts():
+        prompts.get_replan_prompt(**replan_args)
+        prompts.get_verify_evidence_prompt(steps[0], evidence_text)
+        prompts.get_step_answer_prompt(steps[0], evidence_text)
+        prompts.get_select_doc_prompt(steps[0], "Step 1: John Smith Jr.", titles_str, len(titles))
+        prompts.get_extractor_prompt(steps[0], "", "", titles[0], doc_text, steps[0])
+        prompts.get_final_answer_prompt(states[0]["question"], evidence_text)
+
+    def run_batch_prompt():
+        prompts.get_batch_verify_prompt(batch_items)
+
+    def run_json():
+        for reply in replies:
+            nodes._parse_json(reply)
+        nodes._parse_batch_verdicts(verdicts, 16)
+
+    n = len(items)
+    return [
+        (f"evaluate [{label}]", run_evaluate, n),
+        (f"keywords_hybrid [{label}]", run_keywords, n),
+        (f"failure_pattern [{label}]", run_failure, n),
+        (f"is_synthesis_step [{label}]", run_synthesis, len(steps)),
+        (f"independent_group [{label}]", run_step_group, n),
+        (f"title_filter [{label}]", run_title_filter, n),
+        (f"prompts (6 builders) [{label}]", run_prompts, 1),
+        (f"batch_verify_prompt [{label}]", run_batch_prompt, 1),
+        (f"json_parse (5) [{label}]", run_json, 1),
+    ]
+
+
+def measure(func, per_batch: int, repeat: int):
+    """호출당 (최소, 중앙값) 초"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    times = sorted(t / number / per_batch for t in timer.repeat(repeat=repeat, number=number))
+    return times[0], times[len(times) // 2]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dataset", type=Path, default=Path("data/hotpot_dev_distractor_v1.json"))
+    parser.add_argument("--questions", type=int, default=200, help="hotpot 입력 질문 수")
+    parser.add_argument("--docs", type=int, default=500, help="large 입력의 문서 수")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--filter", default="", help="이름에 이 문자열이 들어간 케이스만")
+    parser.add_argument("--save", type=Path, help="결과 JSON 저장")
+    parser.add_argument("--compare", type=Path, help="이전 결과 JSON과 비교")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    hotpot_items, source = load_hotpot(args.dataset, args.questions, rng)
+    large_items = [{**item, "context": synthetic_context(args.docs, rng)} for item in hotpot_items[:20]]
+
+    cases = (
+        build_cases(hotpot_items, [make_state(i, rng) for i in hotpot_items], "hotpot")
+        + build_cases(large_items, [make_state(i, rng) for i in large_items], f"{args.docs} docs")
+    )
+    baseline = json.loads(args.compare.read_text()) if args.compare else {}
+
+    print(f"hotpot input: {source}, {len(hotpot_items)} questions / large input: {len(large_items)} x {args.docs} docs")
+    print(f"\n{'case':36s} {'min µs':>10s} {'median µs':>10s}" + (f" {'vs base':>8s}" if baseline else ""))
+    results = {}
+    for name, func, per_batch in cases:
+        if args.filter not in name:
+            continue
+        best, median = measure(func, per_batch, args.repeat)
+        results[name] = {"min": best, "median": median}
+        line = f"{name:36s} {best * 1e6:10.2f} {median * 1e6:10.2f}"
+        if name in baseline:
+            line += f" {best / baseline[name]['min']:7.2f}x"
+        print(line)
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps(results, indent=2))
+        print(f"\nSaved → {args.save}")
@@ -0,0 +1,119 @@
+"""
+증거 검증 micro-batching 벤치마크 (가짜 LLM, 네트워크 없음)
+
+동시에 실행 중인 질문 N개가 각자 _verify_evidence_with_llm을 호출하는 상황을 만들고,
+JUDGE_BATCH 켜기 / 끄기에 따라 LLM 호출 수와 처리 시간을 비교한다.
+
+가짜 LLM은 요청당 고정 오버헤드(--overhead) + 항목당 비용(--per-item)만큼 지연되며,
+근거 문장에 "SUPPORTED"가 들어 있으면 yes로 판정한다 → 배치 응답이 원래 요청자에게
+올바르게 돌아가는지도 확인.
+
+사용 예:
+    python -m scripts.bench_judge_batching --requests 64 --workers 16
+    python -m scripts.bench_judge_batching --requests 256 --async --window-ms 10
+"""
+import re
+import json
+import time
+import asyncio
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import src.nodes as nodes
+from src.batching import MicroBatcher, AsyncMicroBatcher
+
+
+def _verdict(text: str) -> str:
+    return "yes" if "SUPPORTED" in text else "no"
+
+
+def make_fake_llms(overhead: float, per_item: float, calls: dict):
+    lock = threading.Lock()
+
+    def reply(system_prompt: str, user_prompt: str):
+        items = re.split(r"### Item \d+", user_prompt)[1:]
+        if items:
+            return len(items), json.dumps({"verdicts": [_verdict(item) for item in items]})
+        return 1, _verdict(user_prompt)
+
+    def fake_call_llm(system_prompt: str, user_prompt: str, **kwargs) -> str:
+        n, out = reply(system_prompt, user_prompt)
+        with lock:
+            calls["n"] += 1
+        time.sleep(overhead + per_item * n)
+        return out
+
+    async def fake_acall_llm(system_prompt: str, user_prompt: str, **kwargs) -> str:
+        n, out = reply(system_prompt, user_prompt)
+        calls["n"] += 1
+        await asyncio.sleep(overhead + per_item * n)
+        return out
+
+    return fake_call_llm, fake_acall_llm
+
+
+def make_requests(n: int):
+    """(step, evidence, 기대 판정)"""
+    requests = []
+    for i in range(n):
+        supported = i % 3 != 0
+        evidence = [f"Doc {i} says the answer is {i}." + (" SUPPORTED" if supported else "")]
+        requests.append((f"Find fact {i}.", evidence, supported))
+    return requests
+
+
+def run(requests, workers: int, use_async: bool):
+    if use_async:
+        async def main():
+            sem = asyncio.Semaphore(workers)
+
+            async def one(step, evidence):
+                async with sem:
+                    return await nodes._run_async(nodes._verify_evidence_with_llm(step, evidence))
+
+            return await asyncio.gather(*(one(step, evidence) for step, evidence, _ in requests))
+        return asyncio.run(main())
+
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(
+            lambda r: nodes._run_sync(nodes._verify_evidence_with_llm(r[0], r[1])),
+            requests
+        ))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=16, help="동시에 검증 중인 질문 수")
+    parser.add_argument("--async", dest="use_async", action="store_true")
+    parser.add_argument("--overhead", type=float, default=0.05, help="요청당 고정 지연 (초)")
+    parser.add_argument("--per-item", type=float, default=0.002, help="배치 항목당 추가 지연 (초)")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--window-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    calls = {"n": 0}
+    nodes.call_llm, nodes.acall_llm = make_fake_llms(args.overhead, args.per_item, calls)
+    nodes._judge_batcher = MicroBatcher(nodes._judge_batch, args.batch_size, args.window_ms / 1000)
+    nodes._ajudge_batcher = AsyncMicroBatcher(nodes._ajudge_batch, args.batch_size, args.window_ms / 1000)
+    requests = make_requests(args.requests)
+
+    report = []
+    for batching in (False, True):
+        nodes.JUDGE_BATCH = batching
+        calls["n"] = 0
+        start = time.perf_counter()
+        verdicts = run(requests, args.workers, args.use_async)
+        elapsed = time.perf_counter() - start
+        wrong = sum(v != expected for v, (_, _, expected) in zip(verdicts, requests))
+        report.append((batching, calls["n"], elapsed, wrong))
+
+    print(f"\n{'='*60}")
+    print(f"{'async' if args.use_async else 'threads'} x{args.workers}, {args.requests} judge requests, "
+          f"batch<= {args.batch_size}, window={args.window_ms}ms")
+    for batching, n_calls, elapsed, wrong in report:
+        print(f"batching={'on ' if batching else 'off'}: llm calls={n_calls:4d}  time={elapsed:.2f}s  "
+              f"wrong verdicts={wrong}")
+    batcher = nodes._ajudge_batcher if args.use_async else nodes._judge_batcher
+    print(f"batcher stats: {batcher.stats}")
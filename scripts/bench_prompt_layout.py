@@ -0,0 +1,97 @@
+"""
+프롬프트 배치(PROMPT_LAYOUT) 벤치마크: default vs prefix
+
+같은 질문들을 두 레이아웃으로 실행하고 에이전트별 호출 수 / 입력 토큰 / provider 캐시 적중 토큰 /
+평균 지연 / 비용을 비교한다.
+
+- 기본: 로컬 Stub 서버 (prefix_cache 흉내) → 네트워크 없이 캐시 적중률 비교
+- --live: 실제 API (OPENAI_BASE_URL / OPENAI_API_KEY) → 지연 / 비용까지 실측
+  (LLM_CACHE는 끄고 실행할 것: 로컬 응답 캐시 적중은 provider 호출이 아님)
+
+사용 예:
+    python -m scripts.bench_prompt_layout --samples 20
+    python -m scripts.bench_prompt_layout --samples 20 --live
+"""
+import os
+import time
+import argparse
+from pathlib import Path
+
+from scripts.stub_llm_server import StubLLMServer
+
+
+def load_samples(path: Path, n: int):
+    from src.dataset import open_hotpot_qa
+    from scripts.bench_concurrency import make_dataset
+    try:
+        data = open_hotpot_qa(path)
+    except FileNotFoundError:
+        print(f"[DATA] {path} not found → synthetic questions")
+        return make_dataset(n)
+    return [data[i] for i in range(min(n, len(data)))]
+
+
+def run_layout(layout: str, samples) -> dict:
+    import src.prompts as prompts
+    from src.graph import run_question
+    from src.metrics import track_question, aggregate_by_agent
+
+    prompts.PROMPT_LAYOUT = layout  # _layout()이 호출 시점에 읽음
+    infos = []
+    start = time.perf_counter()
+    for sample in samples:
+        with track_question() as qm:
+            try:
+                run_question(sample["question"], sample["context"])
+            except Exception as e:
+                print(f"   ⚠️ {layout}: {e}")
+        infos.append(qm.to_dict())
+    return {"elapsed": time.perf_counter() - start, "by_agent": aggregate_by_agent(infos)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dataset", type=Path, default=Path("data/hotpot_dev_distractor_v1.json"))
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--live", action="store_true", help="Stub 대신 실제 API 사용")
+    args = parser.parse_args()
+
+    server = None
+    if not args.live:
+        server = StubLLMServer(prefix_cache=True).start()
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        os.environ.setdefault("OPENAI_API_KEY", "stub")
+
+    samples = load_samples(args.dataset, args.samples)
+
+    import contextlib, io
+    results = {}
+    for layout in ("default", "prefix"):
+        if server is not None:
+            server._prefixes.clear()  # 레이아웃마다 빈 캐시에서 시작
+        with contextlib.redirect_stdout(io.StringIO()):
+            results[layout] = run_layout(layout, samples)
+
+    if server is not None:
+        server.stop()
+
+    print(f"\n{'='*96}")
+    print(f"{len(samples)} questions, backend={'live API' if args.live else 'stub (simulated prefix cache)'}")
+    print(f"{'='*96}")
+    print(f"{'agent':12s} {'layout':8s} {'calls':>6s} {'prompt':>9s} {'cached':>9s} {'ratio':>6s} "
+          f"{'avg lat':>8s} {'cost $':>9s}")
+    agents = sorted(set(results["default"]["by_agent"]) | set(results["prefix"]["by_agent"]))
+    for agent in agents:
+        for layout in ("default", "prefix"):
+            u = results[layout]["by_agent"].get(agent)
+            if u is None:
+                continue
+            print(f"{agent:12s} {layout:8s} {u['calls']:6d} {u['prompt_tokens']:9d} {u['cached_tokens']:9d} "
+                  f"{u['cached_ratio']:6.1%} {u['avg_latency']:8.3f} {u['cost']:9.5f}")
+    for layout in ("default", "prefix"):
+        by_agent = results[layout]["by_agent"]
+        cost = sum(u["cost"] for u in by_agent.values())
+        cached = sum(u["cached_tokens"] for u in by_agent.values())
+        prompt = sum(u["prompt_tokens"] for u in by_agent.values())
+        print(f"{'total':12s} {layout:8s} time={results[layout]['elapsed']:.2f}s  "
+              f"cached={cached}/{prompt} ({cached / max(prompt, 1):.1%})  cost=${cost:.5f}")
@@ -0,0 +1,90 @@
+"""
+LLM 스케줄러 검증 (429 주입 Stub 서버 대상)
+
+Stub 서버가 error_rate 비율로 429 + Retry-After를 돌려주는 상황에서 call_llm / acall_llm을
+동시에 호출하고, 모든 호출이 재시도로 성공하는지 + 스케줄러 통계(재시도 / 대기 / queue depth)를 확인한다.
+
+사용 예:
+    python -m scripts.bench_scheduler --calls 200 --threads 16 --error-rate 0.3 --retry-after 0.05
+    python -m scripts.bench_scheduler --calls 200 --async --rpm 1200
+"""
+import os
+import time
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from scripts.stub_llm_server import StubLLMServer
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=16, help="동시 호출 수 (--async면 동시 태스크 수)")
+    parser.add_argument("--async", dest="use_async", action="store_true")
+    parser.add_argument("--error-rate", type=float, default=0.3)
+    parser.add_argument("--retry-after", type=float, default=0.05)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--rpm", type=float, default=0)
+    parser.add_argument("--tpm", type=float, default=0)
+    parser.add_argument("--max-retries", type=int, default=8)
+    args = parser.parse_args()
+
+    server = StubLLMServer(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after
+    ).start()
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+
+    import src.scheduler as scheduler_mod
+    from src.utils import call_llm, acall_llm, close_llm_client, aclose_llm_client
+
+    scheduler = scheduler_mod.LLMScheduler(
+        rpm=args.rpm,
+        tpm=args.tpm,
+        max_retries=args.max_retries,
+        backoff_base=0.05,
+        backoff_max=1.0
+    )
+    scheduler_mod._scheduler = scheduler
+
+    failures = []
+
+    def one(i: int):
+        try:
+            call_llm("sys", f"q{i}")
+        except Exception as e:
+            failures.append(e)
+
+    async def aone(i: int, sem: asyncio.Semaphore):
+        async with sem:
+            try:
+                await acall_llm("sys", f"q{i}")
+            except Exception as e:
+                failures.append(e)
+
+    async def arun():
+        sem = asyncio.Semaphore(args.threads)
+        await asyncio.gather(*(aone(i, sem) for i in range(args.calls)))
+        await aclose_llm_client()
+
+    start = time.perf_counter()
+    if args.use_async:
+        asyncio.run(arun())
+    else:
+        with ThreadPoolExecutor(max_workers=args.threads) as ex:
+            list(ex.map(one, range(args.calls)))
+    elapsed = time.perf_counter() - start
+
+    close_llm_client()
+    server.stop()
+
+    stats = scheduler.stats()
+    print(f"\n{'='*60}")
+    print(f"Mode: {'async' if args.use_async else 'threads'} x{args.threads}, "
+          f"error_rate={args.error_rate}, rpm={args.rpm or '-'}, tpm={args.tpm or '-'}")
+    print(f"Calls: {args.calls}, failed: {len(failures)}, time: {elapsed:.2f}s ({args.calls / elapsed:.1f} calls/s)")
+    print(f"Server: {server.stats}")
+    print(f"Scheduler: {stats}")
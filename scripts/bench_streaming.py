@@ -0,0 +1,82 @@
+"""
+스트리밍 조기 종료 (STREAM_EARLY_STOP) 벤치마크: Selector / Judge time-to-answer
+
+로컬 Stub 서버가 첫 토큰 지연(--ttft) + 토큰당 지연(--token-latency)으로 응답을 생성하고,
+Selector("2. The second document ...") / Judge("Yes. The evidence ...")처럼 답 뒤에 설명이 붙는 응답을 돌려준다.
+- off: 전체 응답을 기다림 (기존)
+- on : SSE 스트리밍으로 받다가 첫 정수 / 첫 yes·no가 나오면 스트림을 닫음
+두 모드의 호출당 지연 (mean / p50 / p95)과 결과(선택 문서, 판정)가 같은지 비교.
+
+사용 예:
+    python -m scripts.bench_streaming --calls 20
+    python -m scripts.bench_streaming --calls 50 --ttft 0.4 --token-latency 0.03 --workers 8
+"""
+import io
+import time
+import argparse
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+import src.nodes as nodes
+from src.backends import OpenAIBackend, set_backend
+from src.metrics import percentiles
+from scripts.stub_llm_server import StubLLMServer
+
+REPLIES = {
+    "selector": "2. The second document is about the film's production and names its director, "
+                "which is exactly what the current goal needs; the others cover unrelated topics.",
+    "judge": "Yes. The evidence explicitly states the director's name and birth year, so it is "
+             "sufficient to answer the question even though the exact date is not given.",
+}
+
+CONTEXT = [(f"Doc {d}", [f"Sentence {s} of doc {d}." for s in range(4)]) for d in range(5)]
+EVIDENCE = ["The film was directed by John Smith, born in 1970."]
+
+
+def one_call(agent: str, i: int):
+    step = f"Find the director of film {i}."
+    start = time.perf_counter()
+    if agent == "selector":
+        result = nodes._run_sync(nodes._select_doc_with_llm(step, CONTEXT, []))[0]
+    else:
+        result = nodes._run_sync(nodes._verify_evidence_with_llm(step, EVIDENCE))
+    return time.perf_counter() - start, result
+
+
+def run(agent: str, calls: int, workers: int):
+    # redirect_stdout은 프로세스 전역이라 worker 스레드가 아닌 여기서 한 번만
+    with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(lambda i: one_call(agent, i), range(calls)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--ttft", type=float, default=0.3, help="첫 토큰까지 지연 (초)")
+    parser.add_argument("--token-latency", type=float, default=0.02, help="토큰당 생성 지연 (초)")
+    args = parser.parse_args()
+
+    server = StubLLMServer(latency=args.ttft, token_latency=args.token_latency).start()
+    set_backend(OpenAIBackend(server.base_url, "stub"))
+
+    print(f"\n{'='*78}")
+    print(f"{args.calls} calls x {args.workers} workers, ttft={args.ttft}s, token latency={args.token_latency}s")
+    print(f"{'='*78}")
+    print(f"{'agent':9s} {'stream':6s} {'mean':>7s} {'p50':>7s} {'p95':>7s}  result")
+    for agent, reply in REPLIES.items():
+        server.reply = reply
+        results = {}
+        for early_stop in (False, True):
+            nodes.STREAM_EARLY_STOP = early_stop
+            runs = run(agent, args.calls, args.workers)
+            latencies = [t for t, _ in runs]
+            results[early_stop] = {r for _, r in runs}
+            p = percentiles(latencies)
+            print(f"{agent:9s} {'on' if early_stop else 'off':6s} {sum(latencies) / len(latencies):7.3f} "
+                  f"{p['p50']:7.3f} {p['p95']:7.3f}  {sorted(results[early_stop])}")
+        if results[False] != results[True]:
+            print(f"   ❌ {agent}: results differ with early stop")
+
+    server.stop()
+    print(f"\nServer: {server.stats}")
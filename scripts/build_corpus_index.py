@@ -0,0 +1,55 @@
+"""
+Open-domain 검색용 코퍼스 인덱스 빌드 (src.corpus_index, 한 번만 실행)
+
+입력 (여러 개 가능, 디렉터리는 재귀):
+- HotpotQA fullwiki abstracts 덤프 (enwiki-...-abstracts/*/wiki_*.bz2, 한 줄에 {"title", "text": [문장]})
+- *.jsonl 같은 형식의 문단 파일
+- HotpotQA 데이터셋 *.json (질문들의 context 문단, 중복 제거) - 작은 테스트용
+
+실행 시 OPEN_DOMAIN=auto|on + CORPUS_INDEX=<out>으로 지정하면 Searcher가 이 인덱스에서 후보를 가져온다.
+
+사용 예:
+    python -m scripts.build_corpus_index data/enwiki-20171001-pages-meta-current-withlinks-abstracts --out index/wiki
+    python -m scripts.build_corpus_index data/hotpot_dev_distractor_v1.json --out index/hotpot_dev --shard-size 20000
+    python -m scripts.build_corpus_index data/enwiki-...-abstracts --out index/wiki_hybrid --vectors --ivf-lists 1024
+"""
+import time
+import argparse
+from pathlib import Path
+
+from src.corpus_index import CorpusIndex, build_corpus_index, build_ivf, iter_corpus
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("inputs", type=Path, nargs="+")
+    parser.add_argument("--out", type=Path, default=Path("index/wiki"))
+    parser.add_argument("--shard-size", type=int, default=500_000, help="shard당 문단 수")
+    parser.add_argument("--vectors", action="store_true", help="DENSE_MODEL 문단 임베딩도 저장 (hybrid 검색, sentence-transformers 필요)")
+    parser.add_argument("--ivf-lists", type=int, default=0,
+                        help="--vectors일 때 shard별 IVF 클러스터 수 (0이면 flat 검색, 수백만 문단이면 1024 정도)")
+    args = parser.parse_args()
+
+    encoder = None
+    if args.vectors:
+        from src.dense import get_dense_encoder
+        encoder = get_dense_encoder()
+
+    start = time.perf_counter()
+    meta = build_corpus_index(
+        iter_corpus(args.inputs), args.out, shard_size=args.shard_size,
+        encoder=encoder, sources=[str(p) for p in args.inputs],
+    )
+    if encoder is not None and args.ivf_lists:
+        build_ivf(args.out, args.ivf_lists)
+    size = sum(f.stat().st_size for f in args.out.rglob("*") if f.is_file())
+    print(f"[INDEX] {meta['docs']} paragraphs, {len(meta['shards'])} shards, vectors={meta['model'] or 'none'} "
+          f"→ {args.out} ({size / 1e6:.1f} MB, {time.perf_counter() - start:.1f}s)")
+
+    index = CorpusIndex(args.out)
+    if len(index):
+        title, sentences = index.doc(0)
+        start = time.perf_counter()
+        hits = index.search(title, k=5)
+        print(f"[INDEX] search('{title}') → {[h['title'] for h in hits]} "
+              f"({(time.perf_counter() - start) * 1000:.1f} ms)")
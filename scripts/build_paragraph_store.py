@@ -0,0 +1,93 @@
+"""
+HotpotQA 문단 저장소 빌드 (src.paragraph_store, 한 번만 실행)
+
+데이터셋 파일들의 모든 문단을 title + 본문 해시로 중복 제거해 어휘 통계(+ --vectors면 임베딩)를 저장한다.
+빌드 후 앞쪽 --check개 질문으로 기존 질문 단위 계산과 결과가 같은지 / 질문당 비용을 비교한다.
+- BM25 순위 (질문 + 각 문단 제목을 쿼리로), snippet, Extractor 문장 필터
+- 질문당 시간: BM25Index 생성 + 순위화 vs 저장소 조회 + 순위화
+
+실행 시 PARAGRAPH_STORE=<out>으로 지정하면 Searcher / Extractor / fast path가 저장소를 사용한다.
+
+사용 예:
+    python -m scripts.build_paragraph_store data/hotpot_dev_distractor_v1.json --out store/hotpot_dev
+    python -m scripts.build_paragraph_store data/hotpot_train_v1.1.json data/hotpot_dev_distractor_v1.json \\
+        --out store/hotpot_all --vectors
+"""
+import time
+import argparse
+import itertools
+from pathlib import Path
+
+from src.utils import DATASET_PATH
+from src.dataset import open_hotpot_qa
+from src.retrieval import BM25Index, select_evidence_sentences
+from src.paragraph_store import ParagraphStore, build_paragraph_store
+
+
+def check(store: ParagraphStore, items, top_n: int = 4) -> None:
+    mismatches = 0
+    base_time = store_time = 0.0
+    for item in items:
+        context = item["context"]
+        queries = [item["question"]] + [title for title, _ in context]
+
+        start = time.perf_counter()
+        base = BM25Index(context)
+        base_ranks = [base.rank(q) for q in queries]
+        base_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = store.bm25_index(context)
+        store_ranks = [index.rank(q) for q in queries] if index is not None else None
+        store_time += time.perf_counter() - start
+
+        if index is None:
+            mismatches += 1
+            continue
+        same = all(
+            [i for i, _ in a] == [i for i, _ in b] and all(abs(x - y) < 1e-9 for (_, x), (_, y) in zip(a, b))
+            for a, b in zip(base_ranks, store_ranks)
+        )
+        same = same and all(
+            base.snippet(d, item["question"]) == index.snippet(d, item["question"]) for d in range(len(context))
+        )
+        same = same and all(
+            select_evidence_sentences(sentences, item["question"], [title], top_n)
+            == store.select_evidence_sentences(title, sentences, item["question"], [title], top_n)
+            for title, sentences in context
+        )
+        mismatches += not same
+
+    n = len(items)
+    print(f"\n[CHECK] {n} questions, {n - mismatches}/{n} identical to per-question BM25Index")
+    print(f"[CHECK] per question (index + {len(items[0]['context']) + 1 if items else 0} queries): "
+          f"BM25Index={base_time / max(n, 1) * 1000:.3f}ms  store={store_time / max(n, 1) * 1000:.3f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("datasets", type=Path, nargs="*", default=[DATASET_PATH])
+    parser.add_argument("--out", type=Path, default=Path("store/hotpot"))
+    parser.add_argument("--vectors", action="store_true", help="DENSE_MODEL 문단 임베딩도 저장 (sentence-transformers 필요)")
+    parser.add_argument("--check", type=int, default=200, help="빌드 후 비교할 질문 수 (0이면 생략)")
+    args = parser.parse_args()
+
+    datasets = [open_hotpot_qa(path) for path in args.datasets]
+    encoder = None
+    if args.vectors:
+        from src.dense import get_dense_encoder
+        encoder = get_dense_encoder()
+
+    start = time.perf_counter()
+    meta = build_paragraph_store(
+        itertools.chain.from_iterable(datasets), args.out,
+        encoder=encoder, sources=[str(p) for p in args.datasets],
+    )
+    size = sum(f.stat().st_size for f in args.out.iterdir())
+    print(f"[STORE] {meta['input_paragraphs']} paragraphs → {meta['paragraphs']} unique, {meta['terms']} terms, "
+          f"vectors={meta['model'] or 'none'} → {args.out} ({size / 1e6:.1f} MB, "
+          f"{time.perf_counter() - start:.1f}s)")
+
+    if args.check:
+        store = ParagraphStore(args.out)
+        check(store, [datasets[0][i] for i in range(min(args.check, len(datasets[0])))])
@@ -0,0 +1,29 @@
+"""
+HotpotQA 원본 JSON → 오프셋 인덱스 JSONL 변환 (한 번만 실행)
+
+    python -m scripts.convert_dataset data/hotpot_dev_distractor_v1.json
+    → data/hotpot_dev_distractor_v1.jsonl + data/hotpot_dev_distractor_v1.idx
+"""
+import time
+import argparse
+from pathlib import Path
+
+from src.utils import DATASET_PATH
+from src.dataset import convert_hotpot_qa, open_hotpot_qa
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("src", type=Path, nargs="?", default=DATASET_PATH)
+    parser.add_argument("--dst", type=Path, default=None, help="출력 경로 (기본값: src와 같은 위치)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    jsonl_path = convert_hotpot_qa(args.src, args.dst)
+    print(f"[DATA] Conversion took {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    dataset = open_hotpot_qa(jsonl_path)
+    sample = dataset[len(dataset) - 1]
+    print(f"[DATA] Open + random access took {(time.perf_counter() - start) * 1000:.1f} ms "
+          f"(last item: {sample['question'][:60]}...)")
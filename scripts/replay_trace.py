@@ -0,0 +1,180 @@
+"""
+질문 실행 기록 / 재실행 (record / replay)
+
+record: 질문들을 지금 설정된 백엔드(실제 API / local / mock)로 실행하면서
+        모든 call_llm 요청·응답 + 노드 전이 + 최종 state를 JSONL로 저장 (src.recorder 포맷)
+replay: 기록된 응답만 돌려주는 MockBackend(strict)로 같은 질문들을 다시 실행 (네트워크 없음)
+        → 최종 state / 노드 순서가 기록과 같은지 확인 + 순수 오케스트레이션 비용 측정
+          (그래프 / state 복사 / 프롬프트 조립 / 파싱)
+
+- nodes.py 제어 흐름을 리팩터링한 뒤 같은 기록으로 replay → 결과가 바뀌면 mismatch로 표시
+  (프롬프트가 바뀐 경우는 replay miss로 바로 실패)
+- 버전 간 처리량 비교: 같은 기록 파일을 각 버전에서 replay --repeat N
+- 기록 / replay는 같은 설정(FAST_PATH, PARALLEL_STEPS 등)으로 실행할 것 (다르면 경고)
+- JUDGE_BATCH로 묶인 판정은 질문마다 같은 판정의 단건 검증 호출로 기록됨 (배치 구성과 무관하게 replay 가능)
+
+사용 예:
+    python -m scripts.replay_trace record --samples 20 --out traces/dev20.jsonl
+    LLM_BACKEND=mock python -m scripts.replay_trace record --samples 100 --out traces/mock100.jsonl
+    python -m scripts.replay_trace replay traces/dev20.jsonl --repeat 5
+"""
+import io
+import sys
+import time
+import contextlib
+import argparse
+from pathlib import Path
+
+import src.cache as cache
+import src.dense as dense
+import src.corpus_index as corpus_index
+import src.nodes as nodes
+import src.prompts as prompts
+from src.utils import OPENAI_MODEL
+from src.graph import run_question
+from src.backends import MockBackend, LLM_BACKEND, set_backend
+from src.metrics import track_question, percentiles
+from src.recorder import record_question, load_traces, comparable_state
+
+
+def config_snapshot() -> dict:
+    """노드 순서 / 프롬프트에 영향을 주는 설정"""
+    return {
+        "model": OPENAI_MODEL,
+        "searcher_mode": nodes.SEARCHER_MODE,
+        "searcher_top_k": nodes.SEARCHER_TOP_K,
+        "dense_model": dense.DENSE_MODEL,
+        "open_domain": corpus_index.OPEN_DOMAIN,
+        "corpus_index": str(corpus_index.CORPUS_INDEX),
+        "extractor_mode": nodes.EXTRACTOR_MODE,
+        "extractor_top_sentences": nodes.EXTRACTOR_TOP_SENTENCES,
+        "fused_judge": nodes.FUSED_JUDGE,
+        "parallel_steps": nodes.PARALLEL_STEPS,
+        "judge_batch": nodes.JUDGE_BATCH,
+        "fast_path": nodes.FAST_PATH,
+        "prompt_layout": prompts.PROMPT_LAYOUT,
+    }
+
+
+def load_samples(path: Path, n: int):
+    from src.dataset import open_hotpot_qa
+    from scripts.bench_concurrency import make_dataset
+    try:
+        data = open_hotpot_qa(path)
+    except FileNotFoundError:
+        print(f"[DATA] {path} not found → synthetic questions")
+        return make_dataset(n)
+    return [data[i] for i in range(min(n, len(data)))]
+
+
+def first_difference(expected: dict, actual: dict):
+    """다른 키 목록 (기록에만 / replay에만 있는 키 포함)"""
+    keys = sorted(set(expected) | set(actual))
+    return [k for k in keys if expected.get(k) != actual.get(k)]
+
+
+def record(args) -> None:
+    samples = load_samples(args.dataset, args.samples)
+    config = {**config_snapshot(), "backend": LLM_BACKEND}
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    calls = 0
+    start = time.perf_counter()
+    with open(args.out, "w", encoding="utf-8") as f:
+        for q, sample in enumerate(samples):
+            with record_question(sample["question"], sample["context"], config) as rec, \
+                    contextlib.redirect_stdout(io.StringIO()):
+                state = run_question(sample["question"], sample["context"])
+                rec.record_final(state)
+            rec.write(f, q)
+            calls += len(rec.llm)
+    elapsed = time.perf_counter() - start
+    print(f"\nRecorded {len(samples)} questions, {calls} LLM calls → {args.out} ({elapsed:.1f}s)")
+
+
+def replay(args) -> int:
+    traces = load_traces(args.trace)
+    if not traces:
+        print(f"No traces in {args.trace}")
+        return 1
+
+    current = config_snapshot()
+    recorded = {k: v for k, v in traces[0]["config"].items() if k != "backend"}
+    changed = {k: (v, current.get(k)) for k, v in recorded.items() if current.get(k) != v}
+    if changed:
+        print(f"⚠️ config differs from recording (recorded, current): {changed}")
+
+    # 기록된 응답만 사용 (로컬 응답 캐시 / 네트워크 우회)
+    cache.LLM_CACHE = "off"
+    responses = {r["key"]: r["response"] for t in traces for r in t["llm"]}
+    backend = MockBackend(replay=responses, strict=True)
+    set_backend(backend)
+
+    walls, orchestration = [], []
+    mismatches, failures = [], []
+    for rep in range(args.repeat):
+        for q, trace in enumerate(traces):
+            with track_question() as qm, record_question(trace["question"], trace["context"]) as rec, \
+                    contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                try:
+                    state = run_question(trace["question"], trace["context"])
+                except Exception as e:
+                    failures.append((q, f"{type(e).__name__}: {e}"))
+                    continue
+                wall = time.perf_counter() - start
+            llm_time = sum(sum(d) for d in qm.span_latencies("llm").values())
+            walls.append(wall)
+            orchestration.append(wall - llm_time)
+
+            if rep > 0:
+                continue
+            diff = first_difference(trace["final"] or {}, comparable_state(state))
+            expected_nodes = [n["name"] for n in trace["nodes"]]
+            if diff or rec.node_sequence != expected_nodes:
+                mismatches.append((q, diff, expected_nodes, rec.node_sequence))
+
+    print(f"\n{'='*70}")
+    print(f"{len(traces)} questions x {args.repeat}, "
+          f"{sum(len(t['llm']) for t in traces)} recorded LLM calls, mock stats={backend.stats}")
+    if walls:
+        total = sum(walls)
+        wall_p = percentiles(walls)
+        orch_p = percentiles(orchestration)
+        print(f"throughput     : {len(walls) / total:.1f} q/s ({total:.2f}s)")
+        print(f"wall / question: mean={total / len(walls) * 1000:.2f}ms  "
+              f"p50={wall_p['p50'] * 1000:.2f}ms  p95={wall_p['p95'] * 1000:.2f}ms")
+        print(f"orchestration  : mean={sum(orchestration) / len(orchestration) * 1000:.2f}ms  "
+              f"p50={orch_p['p50'] * 1000:.2f}ms  p95={orch_p['p95'] * 1000:.2f}ms  (wall - llm spans)")
+
+    for q, error in failures[:10]:
+        print(f"❌ q{q}: {error}")
+    for q, diff, expected_nodes, actual_nodes in mismatches[:10]:
+        print(f"❌ q{q}: state keys differ={diff}")
+        if expected_nodes != actual_nodes:
+            print(f"     nodes recorded={expected_nodes}")
+            print(f"     nodes replayed={actual_nodes}")
+    ok = not failures and not mismatches
+    print(f"{'✅ identical' if ok else '❌'}: {len(traces) - len(mismatches) - len({q for q, _ in failures})}"
+          f"/{len(traces)} questions reproduced")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_record = sub.add_parser("record", help="질문 실행 + 기록")
+    p_record.add_argument("--dataset", type=Path, default=Path("data/hotpot_dev_distractor_v1.json"))
+    p_record.add_argument("--samples", type=int, default=20)
+    p_record.add_argument("--out", type=Path, default=Path("traces/replay.jsonl"))
+
+    p_replay = sub.add_parser("replay", help="기록 재실행 (네트워크 없음)")
+    p_replay.add_argument("trace", type=Path)
+    p_replay.add_argument("--repeat", type=int, default=1, help="처리량 측정용 반복 횟수")
+
+    args = parser.parse_args()
+    if args.command == "record":
+        record(args)
+    else:
+        sys.exit(replay(args))
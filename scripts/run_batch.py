@@ -1,23 +1,300 @@
 import os
 import json
 import time
+import asyncio
 import random
 import traceback
 from pathlib import Path
+from typing import Callable, Dict, List
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
-from src.graph import run_question
-from src.utils import load_hotpot_qa, evaluate
+# 우리가 만든 모듈들 가져오기
+from src.graph import run_question, arun_question
+from src.utils import evaluate, aclose_llm_client
+from src.dataset import open_hotpot_qa
+from src.cache import get_llm_cache
+from src.prompts import PROMPT_LAYOUT
+from src.scheduler import get_scheduler
+from src.structured import STRUCTURED_OUTPUT, structured_stats
+from src.dense import dense_stats
+from src.results import JsonlResultWriter, read_jsonl_results, completed_indices
+from src.metrics import QuestionMetrics, track_question, aggregate_by_agent, latency_summary, percentiles
+from src.nodes import FUSED_JUDGE, FAST_PATH, JUDGE_BATCH, judge_batch_stats
 
-import os
-import json
-import time
-import random
-import traceback
-from pathlib import Path
+# 질문별 Chrome trace (chrome://tracing, ui.perfetto.dev) 저장 위치. 비우면 저장 안 함
+TRACE_DIR = os.getenv("TRACE_DIR", "")
+
+
+def _print_header(k: int, total: int, idx: int, sample: Dict) -> None:
+    print(f"\n{'#'*70}")
+    print(f"🔬 테스트 {k}/{total} (Index: {idx})")
+    print(f"{'#'*70}")
+    print(f"Question: {sample['question']}")
+    print(f"Gold: {sample['answer']}")
+    print(f"Type: {sample.get('type', 'unknown')}")
+    print(f"{'='*70}\n")
+
+
+def _build_info(idx: int, sample: Dict, result: Dict, latency: float, qm: QuestionMetrics) -> Dict:
+    """실행 결과 평가 (utils.py에서 가져온 함수) → info 레코드"""
+    predicted = result.get("answer", "")
+    gold = sample["answer"]
+    metrics = evaluate(predicted, gold)
+
+    print(f"\n{'='*70}")
+    print(f"📊 결과 요약 (Index: {idx})")
+    print(f"{'='*70}")
+    print(f"Predicted: {predicted}")
+    print(f"Gold: {gold}")
+    print(f"EM: {metrics['em']}, F1: {metrics['f1']:.4f}")
+    print(f"{'='*70}")
+
+    return {
+        "index": idx,
+        "question": sample["question"],
+        "gold": gold,
+        "predicted": predicted,
+        "em": metrics["em"],
+        "f1": metrics["f1"],
+        "type": sample.get("type", "unknown"),
+        "level": sample.get("level", "unknown"),
+        "plan": result.get("plan", []),
+        "step_count": len(result.get("step_answers", [])),
+        "latency": latency,
+        **qm.to_dict(),
+        **_fast_path_info(result, gold)
+    }
+
+
+def _fast_path_info(result: Dict, gold: str) -> Dict:
+    """fast path 결과 + 그 답변 기준 EM/F1 (shadow 모드에서 전체 루프와 비교용)"""
+    fast_path = result.get("fast_path")
+    if not fast_path:
+        return {}
+    fast_path = dict(fast_path)
+    scores = evaluate(fast_path["answer"], gold)
+    fast_path["em"] = scores["em"]
+    fast_path["f1"] = scores["f1"]
+    return {"fast_path": fast_path}
+
+
+def _fast_path_summary(infos: List[Dict]) -> Dict:
+    """
+    fast path 적중률 / 지연 절감 / EM·F1 차이 (전체, type별, level별)
+
+    - shadow: 적중 질문에서 fast path 답 vs 전체 루프 답 EM/F1 차이,
+              절감 지연 = 질문 지연 - fast path 노드 지연
+    - on    : 적중 질문은 전체 루프를 돌지 않으므로 EM/F1 차이 대신 적중 / 미적중 성능,
+              절감 지연 = (미적중 평균 지연 - 적중 평균 지연) × 적중 수 (추정)
+    """
+    def summarize(group: List[Dict]) -> Dict:
+        hits = [info for info in group if info["fast_path"]["hit"]]
+        misses = [info for info in group if not info["fast_path"]["hit"]]
+        avg = lambda xs: sum(xs) / len(xs) if xs else 0.0
+        stats = {
+            "count": len(group),
+            "hits": len(hits),
+            "hit_rate": len(hits) / len(group) if group else 0.0,
+            "hit_em": avg([info["em"] for info in hits]),
+            "hit_f1": avg([info["f1"] for info in hits]),
+            "miss_em": avg([info["em"] for info in misses]),
+            "miss_f1": avg([info["f1"] for info in misses]),
+        }
+        if FAST_PATH == "shadow":
+            stats["fast_em"] = avg([info["fast_path"]["em"] for info in hits])
+            stats["fast_f1"] = avg([info["fast_path"]["f1"] for info in hits])
+            stats["em_delta"] = stats["fast_em"] - stats["hit_em"]
+            stats["f1_delta"] = stats["fast_f1"] - stats["hit_f1"]
+            stats["latency_saved"] = sum(
+                info["latency"] - sum(info.get("node_latencies", {}).get("fast_path", [0.0]))
+                for info in hits
+            )
+        else:
+            hit_latency = avg([info["latency"] for info in hits])
+            miss_latency = avg([info["latency"] for info in misses])
+            stats["avg_hit_latency"] = hit_latency
+            stats["avg_miss_latency"] = miss_latency
+            stats["latency_saved"] = (miss_latency - hit_latency) * len(hits) if misses else 0.0
+        return stats
+
+    infos = [info for info in infos if info.get("fast_path")]
+    if not infos:
+        return {}
+
+    summary = {"mode": FAST_PATH, "overall": summarize(infos)}
+    for key in ("type", "level"):
+        groups = {}
+        for info in infos:
+            groups.setdefault(info.get(key, "unknown"), []).append(info)
+        summary[f"by_{key}"] = {name: summarize(group) for name, group in sorted(groups.items())}
+    return summary
+
+
+def _print_usage_by_agent(usage_by_agent: Dict[str, Dict], total_cost: float) -> None:
+    print(f"\n{'='*70}")
+    print("💰 에이전트별 사용량")
+    print(f"{'='*70}")
+    for agent, u in usage_by_agent.items():
+        print(f"{agent:12s}: calls={u['calls']:5d}  prompt={u['prompt_tokens']:9d} (cached {u['cached_ratio']:.0%})  "
+              f"completion={u['completion_tokens']:7d}  latency={u['latency']:8.1f}s  cost=${u['cost']:.4f}")
+    print(f"{'total':12s}: cost=${total_cost:.4f}")
+
+
+def _build_error_info(idx: int, sample: Dict, e: Exception, latency: float, qm: QuestionMetrics) -> Dict:
+    print(f"\n❌ [ERROR] 샘플 {idx} 실행 실패")
+    print(f"Error: {str(e)}")
+    traceback.print_exc()
+
+    return {
+        "index": idx,
+        "question": sample["question"],
+        "gold": sample["answer"],
+        "predicted": "",
+        "em": 0,
+        "f1": 0.0,
+        "type": sample.get("type", "unknown"),
+        "latency": latency,
+        **qm.to_dict(),
+        "error": str(e)
+    }
+
+
+def _save_trace(idx: int, qm: QuestionMetrics) -> None:
+    if not TRACE_DIR:
+        return
+    os.makedirs(TRACE_DIR, exist_ok=True)
+    with open(os.path.join(TRACE_DIR, f"{idx}.json"), "w", encoding="utf-8") as f:
+        json.dump(qm.to_chrome_trace(), f)
+
+
+def run_sample(k: int, total: int, idx: int, sample: Dict, run_fn: Callable = run_question) -> Dict:
+    """샘플 하나 실행 + 평가 → info 레코드"""
+    _print_header(k, total, idx, sample)
+
+    q_start = time.time()
+    with track_question() as qm:
+        try:
+            # 핵심 실행 (graph.py에서 가져온 함수)
+            result = run_fn(question=sample["question"], context=sample["context"])
+        except Exception as e:
+            return _build_error_info(idx, sample, e, time.time() - q_start, qm)
+        finally:
+            _save_trace(idx, qm)
+    return _build_info(idx, sample, result, time.time() - q_start, qm)
+
+
+async def arun_sample(k: int, total: int, idx: int, sample: Dict, run_fn: Callable = arun_question) -> Dict:
+    """run_sample의 async 버전"""
+    _print_header(k, total, idx, sample)
+
+    q_start = time.time()
+    with track_question() as qm:
+        try:
+            result = await run_fn(question=sample["question"], context=sample["context"])
+        except Exception as e:
+            return _build_error_info(idx, sample, e, time.time() - q_start, qm)
+        finally:
+            _save_trace(idx, qm)
+    return _build_info(idx, sample, result, time.time() - q_start, qm)
+
+
+def run_samples(
+    dataset,
+    idxs: List[int],
+    on_result: Callable[[int, Dict], None],
+    num_workers: int = 1,
+    run_fn: Callable = run_question
+) -> None:
+    """
+    샘플들을 최대 num_workers개씩 동시에 실행
+
+    완료 순서와 관계없이 on_result(k, info)는 항상 idxs 순서대로 호출된다.
+    """
+    total = len(idxs)
+
+    if num_workers <= 1:
+        for k, idx in enumerate(idxs, 1):
+            on_result(k, run_sample(k, total, idx, dataset[idx], run_fn))
+        return
+
+    queue = iter(enumerate(idxs, 1))
+    in_flight = {}  # future -> k
+    finished = {}   # k -> info (순서 대기 버퍼)
+    next_k = 1
+
+    executor = ThreadPoolExecutor(max_workers=num_workers)
+
+    def submit_next() -> bool:
+        item = next(queue, None)
+        if item is None:
+            return False
+        k, idx = item
+        in_flight[executor.submit(run_sample, k, total, idx, dataset[idx], run_fn)] = k
+        return True
+
+    try:
+        for _ in range(num_workers):
+            if not submit_next():
+                break
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                finished[in_flight.pop(future)] = future.result()
+                submit_next()
+
+            while next_k in finished:
+                on_result(next_k, finished.pop(next_k))
+                next_k += 1
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def arun_samples(
+    dataset,
+    idxs: List[int],
+    on_result: Callable[[int, Dict], None],
+    concurrency: int = 64,
+    run_fn: Callable = arun_question
+) -> None:
+    """
+    run_samples의 async 버전: 하나의 이벤트 루프에서 최대 concurrency개 질문 동시 실행
+
+    on_result(k, info)는 idxs 순서대로 호출된다.
+    """
+    total = len(idxs)
+    queue = iter(enumerate(idxs, 1))
+    in_flight = {}  # task -> k
+    finished = {}   # k -> info (순서 대기 버퍼)
+    next_k = 1
+
+    def submit_next() -> bool:
+        item = next(queue, None)
+        if item is None:
+            return False
+        k, idx = item
+        in_flight[asyncio.ensure_future(arun_sample(k, total, idx, dataset[idx], run_fn))] = k
+        return True
+
+    try:
+        for _ in range(concurrency):
+            if not submit_next():
+                break
+
+        while in_flight:
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                finished[in_flight.pop(task)] = task.result()
+                submit_next()
+
+            while next_k in finished:
+                on_result(next_k, finished.pop(next_k))
+                next_k += 1
+    finally:
+        for task in in_flight:
+            task.cancel()
+        await aclose_llm_client()
 
-# 우리가 만든 모듈들 가져오기
-from src.graph import run_question
-from src.utils import load_hotpot_qa, evaluate
 
 if __name__ == "__main__":
     # ----------------- 실험 설정 -----------------
@@ -26,11 +303,13 @@ if __name__ == "__main__":
     NUM_SAMPLES = 100
     SHUFFLE_SEED = 233
     PRINT_EVERY = 1
-    SAVE_EVERY = 5
-    
+    FSYNC_EVERY = int(os.getenv("FSYNC_EVERY", "1"))  # 0: flush만, N: N개마다 fsync
+    NUM_WORKERS = int(os.getenv("NUM_WORKERS", "1"))  # 동시에 실행할 질문 수
+    ASYNC_MODE = os.getenv("ASYNC_MODE", "0") == "1"  # 이벤트 루프 하나로 NUM_WORKERS개 동시 실행
+
     OUTPUT_DIR = 'result/MultiHop_QA'
     OUTPUT_FILE = os.path.join(OUTPUT_DIR, 'results.json')
-    PARTIAL_FILE = os.path.join(OUTPUT_DIR, 'results_partial.json')
+    RESULTS_JSONL = os.path.join(OUTPUT_DIR, 'results.jsonl')  # 샘플마다 한 줄씩 append
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
     # ----------------- 데이터 로드 -----------------
@@ -39,150 +318,99 @@ if __name__ == "__main__":
     print("="*70)
     print(f"Dataset: {DATASET_PATH}")
     print(f"Samples: {NUM_SAMPLES}")
+    print(f"Workers: {NUM_WORKERS} ({'async' if ASYNC_MODE else 'threads'})")
     print(f"Output: {OUTPUT_DIR}")
     print("="*70)
-    
-    dataset = load_hotpot_qa(DATASET_PATH)
-    
+
+    dataset = open_hotpot_qa(DATASET_PATH)  # 필요한 샘플만 lazy 파싱
+
     # 인덱스 섞기
     idxs = list(range(min(TOTAL_SIZE, len(dataset))))
     random.Random(SHUFFLE_SEED).shuffle(idxs)
     idxs = idxs[:NUM_SAMPLES]
-    
-    # 결과 저장용
-    rs = []  # F1 scores
-    infos = []  # 상세 정보
+
+    # 이어서 실행: JSONL에 이미 있는 index는 건너뜀
+    previous = read_jsonl_results(RESULTS_JSONL)
+    done = set(completed_indices(previous)) & set(idxs)
+    todo = [idx for idx in idxs if idx not in done]
+    if done:
+        print(f"♻️ [Resume] {len(done)}개 완료됨 → 남은 {len(todo)}개 실행 ({RESULTS_JSONL})")
+
+    # 진행 통계 (이전 실행 결과 포함)
+    rs = [previous[idx]["f1"] for idx in idxs if idx in done]  # F1 scores
+    ems = [previous[idx]["em"] for idx in idxs if idx in done]
+    n_run = 0  # 이번 실행에서 끝난 샘플 수
     start_time = time.time()
-    
+
+    writer = JsonlResultWriter(RESULTS_JSONL, fsync_every=FSYNC_EVERY)
+
+    def on_result(k: int, info: Dict) -> None:
+        global n_run
+        writer.write(info)
+        rs.append(info["f1"])
+        ems.append(info["em"])
+        n_run += 1
+
+        # 중간 통계
+        avg_f1 = sum(rs) / len(rs)
+        avg_em = sum(ems) / len(ems)
+        avg_time = (time.time() - start_time) / n_run
+
+        if (k % PRINT_EVERY) == 0:
+            print(f"\n{'='*70}")
+            print(f"📈 진행 상황 [{len(rs)}/{len(idxs)}]")
+            print(f"{'='*70}")
+            print(f"Average EM: {avg_em:.4f}")
+            print(f"Average F1: {avg_f1:.4f}")
+            print(f"Avg Time: {avg_time:.3f}s per question")
+            print(f"{'='*70}\n")
+
     # ----------------- Main Loop -----------------
     try:
-        for k, idx in enumerate(idxs, 1):
-            sample = dataset[idx]
-            
-            print(f"\n{'#'*70}")
-            print(f"🔬 테스트 {k}/{len(idxs)} (Index: {idx})")
-            print(f"{'#'*70}")
-            print(f"Question: {sample['question']}")
-            print(f"Gold: {sample['answer']}")
-            print(f"Type: {sample.get('type', 'unknown')}")
-            print(f"{'='*70}\n")
-            
-            try:
-                # ========================================
-                # 핵심 실행 (graph.py에서 가져온 함수)
-                # ========================================
-                result = run_question(
-                    question=sample["question"],
-                    context=sample["context"]
-                )
-                
-                # ========================================
-                # 결과 평가 (utils.py에서 가져온 함수)
-                # ========================================
-                predicted = result.get("answer", "")
-                gold = sample["answer"]
-                metrics = evaluate(predicted, gold)
-                
-                print(f"\n{'='*70}")
-                print(f"📊 결과 요약")
-                print(f"{'='*70}")
-                print(f"Predicted: {predicted}")
-                print(f"Gold: {gold}")
-                print(f"EM: {metrics['em']}, F1: {metrics['f1']:.4f}")
-                print(f"{'='*70}")
-                
-                # 결과 저장
-                f1_val = metrics['f1']
-                rs.append(f1_val)
-                
-                info = {
-                    "index": idx,
-                    "question": sample["question"],
-                    "gold": gold,
-                    "predicted": predicted,
-                    "em": metrics["em"],
-                    "f1": metrics["f1"],
-                    "type": sample.get("type", "unknown"),
-                    "level": sample.get("level", "unknown"),
-                    "plan": result.get("plan", []),
-                    "step_count": len(result.get("step_answers", []))
-                }
-                infos.append(info)
-                
-                # 중간 통계
-                avg_f1 = sum(rs) / len(rs)
-                avg_em = sum(info["em"] for info in infos) / len(infos)
-                avg_time = (time.time() - start_time) / len(rs)
-                
-                if (k % PRINT_EVERY) == 0:
-                    print(f"\n{'='*70}")
-                    print(f"📈 진행 상황 [{k}/{len(idxs)}]")
-                    print(f"{'='*70}")
-                    print(f"Average EM: {avg_em:.4f}")
-                    print(f"Average F1: {avg_f1:.4f}")
-                    print(f"Avg Time: {avg_time:.3f}s per question")
-                    print(f"{'='*70}\n")
-                
-                # 부분 저장
-                if (k % SAVE_EVERY) == 0:
-                    with open(PARTIAL_FILE, 'w', encoding='utf-8') as pf:
-                        json.dump(infos, pf, ensure_ascii=False, indent=2)
-                    print(f"💾 [Partial Save] {k}개 완료 → {PARTIAL_FILE}\n")
-            
-            except Exception as e:
-                print(f"\n❌ [ERROR] 샘플 {idx} 실행 실패")
-                print(f"Error: {str(e)}")
-                traceback.print_exc()
-                
-                infos.append({
-                    "index": idx,
-                    "question": sample["question"],
-                    "gold": sample["answer"],
-                    "predicted": "",
-                    "em": 0,
-                    "f1": 0.0,
-                    "type": sample.get("type", "unknown"),
-                    "error": str(e)
-                })
-                rs.append(0.0)
-                continue
-                
+        if ASYNC_MODE:
+            asyncio.run(arun_samples(dataset, todo, on_result, concurrency=NUM_WORKERS))
+        else:
+            run_samples(dataset, todo, on_result, num_workers=NUM_WORKERS)
+
     except KeyboardInterrupt:
-        print("\n⚠️ [중단됨] KeyboardInterrupt → 부분 저장 중...")
-        with open(PARTIAL_FILE, 'w', encoding='utf-8') as pf:
-            json.dump(infos, pf, ensure_ascii=False, indent=2)
-        print(f"💾 부분 결과 저장 완료: {PARTIAL_FILE}")
+        print(f"\n⚠️ [중단됨] KeyboardInterrupt → 완료된 {n_run}개는 {RESULTS_JSONL}에 저장됨 (다시 실행하면 이어서 진행)")
         raise
-    
+
     except Exception as e:
         print("\n❌ [ERROR] 실행 중 치명적 오류 발생")
         traceback.print_exc()
-        with open(PARTIAL_FILE, 'w', encoding='utf-8') as pf:
-            json.dump(infos, pf, ensure_ascii=False, indent=2)
-        print(f"💾 부분 결과 저장 완료: {PARTIAL_FILE}")
+        print(f"💾 완료된 {n_run}개는 {RESULTS_JSONL}에 저장됨 (다시 실행하면 이어서 진행)")
         raise
-    
-    # ----------------- 최종 결과 -----------------
+
+    finally:
+        writer.close()
+
+    # ----------------- 최종 결과 (JSONL에서 생성) -----------------
     print("\n" + "="*70)
     print("🎉 실험 완료!")
     print("="*70)
-    
+
+    records = read_jsonl_results(RESULTS_JSONL)
+    infos = [records[idx] for idx in idxs if idx in records]
+    rs = [info["f1"] for info in infos]
+
     final_em = sum(info["em"] for info in infos if "em" in info) / len(infos) if infos else 0.0
     final_f1 = sum(rs) / len(rs) if rs else 0.0
     total_time = time.time() - start_time
-    
+
     print(f"총 샘플: {len(rs)}")
     print(f"최종 EM: {final_em:.4f}")
     print(f"최종 F1: {final_f1:.4f}")
     print(f"총 시간: {total_time:.2f}s")
-    print(f"평균 시간: {total_time/len(rs):.2f}s per question")
-    
+    print(f"평균 시간: {total_time / max(n_run, 1):.2f}s per question (이번 실행 {n_run}개)")
+    print(f"평균 LLM 호출: {sum(info.get('llm_calls', 0) for info in infos) / max(len(infos), 1):.2f} per question (fused judge: {FUSED_JUDGE})")
+
     from collections import defaultdict
     by_type = defaultdict(list)
     for info in infos:
         if "type" in info and "f1" in info:
             by_type[info["type"]].append(info["f1"])
-    
+
     if by_type:
         print(f"\n{'='*70}")
         print("📊 타입별 성능")
@@ -190,16 +418,24 @@ if __name__ == "__main__":
         for qtype, f1_scores in sorted(by_type.items()):
             avg = sum(f1_scores) / len(f1_scores)
             print(f"{qtype:20s}: F1={avg:.4f} (n={len(f1_scores)})")
-    
+
     with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
         json.dump(infos, f, ensure_ascii=False, indent=2)
-    
+
     summary = {
         "num_samples": len(rs),
+        "num_workers": NUM_WORKERS,
+        "async_mode": ASYNC_MODE,
         "final_em": final_em,
         "final_f1": final_f1,
         "total_time": total_time,
-        "avg_time": total_time / len(rs) if rs else 0,
+        "avg_time": total_time / n_run if n_run else 0,
+        "avg_latency": sum(info.get("latency", 0) for info in infos) / len(infos) if infos else 0,
+        "avg_llm_calls": sum(info.get("llm_calls", 0) for info in infos) / len(infos) if infos else 0,
+        "fused_judge": FUSED_JUDGE,
+        "fast_path_mode": FAST_PATH,
+        "prompt_layout": PROMPT_LAYOUT,
+        "structured_output": STRUCTURED_OUTPUT,
         "by_type": {
             qtype: {
                 "avg_f1": sum(scores) / len(scores),
@@ -208,11 +444,80 @@ if __name__ == "__main__":
             for qtype, scores in by_type.items()
         }
     }
-    
+
+    # 에이전트별 토큰 / 비용
+    usage_by_agent = aggregate_by_agent(infos)
+    summary["total_prompt_tokens"] = sum(u["prompt_tokens"] for u in usage_by_agent.values())
+    summary["total_cached_tokens"] = sum(u["cached_tokens"] for u in usage_by_agent.values())
+    summary["total_completion_tokens"] = sum(u["completion_tokens"] for u in usage_by_agent.values())
+    summary["total_cost"] = sum(u["cost"] for u in usage_by_agent.values())
+    summary["usage_by_agent"] = usage_by_agent
+
+    if usage_by_agent:
+        _print_usage_by_agent(usage_by_agent, summary["total_cost"])
+
+    # 노드 / LLM 호출별 지연 분포
+    summary["latency_by_node"] = latency_summary(infos, "node_latencies")
+    summary["latency_by_llm_agent"] = latency_summary(infos, "llm_latencies")
+    latencies = [info["latency"] for info in infos if "latency" in info]
+    summary["latency_percentiles"] = percentiles(latencies)
+
+    if summary["latency_by_node"]:
+        print(f"\n{'='*70}")
+        print("⏱️ 노드 / LLM 호출별 지연 (s)")
+        print(f"{'='*70}")
+        for kind, table in (("node", summary["latency_by_node"]), ("llm", summary["latency_by_llm_agent"])):
+            for name, t in table.items():
+                print(f"{kind:4s} {name:12s}: n={t['count']:5d}  mean={t['mean']:7.3f}  "
+                      f"p50={t['p50']:7.3f}  p95={t['p95']:7.3f}  p99={t['p99']:7.3f}")
+        print(f"{'question':17s}: p50={summary['latency_percentiles']['p50']:.3f}  "
+              f"p95={summary['latency_percentiles']['p95']:.3f}  p99={summary['latency_percentiles']['p99']:.3f}")
+
+    # Fast path 적중률 / 지연 절감 / EM·F1 차이
+    fast_path_summary = _fast_path_summary(infos)
+    if fast_path_summary:
+        summary["fast_path"] = fast_path_summary
+        print(f"\n{'='*70}")
+        print(f"⚡ Fast path ({FAST_PATH})")
+        print(f"{'='*70}")
+        rows = [("overall", fast_path_summary["overall"])]
+        rows += [(f"type={k}", v) for k, v in fast_path_summary["by_type"].items()]
+        rows += [(f"level={k}", v) for k, v in fast_path_summary["by_level"].items()]
+        for name, fp in rows:
+            delta = f"  ΔEM={fp['em_delta']:+.4f}  ΔF1={fp['f1_delta']:+.4f}" if "f1_delta" in fp else ""
+            print(f"{name:20s}: hit={fp['hits']:4d}/{fp['count']:<4d} ({fp['hit_rate']:.2%})  "
+                  f"saved={fp['latency_saved']:8.1f}s{delta}")
+
+    # 증거 검증 micro-batching
+    if JUDGE_BATCH:
+        summary["judge_batch"] = judge_batch_stats()
+        print(f"Judge batching: {summary['judge_batch']}")
+
+    # dense 검색 인코더 호출 / 임베딩 캐시
+    dense = dense_stats()
+    if dense is not None:
+        summary["dense_retrieval"] = dense
+        print(f"Dense retrieval: {dense}")
+
+    # JSON 응답 파싱 실패율 (에이전트별, 이번 실행분)
+    summary["json_parse"] = structured_stats()
+    for agent, p in summary["json_parse"].items():
+        print(f"JSON parse {agent:10s}: calls={p['calls']:5d}  recovered={p['recovered']:4d}  "
+              f"repaired={p['repaired']:4d}  failed={p['failed']:4d} ({p['failure_rate']:.2%})")
+
+    # 재시도 / rate limit 대기 / queue depth
+    summary["llm_scheduler"] = get_scheduler().stats()
+    print(f"LLM Scheduler: {summary['llm_scheduler']}")
+
+    cache = get_llm_cache()
+    if cache is not None:
+        summary["llm_cache"] = cache.stats()
+        print(f"LLM Cache: {summary['llm_cache']}")
+
     summary_file = os.path.join(OUTPUT_DIR, 'summary.json')
     with open(summary_file, 'w', encoding='utf-8') as f:
         json.dump(summary, f, ensure_ascii=False, indent=2)
-    
+
     print(f"\n✅ 최종 결과 저장: {OUTPUT_FILE}")
     print(f"✅ 요약 저장: {summary_file}")
-    print("="*70)
\ No newline at end of file
+    print("="*70)
@@ -0,0 +1,246 @@
+"""
+로컬 OpenAI 호환 Stub 서버 (네트워크 없이 LLM 클라이언트 레이어 검증용)
+
+- POST /v1/chat/completions 에 고정 응답 반환
+- 서버가 수락한 TCP 커넥션 수 / 요청 수를 카운트 → keep-alive 재사용 확인
+- error_rate 비율로 429 (또는 error_status) 응답 주입 → 스케줄러 재시도 / Retry-After 검증
+- token_latency: 토큰당 생성 지연. stream=true면 SSE로 토큰마다 전송 (클라이언트가 중간에 끊으면 중단),
+  아니면 전체 생성 시간만큼 기다렸다가 한 번에 응답 → 스트리밍 조기 종료 효과 측정
+- response_format json_schema 요청이면 스키마를 만족하는 최소 JSON으로 응답 (provider 구조화 출력 흉내)
+- prefix_cache: provider prompt caching 흉내 (이전 요청과 공유한 prefix를 128 토큰 단위로,
+  1024 토큰 이상일 때 usage.prompt_tokens_details.cached_tokens로 보고, 토큰 ≈ 4글자)
+
+사용 예:
+    python -m scripts.stub_llm_server --port 8765
+    python -m scripts.stub_llm_server --port 8765 --error-rate 0.3 --retry-after 0.2
+    python -m scripts.stub_llm_server --port 8765 --latency 0.3 --token-latency 0.02 --reply "2. Because ..."
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=stub python -m scripts.run_batch
+"""
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.streaming import split_tokens
+
+
+def _schema_instance(schema: dict, text: str):
+    """response_format json_schema 흉내: 스키마를 만족하는 최소 값 (문자열은 고정 응답)"""
+    kind = schema.get("type")
+    if kind == "object":
+        return {k: _schema_instance(v, text) for k, v in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [_schema_instance(schema.get("items", {}), text)]
+    if kind in ("number", "integer"):
+        return 0
+    if kind == "boolean":
+        return True
+    return text
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive 허용
+
+    def setup(self):
+        super().setup()
+        self.server.count("connections")
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: dict, headers: dict = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        self.server.count("requests")
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        if self.server.should_fail():
+            self.server.count("errors")
+            headers = {}
+            if self.server.retry_after is not None:
+                headers["retry-after"] = str(self.server.retry_after)
+            self._send_json(self.server.error_status, {
+                "error": {"message": "Rate limit reached (stub)", "type": "requests", "code": "rate_limit_exceeded"}
+            }, headers)
+            return
+
+        content = self.server.reply
+        response_format = request.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            content = json.dumps(_schema_instance(response_format["json_schema"]["schema"], content))
+        prompt_text = "\n".join(m.get("content", "") for m in request.get("messages", []))
+        cached_tokens = self.server.cached_prefix(prompt_text)
+        usage = {
+            "prompt_tokens": len(prompt_text) // 4,
+            "completion_tokens": len(content.split()),
+            "total_tokens": 0,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens},
+        }
+        tokens = split_tokens(content)
+
+        if request.get("stream"):
+            self._stream(request, tokens, usage)
+            return
+
+        if self.server.token_latency:
+            time.sleep(self.server.token_latency * len(tokens))
+        self._send_json(200, {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        })
+
+    def _stream(self, request: dict, tokens, usage: dict):
+        """SSE (chunked): 토큰마다 delta 청크, 마지막에 usage 청크 (stream_options.include_usage)"""
+        self.server.count("streams")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def chunk(choices, extra=None):
+            payload = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": int(time.time()),
+                       "model": request.get("model", "stub"), "choices": choices, **(extra or {})}
+            return f"data: {json.dumps(payload)}\n\n"
+
+        events = [chunk([{"index": 0, "delta": {"role": "assistant", "content": token}, "finish_reason": None}])
+                  for token in tokens]
+        events.append(chunk([{"index": 0, "delta": {}, "finish_reason": "stop"}]))
+        if (request.get("stream_options") or {}).get("include_usage"):
+            events.append(chunk([], {"usage": usage}))
+        events.append("data: [DONE]\n\n")
+        try:
+            for i, event in enumerate(events):
+                if i < len(tokens) and self.server.token_latency:
+                    time.sleep(self.server.token_latency)
+                data = event.encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # 클라이언트가 답을 받고 스트림을 닫음
+            self.server.count("streams_closed_early")
+            self.close_connection = True
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        port: int = 0,
+        reply: str = "yes",
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 429,
+        retry_after: float = None,
+        seed: int = 0,
+        prefix_cache: bool = False,
+        token_latency: float = 0.0
+    ):
+        super().__init__(("127.0.0.1", port), StubHandler)
+        self.reply = reply
+        self.latency = latency
+        self.token_latency = token_latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.stats = {"connections": 0, "requests": 0, "errors": 0}
+        self._stats_lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self.prefix_cache = prefix_cache
+        self._prefixes = set()
+        self._thread = None
+
+    def cached_prefix(self, text: str) -> int:
+        """이전 요청들과 공유한 prefix 토큰 수 (128 토큰 단위, 1024 미만이면 0) + 이번 prefix 등록"""
+        if not self.prefix_cache:
+            return 0
+        block = 128 * 4
+        hashes = []
+        h = hashlib.sha256()
+        for end in range(block, len(text) + 1, block):
+            h.update(text[end - block:end].encode("utf-8"))
+            hashes.append((end // 4, h.copy().hexdigest()))
+        with self._stats_lock:
+            cached = max((tokens for tokens, digest in hashes if digest in self._prefixes), default=0)
+            self._prefixes.update(digest for _, digest in hashes)
+        return cached if cached >= 1024 else 0
+
+    def should_fail(self) -> bool:
+        with self._stats_lock:
+            return self.error_rate > 0 and self._rng.random() < self.error_rate
+
+    def count(self, key: str, n: int = 1):
+        with self._stats_lock:
+            self.stats[key] = self.stats.get(key, 0) + n
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StubLLMServer":
+        """백그라운드 스레드에서 실행"""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--reply", default="yes")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="이 비율의 요청에 에러 응답")
+    parser.add_argument("--error-status", type=int, default=429)
+    parser.add_argument("--retry-after", type=float, default=None, help="에러 응답의 Retry-After (초)")
+    parser.add_argument("--prefix-cache", action="store_true", help="prompt caching 흉내 (cached_tokens 보고)")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="토큰당 생성 지연 (초)")
+    args = parser.parse_args()
+
+    server = StubLLMServer(
+        args.port,
+        reply=args.reply,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        retry_after=args.retry_after,
+        prefix_cache=args.prefix_cache,
+        token_latency=args.token_latency
+    )
+    print(f"[STUB] Serving on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"[STUB] Stats: {server.stats}")
+        server.server_close()
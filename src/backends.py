@@ -0,0 +1,419 @@
+import os
+import json
+import math
+import time
+import random
+import asyncio
+import weakref
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from src.cache import make_cache_key
+from src.streaming import StopPredicate, read_until, split_tokens
+
+# ==============================
+# LLM 백엔드 (LLM_BACKEND로 선택)
+# ==============================
+#   openai - OpenAI chat completions (기본값)
+#   local  - OpenAI 호환 로컬 서버 (vLLM, llama.cpp server, Ollama 등), LLM_LOCAL_BASE_URL
+#   mock   - 네트워크 없는 스크립트 응답: 기록된 응답 replay + 에이전트 태그별 규칙 응답,
+#            지연 분포 설정 가능 (LLM_MOCK_LATENCY) → 그래프 / 동시성 / 캐시 코드 오프라인 부하 테스트
+#
+# call_llm / acall_llm은 캐시 / 스케줄러 / 사용량 기록만 담당하고 실제 호출은 백엔드에 맡긴다.
+
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai").lower()
+
+# HTTP 커넥션 풀 설정 (프로세스 전역 클라이언트 공유)
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "32"))
+LLM_KEEPALIVE = int(os.getenv("LLM_KEEPALIVE", str(LLM_POOL_SIZE)))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "10"))
+
+# OpenAI 호환 로컬 서버
+LLM_LOCAL_BASE_URL = os.getenv("LLM_LOCAL_BASE_URL", "http://127.0.0.1:8000/v1")
+LLM_LOCAL_API_KEY = os.getenv("LLM_LOCAL_API_KEY", "local")
+LLM_LOCAL_MODEL = os.getenv("LLM_LOCAL_MODEL", "")  # 비우면 call_llm의 model 그대로
+LLM_LOCAL_JSON_SCHEMA = os.getenv("LLM_LOCAL_JSON_SCHEMA", "0") == "1"  # 서버가 response_format json_schema 지원 (vLLM 등)
+
+# Mock
+LLM_MOCK_REPLAY = os.getenv("LLM_MOCK_REPLAY", "")      # 기록 파일 (JSONL), 비우면 규칙 응답만
+LLM_MOCK_LATENCY = os.getenv("LLM_MOCK_LATENCY", "0")   # 예: 0.05 / uniform:0.02,0.1 / lognormal:0.5,0.4
+LLM_MOCK_STRICT = os.getenv("LLM_MOCK_STRICT", "0") == "1"  # replay에 없는 요청이면 에러
+
+
+class Completion:
+    """백엔드 응답 (토큰 수를 모르면 None → call_llm이 로컬 계산, truncated: stop_when으로 조기 종료)"""
+
+    __slots__ = ("content", "prompt_tokens", "completion_tokens", "cached_tokens", "truncated")
+
+    def __init__(
+        self,
+        content: str,
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+        cached_tokens: int = 0,
+        truncated: bool = False
+    ):
+        self.content = content
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.cached_tokens = cached_tokens
+        self.truncated = truncated
+
+    @property
+    def total_tokens(self) -> int:
+        if self.prompt_tokens is None:
+            return 0
+        return self.prompt_tokens + (self.completion_tokens or 0)
+
+
+class LLMBackend:
+    """백엔드 인터페이스"""
+
+    name = "base"
+    supports_json_schema = False  # response_format={"type": "json_schema", ...} 지원 여부
+
+    def complete(self, system_prompt: str, user_prompt: str, model: str, temperature: float, agent: str = "",
+                 response_format: Optional[Dict] = None, stop_when: Optional[StopPredicate] = None) -> Completion:
+        """stop_when: 스트리밍으로 받다가 참이 되는 순간 끊고 그때까지의 텍스트 반환 (src.streaming)"""
+        raise NotImplementedError
+
+    async def acomplete(self, system_prompt: str, user_prompt: str, model: str, temperature: float, agent: str = "",
+                        response_format: Optional[Dict] = None, stop_when: Optional[StopPredicate] = None) -> Completion:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    async def aclose(self) -> None:
+        pass
+
+
+# ---------- OpenAI / OpenAI 호환 ----------
+
+def _completion_from_response(resp) -> Completion:
+    return _completion(resp.choices[0].message.content or "", getattr(resp, "usage", None))
+
+
+def _completion(content: str, usage) -> Completion:
+    if usage is None or usage.prompt_tokens is None:
+        return Completion(content)
+    details = getattr(usage, "prompt_tokens_details", None)
+    return Completion(
+        content,
+        usage.prompt_tokens,
+        usage.completion_tokens or 0,
+        getattr(details, "cached_tokens", None) or 0
+    )
+
+
+class OpenAIBackend(LLMBackend):
+    """
+    OpenAI chat completions (base_url을 주면 OpenAI 호환 서버)
+
+    sync 클라이언트는 프로세스 전역 하나 (keep-alive 커넥션 풀 재사용),
+    AsyncOpenAI는 이벤트 루프에 묶이므로 루프마다 하나씩 유지.
+    재시도는 src.scheduler가 담당하므로 클라이언트 자체 재시도는 끈다.
+    """
+
+    name = "openai"
+
+    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None, model_override: str = "", name: str = "openai",
+                 json_schema: bool = True):
+        self.name = name
+        self.supports_json_schema = json_schema
+        self.base_url = base_url
+        self.api_key = api_key
+        self.model_override = model_override
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._async_clients = weakref.WeakKeyDictionary()
+
+    def _client_kwargs(self) -> Dict:
+        kwargs = {"max_retries": 0}
+        if self.base_url:
+            kwargs["base_url"] = self.base_url
+        if self.api_key:
+            kwargs["api_key"] = self.api_key
+        return kwargs
+
+    def _limits(self):
+        import httpx
+        return dict(
+            limits=httpx.Limits(max_connections=LLM_POOL_SIZE, max_keepalive_connections=LLM_KEEPALIVE),
+            timeout=httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+        )
+
+    def client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    import httpx
+                    from openai import OpenAI
+                    self._client = OpenAI(http_client=httpx.Client(**self._limits()), **self._client_kwargs())
+        return self._client
+
+    def async_client(self):
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            import httpx
+            from openai import AsyncOpenAI
+            client = AsyncOpenAI(http_client=httpx.AsyncClient(**self._limits()), **self._client_kwargs())
+            self._async_clients[loop] = client
+        return client
+
+    def _request(self, system_prompt: str, user_prompt: str, model: str, temperature: float,
+                 response_format: Optional[Dict] = None) -> Dict:
+        request = dict(
+            model=self.model_override or model,
+            temperature=temperature,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+        )
+        if response_format is not None and self.supports_json_schema:
+            request["response_format"] = response_format
+        return request
+
+    def complete(self, system_prompt, user_prompt, model, temperature, agent="", response_format=None, stop_when=None):
+        request = self._request(system_prompt, user_prompt, model, temperature, response_format)
+        if stop_when is not None:
+            return self._complete_stream(request, stop_when)
+        resp = self.client().chat.completions.create(**request)
+        return _completion_from_response(resp)
+
+    async def acomplete(self, system_prompt, user_prompt, model, temperature, agent="", response_format=None, stop_when=None):
+        request = self._request(system_prompt, user_prompt, model, temperature, response_format)
+        if stop_when is not None:
+            return await self._acomplete_stream(request, stop_when)
+        resp = await self.async_client().chat.completions.create(**request)
+        return _completion_from_response(resp)
+
+    # 스트리밍: 조기 종료하면 usage 청크를 못 받으므로 토큰 수는 None (call_llm이 로컬 계산)
+    def _complete_stream(self, request: Dict, stop_when: StopPredicate) -> Completion:
+        stream = self.client().chat.completions.create(**request, stream=True, stream_options={"include_usage": True})
+        text, usage = "", None
+        try:
+            for chunk in stream:
+                usage = chunk.usage or usage
+                if chunk.choices:
+                    text += chunk.choices[0].delta.content or ""
+                    if stop_when(text):
+                        return Completion(text, truncated=True)
+        finally:
+            stream.close()  # 남은 응답을 읽지 않고 연결 종료
+        return _completion(text, usage)
+
+    async def _acomplete_stream(self, request: Dict, stop_when: StopPredicate) -> Completion:
+        stream = await self.async_client().chat.completions.create(**request, stream=True, stream_options={"include_usage": True})
+        text, usage = "", None
+        try:
+            async for chunk in stream:
+                usage = chunk.usage or usage
+                if chunk.choices:
+                    text += chunk.choices[0].delta.content or ""
+                    if stop_when(text):
+                        return Completion(text, truncated=True)
+        finally:
+            await stream.close()
+        return _completion(text, usage)
+
+    def close(self) -> None:
+        """커넥션 풀 정리 (프로세스 종료 시 자동 호출)"""
+        with self._client_lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    async def aclose(self) -> None:
+        """현재 이벤트 루프의 async 커넥션 풀 정리 (루프 종료 전에 호출)"""
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+
+
+# ---------- Mock ----------
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    지연 분포 문자열 → sampler(rng) (초)
+
+    0.05 / const:0.05 / uniform:lo,hi / normal:mean,std / lognormal:median,sigma / exp:mean
+    """
+    spec = (spec or "0").strip()
+    kind, _, params = spec.partition(":")
+    if not params:
+        kind, params = "const", kind
+    values = [float(v) for v in params.split(",")]
+
+    if kind == "const":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    if kind == "exp":
+        return lambda rng: rng.expovariate(1.0 / values[0])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def _rule_judge(system_prompt: str, user_prompt: str) -> str:
+    if '"sufficient"' in user_prompt:  # FUSED_JUDGE
+        return '{"sufficient": true, "answer": "1970"}'
+    return "yes"
+
+
+def _rule_judge_batch(system_prompt: str, user_prompt: str) -> str:
+    return json.dumps({"verdicts": ["yes"] * user_prompt.count("### Item ")})
+
+
+# 에이전트 태그별 규칙 응답 (src.nodes의 agent= 값)
+DEFAULT_RULES: Dict[str, Callable[[str, str], str]] = {
+    "planner": lambda s, u: '{"plan": ["Find the director of the film.", "Find the birth year of that director (from step 1)."]}',
+    "replanner": lambda s, u: '{"plan": ["Find information to answer the question."]}',
+    "fast_path": lambda s, u: '{"answer": "1970", "confidence": 0.9, "evidence": [[1, 0]]}',
+    "selector": lambda s, u: "1",
+    "extractor": lambda s, u: "The director was born in 1970.",
+    "judge": _rule_judge,
+    "judge_batch": _rule_judge_batch,
+    "step_answer": lambda s, u: "1970",
+    "synthesizer": lambda s, u: "1970",
+    "answer": lambda s, u: '{"question_type": "when", "final_answer": "1970", "reasoning": "mock"}',
+    "": lambda s, u: "1970",
+}
+
+
+def load_replay(path) -> Dict[str, str]:
+    """
+    기록 파일(JSONL) → {요청 키: 응답}
+
+    한 줄 = {"key", "response"} 또는 {"system_prompt", "user_prompt", "model", "temperature", "response"}
+    response가 없는 줄(노드 전이 기록 등)은 무시
+    """
+    responses = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if "response" not in record:
+                continue
+            key = record.get("key") or make_cache_key(
+                record["system_prompt"], record["user_prompt"], record["model"], record["temperature"]
+            )
+            responses[key] = record["response"]
+    return responses
+
+
+class MockBackend(LLMBackend):
+    """
+    스크립트 응답 백엔드 (네트워크 없음, 재현 가능)
+
+    - replay에 같은 요청 키가 있으면 기록된 응답, 없으면 rules[agent] 규칙 응답 (strict면 KeyError)
+    - 지연은 요청 키로 시드한 난수로 뽑음 → 스레드 / 태스크 실행 순서와 무관하게 요청마다 같은 지연
+    """
+
+    name = "mock"
+
+    def __init__(
+        self,
+        replay: Optional[Dict[str, str]] = None,
+        latency: str = "0",
+        strict: bool = False,
+        rules: Optional[Dict[str, Callable[[str, str], str]]] = None,
+        seed: int = 0
+    ):
+        self.replay = replay or {}
+        self.latency = parse_latency(latency)
+        self.strict = strict
+        self.rules = {**DEFAULT_RULES, **(rules or {})}
+        self.seed = seed
+        self.stats = {"calls": 0, "replayed": 0, "ruled": 0}
+        self._lock = threading.Lock()
+
+    def _respond(self, system_prompt, user_prompt, model, temperature, agent, stop_when=None):
+        key = make_cache_key(system_prompt, user_prompt, model, temperature)
+        if key in self.replay:
+            content, source = self.replay[key], "replayed"
+        elif self.strict:
+            raise KeyError(f"Mock replay miss ({agent or 'unknown'}): {key}")
+        else:
+            content, source = self.rules.get(agent, self.rules[""])(system_prompt, user_prompt), "ruled"
+
+        with self._lock:
+            self.stats["calls"] += 1
+            self.stats[source] += 1
+        delay = self.latency(random.Random(f"{self.seed}:{key}"))
+        stopped = False
+        if stop_when is not None:
+            # 스트리밍 흉내: 토큰 단위로 이어 붙이다 predicate가 참이면 끊고, 지연도 받은 토큰 비율만큼
+            tokens = split_tokens(content)
+            content, stopped = read_until(tokens, stop_when)
+            if stopped:
+                delay *= len(split_tokens(content)) / max(len(tokens), 1)
+        completion = Completion(
+            content,
+            (len(system_prompt) + len(user_prompt)) // 4,
+            len(content) // 4,
+            truncated=stopped
+        )
+        return completion, delay
+
+    def complete(self, system_prompt, user_prompt, model, temperature, agent="", response_format=None, stop_when=None):
+        completion, delay = self._respond(system_prompt, user_prompt, model, temperature, agent, stop_when)
+        if delay > 0:
+            time.sleep(delay)
+        return completion
+
+    async def acomplete(self, system_prompt, user_prompt, model, temperature, agent="", response_format=None, stop_when=None):
+        completion, delay = self._respond(system_prompt, user_prompt, model, temperature, agent, stop_when)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return completion
+
+
+# ---------- 선택 ----------
+
+def create_backend(name: str = LLM_BACKEND) -> LLMBackend:
+    if name == "openai":
+        return OpenAIBackend()
+    if name == "local":
+        return OpenAIBackend(LLM_LOCAL_BASE_URL, LLM_LOCAL_API_KEY, LLM_LOCAL_MODEL, name="local",
+                             json_schema=LLM_LOCAL_JSON_SCHEMA)
+    if name == "mock":
+        replay = load_replay(Path(LLM_MOCK_REPLAY)) if LLM_MOCK_REPLAY else None
+        return MockBackend(replay, latency=LLM_MOCK_LATENCY, strict=LLM_MOCK_STRICT)
+    raise ValueError(f"Unknown LLM_BACKEND: {name} (openai / local / mock)")
+
+
+_backend: Optional[LLMBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> LLMBackend:
+    """프로세스 전역 백엔드 (LLM_BACKEND 기준, 처음 호출 시 생성)"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend()
+    return _backend
+
+
+def peek_backend() -> Optional[LLMBackend]:
+    """이미 만들어진 백엔드 (없으면 None, 새로 만들지 않음)"""
+    return _backend
+
+
+def set_backend(backend: LLMBackend) -> Optional[LLMBackend]:
+    """백엔드 교체 (벤치마크 / replay용) → 이전 백엔드"""
+    global _backend
+    with _backend_lock:
+        previous, _backend = _backend, backend
+    return previous
@@ -0,0 +1,156 @@
+import time
+import asyncio
+import weakref
+import threading
+import contextvars
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, List, Optional
+
+# ==============================
+# Micro-batching (동시 실행 중인 질문들의 작은 요청 묶기)
+# ==============================
+# 여러 스레드 / 태스크가 submit(item)을 호출하면 window 초 동안 또는 max_size개가 찰 때까지 모아서
+# run_batch(items, contexts) 한 번으로 처리하고, 결과 리스트를 각 호출자에게 순서대로 돌려준다.
+# - MicroBatcher      : 스레드용. 대기 중인 호출자 하나가 leader가 되어 대기 후 직접 실행 (백그라운드 스레드 없음)
+#                       leader는 자기 결과가 나오면 바로 돌아가고, 남은 요청은 기다리던 다른 호출자가 이어받음
+# - AsyncMicroBatcher : asyncio용. 이벤트 루프마다 대기열을 따로 두고 call_later로 flush
+#
+# run_batch는 빈 contextvars 컨텍스트에서 실행된다 (leader / 첫 호출자의 질문 metrics / recorder에 섞이지 않도록).
+# contexts[i]는 items[i] 호출자의 submit 시점 컨텍스트 → 건별 호출 / 사용량 기록은 contexts[i].run(...)으로.
+
+BatchFn = Callable[[List[Any], List[contextvars.Context]], List[Any]]
+AsyncBatchFn = Callable[[List[Any], List[contextvars.Context]], Awaitable[List[Any]]]
+
+
+class MicroBatcher:
+    """스레드 간 micro-batching (submit은 결과가 나올 때까지 블록)"""
+
+    def __init__(self, run_batch: BatchFn, max_size: int = 16, window: float = 0.02):
+        self.run_batch = run_batch
+        self.max_size = max_size
+        self.window = window
+        self._cond = threading.Condition()
+        self._pending = []  # [(item, Future, Context)]
+        self._leader_active = False
+        self.stats = {"items": 0, "batches": 0, "max_batch": 0}
+
+    def submit(self, item: Any) -> Any:
+        future = Future()
+        with self._cond:
+            self._pending.append((item, future, contextvars.copy_context()))
+            self._cond.notify_all()
+            # 결과가 나오거나 leader 자리가 빌 때까지 대기
+            while not future.done() and self._leader_active:
+                self._cond.wait()
+            leader = not future.done()
+            if leader:
+                self._leader_active = True
+
+        if leader:
+            self._lead(future)
+        return future.result()
+
+    def _lead(self, own: Future) -> None:
+        """자기 요청 결과가 나올 때까지 window / max_size 단위로 배치 실행"""
+        while True:
+            deadline = time.monotonic() + self.window
+            with self._cond:
+                while len(self._pending) < self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._pending[:self.max_size]
+                del self._pending[:self.max_size]
+
+            _run_and_resolve(self.run_batch, batch, self.stats)
+
+            with self._cond:
+                done = own.done() or not self._pending
+                if done:
+                    self._leader_active = False
+                self._cond.notify_all()  # 결과를 받은 호출자 깨움 (leader가 빠지면 남은 호출자 중 하나가 승계)
+                if done:
+                    return
+
+
+class _LoopQueue:
+    def __init__(self):
+        self.pending = []  # [(item, asyncio.Future, Context)]
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class AsyncMicroBatcher:
+    """이벤트 루프 내 micro-batching (루프마다 대기열 분리)"""
+
+    def __init__(self, arun_batch: AsyncBatchFn, max_size: int = 16, window: float = 0.02):
+        self.arun_batch = arun_batch
+        self.max_size = max_size
+        self.window = window
+        self._queues = weakref.WeakKeyDictionary()  # loop -> _LoopQueue
+        self._tasks = set()  # 실행 중인 배치 태스크 (참조를 안 잡으면 도중에 GC될 수 있음)
+        self.stats = {"items": 0, "batches": 0, "max_batch": 0}
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        queue = self._queues.get(loop)
+        if queue is None:
+            queue = self._queues[loop] = _LoopQueue()
+        future = loop.create_future()
+        queue.pending.append((item, future, contextvars.copy_context()))
+
+        if len(queue.pending) >= self.max_size:
+            self._flush(loop)
+        elif queue.timer is None:
+            queue.timer = loop.call_later(self.window, self._flush, loop)
+        return await future
+
+    def _flush(self, loop) -> None:
+        queue = self._queues.get(loop)
+        if queue is None:
+            return
+        if queue.timer is not None:
+            queue.timer.cancel()  # 크기로 flush한 경우 이전 window 타이머가 다음 배치를 일찍 보내지 않도록
+            queue.timer = None
+        if not queue.pending:
+            return
+        batch = queue.pending[:self.max_size]
+        del queue.pending[:self.max_size]
+        if queue.pending:
+            queue.timer = loop.call_later(self.window, self._flush, loop)
+        task = loop.create_task(self._run(batch), context=contextvars.Context())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch) -> None:
+        items = [item for item, _, _ in batch]
+        _count_batch(self.stats, len(items))
+        try:
+            results = await self.arun_batch(items, [ctx for _, _, ctx in batch])
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+def _count_batch(stats, n: int) -> None:
+    stats["items"] += n
+    stats["batches"] += 1
+    stats["max_batch"] = max(stats["max_batch"], n)
+
+
+def _run_and_resolve(run_batch: BatchFn, batch, stats) -> None:
+    items = [item for item, _, _ in batch]
+    _count_batch(stats, len(items))
+    try:
+        results = contextvars.Context().run(run_batch, items, [ctx for _, _, ctx in batch])
+    except Exception as e:
+        for _, future, _ in batch:
+            future.set_exception(e)
+        return
+    for (_, future, _), result in zip(batch, results):
+        future.set_result(result)
@@ -0,0 +1,157 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Optional, Dict
+
+# ==============================
+# LLM 응답 캐시 (content-addressed, SQLite)
+# ==============================
+# LLM_CACHE:
+#   off    - 캐시 사용 안 함 (기본값)
+#   on     - 조회 후 miss면 호출하고 저장
+#   replay - 읽기 전용, miss면 CacheMiss 발생 (네트워크 호출 없음)
+LLM_CACHE = os.getenv("LLM_CACHE", "off").lower()
+LLM_CACHE_PATH = Path(os.getenv("LLM_CACHE_PATH", "cache/llm_cache.sqlite"))
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "512"))
+
+
+EVICT_TARGET = 0.9  # eviction 후 총 크기 (max_bytes 대비)
+
+
+class CacheMiss(KeyError):
+    """replay 모드에서 캐시에 없는 요청"""
+
+
+def make_cache_key(system_prompt: str, user_prompt: str, model: str, temperature: float) -> str:
+    """(system, user, model, temperature) 해시"""
+    payload = json.dumps(
+        [system_prompt, user_prompt, model, round(float(temperature), 4)],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    SQLite 기반 응답 캐시
+
+    - key: make_cache_key() 해시
+    - 크기 기반 eviction: 총 응답 크기가 max_bytes를 넘으면 오래 안 쓴 항목부터 삭제
+      (총 크기는 열 때 한 번 계산하고 put마다 메모리에서 갱신 → 캐시가 커져도 put 비용 일정,
+       넘으면 max_bytes의 EVICT_TARGET까지 줄여서 한도 근처에서 put마다 eviction이 돌지 않도록)
+    - hits / misses 카운터
+    """
+
+    def __init__(self, path: Path = LLM_CACHE_PATH, max_mb: float = LLM_CACHE_MAX_MB, readonly: bool = False):
+        self.path = Path(path)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.readonly = readonly
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if readonly:
+            if not self.path.exists():
+                raise FileNotFoundError(f"Cache not found: {self.path}")
+            self._conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses(last_access)")
+            self._conn.commit()
+            self._total = self._stored_size()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if not self.readonly:
+                self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+                self._conn.commit()
+            return row[0]
+
+    def put(self, key: str, response: str) -> None:
+        if self.readonly:
+            return
+        size = len(response.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, created, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, response, size, now, now),
+            )
+            self._total += size - (old[0] if old else 0)
+            if self._total > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _stored_size(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _evict(self) -> None:
+        """총 크기가 한도를 넘으면 LRU 순으로 삭제 (lock 안에서 호출)"""
+        # 다른 프로세스가 같은 파일에 쓴 만큼은 메모리 합계에 없으므로 eviction 때만 다시 계산
+        self._total = self._stored_size()
+        if self._total <= self.max_bytes:
+            return
+        excess = self._total - int(self.max_bytes * EVICT_TARGET)
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        self._total -= freed
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+            "size_bytes": size,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """LLM_CACHE 설정에 따른 프로세스 전역 캐시 (off면 None)"""
+    global _cache
+    if LLM_CACHE not in ("on", "replay"):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMCache(readonly=(LLM_CACHE == "replay"))
+    return _cache
@@ -0,0 +1,567 @@
+import os
+import re
+import bz2
+import json
+import mmap
+import hashlib
+import threading
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.retrieval import tokenize
+
+# ==============================
+# Open-domain (fullwiki) 검색용 로컬 코퍼스 인덱스
+# ==============================
+# 질문에 hotpot_context가 없을 때(또는 OPEN_DOMAIN=on) Searcher가 10개 문단 대신 이 인덱스에서 후보를 가져온다.
+# 문단 덤프(HotpotQA fullwiki abstracts 등)로 scripts/build_corpus_index.py가 한 번만 만든다.
+#
+# 인덱스 디렉터리:
+#   index.json          {"docs", "shards", "avg_len", "k1", "b", "title_weight", "model", "dim", "sources", "ivf_lists"} (마지막에 써짐)
+#   shard_000/ ...      문단 shard_size개씩
+#     meta.json         {"docs", "start", "postings"}
+#     terms.npy         (T,) uint64  정렬된 term 해시 (어휘 사전을 메모리에 올리지 않도록 토큰 대신 64-bit 해시)
+#     term_offsets.npy  (T+1,) int64 term별 posting 구간
+#     post_docs.npy     int32        shard 내 문단 번호 (term별 오름차순)
+#     post_impact.npy   float32      BM25 tf 항 tf·(k1+1) / (tf + k1·(1-b+b·len/avg_len)) (빌드 끝에 전체 avg_len으로 계산)
+#                                    tf는 title 토큰 title_weight배 가중 (BM25Index와 같은 규칙)
+#     doc_len.npy       (n,) float32
+#     docs.jsonl / docs.idx   문단 본문 ([title, sentences] 한 줄씩) + uint64 오프셋 (src.dataset과 같은 방식)
+#     vectors.f32       (n, dim) float32, 선택 (정규화된 문단 임베딩, hybrid 검색용)
+#     ivf_centroids.npy / ivf_offsets.npy / ivf_ids.npy   선택 (build_ivf): vectors.f32를 클러스터 순서로 재배치,
+#                                    ivf_ids = 재배치된 위치 → shard 내 문단 번호
+#
+# 검색: BM25 (idf는 전체 shard 합산 df, 쿼리 term마다 posting 구간에 idf × impact 누적)
+#       → 선택적으로 vector top-N (IVF가 있으면 가까운 CORPUS_IVF_PROBE개 클러스터만)과 reciprocal rank fusion.
+# 모든 배열은 mmap으로 열어 posting / 벡터 중 실제로 읽은 페이지만 메모리에 올라온다.
+
+# OPEN_DOMAIN
+#   off  - 항상 hotpot_context 문단만 사용 (기본값)
+#   auto - hotpot_context가 비어 있는 질문만 코퍼스 검색
+#   on   - 주어진 context를 무시하고 항상 코퍼스 검색 (HotpotQA fullwiki 설정 평가용)
+OPEN_DOMAIN = os.getenv("OPEN_DOMAIN", "off").lower()
+CORPUS_INDEX = os.getenv("CORPUS_INDEX", "index/wiki")
+OPEN_DOMAIN_TOP_K = int(os.getenv("OPEN_DOMAIN_TOP_K", "10"))
+OPEN_DOMAIN_HYBRID = os.getenv("OPEN_DOMAIN_HYBRID", "0") == "1"  # 인덱스에 벡터가 있으면 BM25 + vector (dense 검색 모드는 항상)
+CORPUS_HYBRID_DEPTH = int(os.getenv("CORPUS_HYBRID_DEPTH", "100"))  # fusion 전에 방식별로 보는 후보 수
+CORPUS_RRF_K = int(os.getenv("CORPUS_RRF_K", "60"))
+CORPUS_IVF_PROBE = int(os.getenv("CORPUS_IVF_PROBE", "32"))  # IVF 인덱스에서 볼 클러스터 수
+
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def term_hash(token: str) -> int:
+    """토큰 → 64-bit 해시 (프로세스와 무관하게 같은 값)"""
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def query_hashes(query: str) -> np.ndarray:
+    return np.array(sorted({term_hash(t) for t in tokenize(query)}), dtype=np.uint64)
+
+
+# ---------- 문단 덤프 읽기 ----------
+
+def _paragraph_from_json(obj: Dict) -> Optional[Tuple[str, List[str]]]:
+    """{"title", "text": [문장] 또는 문자열} → (title, sentences) (HTML 링크 태그 제거)"""
+    title = obj.get("title")
+    text = obj.get("text")
+    if not title or not text:
+        return None
+    sentences = text if isinstance(text, list) else [text]
+    sentences = [_TAG_RE.sub("", s) for s in sentences if s and s.strip()]
+    return (title, sentences) if sentences else None
+
+
+def iter_corpus(paths: Sequence[Union[str, Path]]) -> Iterator[Tuple[str, List[str]]]:
+    """
+    문단 덤프 → (title, sentences)
+
+    - 디렉터리: 안의 파일들을 이름순으로 재귀 탐색
+    - *.bz2 / *.jsonl: 한 줄에 JSON 하나 (HotpotQA fullwiki abstracts 형식: title, text=[문장])
+    - *.json: HotpotQA 데이터셋 → 질문들의 context 문단 (중복 제거, train / dev 등 여러 파일에 걸쳐서도)
+    """
+    from src.dataset import open_hotpot_qa
+    from src.paragraph_store import paragraph_digest
+
+    files = []
+    for path in map(Path, paths):
+        files.extend(sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path])
+
+    seen = set()  # 데이터셋 문단 digest (같은 위키 문단이 여러 질문 / 여러 파일에 반복해서 나옴)
+    for path in files:
+        if path.suffix == ".json":
+            for item in open_hotpot_qa(path):
+                for title, sentences in item["context"]:
+                    digest = paragraph_digest(title, sentences)
+                    if digest not in seen:
+                        seen.add(digest)
+                        yield title, list(sentences)
+        elif path.suffix in (".bz2", ".jsonl"):
+            opener = bz2.open if path.suffix == ".bz2" else open
+            with opener(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        paragraph = _paragraph_from_json(json.loads(line))
+                        if paragraph is not None:
+                            yield paragraph
+
+
+# ---------- 빌드 ----------
+
+class _ShardWriter:
+    """shard 하나 분량의 문단을 모았다가 posting 배열 / 본문 파일로 기록"""
+
+    def __init__(self, out_dir: Path, start: int, title_weight: int, hashes: Dict[str, int]):
+        self.out_dir = out_dir
+        self.start = start
+        self.title_weight = title_weight
+        self.hashes = hashes  # 토큰 → 해시 (빌드 전체 공유 캐시)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        self.docs_file = open(out_dir / "docs.jsonl", "wb")
+        self.offsets = array("Q")
+        self.post_terms, self.post_docs, self.post_tf = array("Q"), array("i"), array("f")
+        self.doc_len = array("f")
+
+    def __len__(self) -> int:
+        return len(self.doc_len)
+
+    def add(self, title: str, sentences: List[str]) -> None:
+        doc = len(self.doc_len)
+        self.offsets.append(self.docs_file.tell())
+        self.docs_file.write(json.dumps([title, sentences], ensure_ascii=False).encode("utf-8") + b"\n")
+
+        tf = Counter(tokenize(title) * self.title_weight)
+        for sentence in sentences:
+            tf.update(tokenize(sentence))
+        hashes = self.hashes
+        for token, count in tf.items():
+            h = hashes.get(token)
+            if h is None:
+                h = hashes[token] = term_hash(token)
+            self.post_terms.append(h)
+            self.post_docs.append(doc)
+            self.post_tf.append(count)
+        self.doc_len.append(sum(tf.values()))
+
+    def close(self) -> Dict:
+        self.offsets.append(self.docs_file.tell())
+        self.docs_file.close()
+        (self.out_dir / "docs.idx").write_bytes(self.offsets.tobytes())
+
+        terms = np.frombuffer(self.post_terms, dtype=np.uint64)
+        order = np.argsort(terms, kind="stable")  # 같은 term 안에서는 문단 번호 순서 유지
+        terms = terms[order]
+        uniq, starts = np.unique(terms, return_index=True)
+        np.save(self.out_dir / "terms.npy", uniq)
+        np.save(self.out_dir / "term_offsets.npy", np.append(starts, len(terms)).astype(np.int64))
+        np.save(self.out_dir / "post_docs.npy", np.frombuffer(self.post_docs, dtype=np.int32)[order])
+        np.save(self.out_dir / "post_tf.npy", np.frombuffer(self.post_tf, dtype=np.float32)[order])  # impact 계산 후 삭제
+        np.save(self.out_dir / "doc_len.npy", np.frombuffer(self.doc_len, dtype=np.float32))
+
+        meta = {"docs": len(self.doc_len), "start": self.start, "postings": len(terms)}
+        (self.out_dir / "meta.json").write_text(json.dumps(meta))
+        return meta
+
+
+def build_corpus_index(
+    paragraphs: Iterable[Tuple[str, List[str]]],
+    out_dir: Path,
+    shard_size: int = 500_000,
+    title_weight: int = 2,
+    k1: float = 1.5,
+    b: float = 0.75,
+    encoder=None,
+    encode_chunk: int = 4096,
+    sources: Sequence[str] = (),
+) -> Dict:
+    """
+    (title, sentences) 스트림 → shard 인덱스
+
+    encoder(src.dense.DenseEncoder)를 주면 shard별 vectors.f32도 만든다 (hybrid 검색용).
+    """
+    from src.dense import paragraph_text, paragraph_hash
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    index_path = out_dir / "index.json"
+    if index_path.exists():
+        index_path.unlink()  # 빌드 도중 실패하면 미완성 인덱스로 남도록
+
+    hashes: Dict[str, int] = {}
+    shards, total_docs, total_len = [], 0, 0.0
+    writer, vectors_file, pending, dim = None, None, [], None
+
+    def flush_vectors():
+        nonlocal pending, dim
+        if encoder is None or not pending:
+            return
+        block = encoder.embed([paragraph_text(t, s) for t, s in pending], [paragraph_hash(t, s) for t, s in pending])
+        dim = int(block.shape[1])
+        vectors_file.write(block.astype(np.float32).tobytes())
+        pending = []
+
+    def close_shard():
+        nonlocal total_len
+        flush_vectors()
+        if vectors_file is not None:
+            vectors_file.close()
+        meta = writer.close()
+        total_len += float(np.load(writer.out_dir / "doc_len.npy").sum())
+        shards.append(writer.out_dir.name)
+        print(f"[INDEX] {writer.out_dir.name}: {meta['docs']} paragraphs, {meta['postings']} postings")
+
+    for title, sentences in paragraphs:
+        if writer is None or len(writer) >= shard_size:
+            if writer is not None:
+                close_shard()
+            writer = _ShardWriter(out_dir / f"shard_{len(shards):03d}", total_docs, title_weight, hashes)
+            vectors_file = open(writer.out_dir / "vectors.f32", "wb") if encoder is not None else None
+        writer.add(title, sentences)
+        total_docs += 1
+        if encoder is not None:
+            pending.append((title, sentences))
+            if len(pending) >= encode_chunk:
+                flush_vectors()
+    if writer is not None:
+        close_shard()
+
+    avg_len = total_len / total_docs if total_docs else 0.0
+    for name in shards:
+        _write_impacts(out_dir / name, avg_len or 1.0, k1, b)
+
+    meta = {
+        "docs": total_docs,
+        "shards": shards,
+        "avg_len": avg_len,
+        "k1": k1,
+        "b": b,
+        "title_weight": title_weight,
+        "model": encoder.model_name if encoder is not None else None,
+        "dim": dim,
+        "sources": list(sources),
+    }
+    index_path.write_text(json.dumps(meta, indent=2))
+    return meta
+
+
+def _write_impacts(shard_dir: Path, avg_len: float, k1: float, b: float) -> None:
+    """post_tf → post_impact (문서 길이 정규화까지 미리 계산, 쿼리 때는 idf만 곱함)"""
+    tf = np.load(shard_dir / "post_tf.npy")
+    doc_len = np.load(shard_dir / "doc_len.npy")
+    docs = np.load(shard_dir / "post_docs.npy")
+    impact = tf * (k1 + 1) / (tf + k1 * (1 - b + b * doc_len[docs] / avg_len))
+    np.save(shard_dir / "post_impact.npy", impact.astype(np.float32))
+    (shard_dir / "post_tf.npy").unlink()
+
+
+def _spherical_kmeans(sample: np.ndarray, n_lists: int, iters: int, rng) -> np.ndarray:
+    """정규화 벡터 k-means (내적 기준 할당, 중심도 정규화) → (n_lists, dim)"""
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+    for _ in range(iters):
+        assign = _assign(sample, centroids)
+        order = np.argsort(assign, kind="stable")
+        lists, starts = np.unique(assign[order], return_index=True)
+        centroids[lists] = np.add.reduceat(sample[order], starts, axis=0)  # 빈 클러스터는 이전 중심 유지
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+    return centroids
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, chunk: int = 16_384) -> np.ndarray:
+    return np.concatenate([
+        np.argmax(np.asarray(vectors[i:i + chunk], dtype=np.float32) @ centroids.T, axis=1)
+        for i in range(0, len(vectors), chunk)
+    ]) if len(vectors) else np.zeros(0, dtype=np.int64)
+
+
+def build_ivf(index_dir: Path, n_lists: int, sample: int = 100_000, iters: int = 10, seed: int = 0) -> None:
+    """
+    벡터가 있는 인덱스에 shard별 IVF 추가 (spherical k-means 클러스터 + 클러스터 순서로 vectors.f32 재배치)
+
+    flat 검색은 쿼리마다 전체 벡터를 읽어 문단 수에 비례하지만,
+    IVF는 가까운 CORPUS_IVF_PROBE개 클러스터의 연속 구간만 읽는다 (근사 검색).
+    """
+    index_dir = Path(index_dir)
+    meta = json.loads((index_dir / "index.json").read_text())
+    dim = meta["dim"]
+    rng = np.random.default_rng(seed)
+    for name in meta["shards"]:
+        shard_dir = index_dir / name
+        n = json.loads((shard_dir / "meta.json").read_text())["docs"]
+        vectors = np.memmap(shard_dir / "vectors.f32", dtype=np.float32, mode="r", shape=(n, dim))
+        if (shard_dir / "ivf_ids.npy").exists():  # vectors.f32가 이미 클러스터 순서로 재배치됨
+            raise RuntimeError(f"{shard_dir} already has an IVF index; rebuild the corpus index first")
+        lists = min(n_lists, n)
+        rows = np.sort(rng.choice(n, min(sample, n), replace=False))
+        centroids = _spherical_kmeans(np.asarray(vectors[rows]), lists, iters, rng)
+        assign = _assign(vectors, centroids)
+        order = np.argsort(assign, kind="stable").astype(np.int32)
+        offsets = np.searchsorted(assign[order], np.arange(lists + 1)).astype(np.int64)
+
+        tmp = shard_dir / "vectors.f32.tmp"
+        with open(tmp, "wb") as f:
+            for i in range(0, n, 65_536):
+                f.write(np.asarray(vectors[order[i:i + 65_536]]).tobytes())
+        del vectors
+        os.replace(tmp, shard_dir / "vectors.f32")
+        np.save(shard_dir / "ivf_centroids.npy", centroids.astype(np.float32))
+        np.save(shard_dir / "ivf_offsets.npy", offsets)
+        np.save(shard_dir / "ivf_ids.npy", order)
+        print(f"[INDEX] {name}: IVF {lists} lists (sizes p50={int(np.median(np.diff(offsets)))}, max={int(np.diff(offsets).max())})")
+    meta["ivf_lists"] = n_lists
+    (index_dir / "index.json").write_text(json.dumps(meta, indent=2))
+
+
+# ---------- 검색 ----------
+
+def _load(path: Path) -> np.ndarray:
+    # np.memmap 서브클래스는 슬라이스마다 비용이 커서 같은 매핑을 보는 일반 ndarray view로 사용
+    return np.load(path, mmap_mode="r").view(np.ndarray)
+
+
+def _top(scores: np.ndarray, k: int) -> np.ndarray:
+    """점수 상위 k개 위치 (점수 내림차순, 동점은 번호 순)"""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    part = np.argpartition(-scores, k - 1)[:k]
+    return part[np.lexsort((part, -scores[part]))]
+
+
+class CorpusShard:
+    """mmap으로 연 shard 하나"""
+
+    def __init__(self, path: Path, dim: Optional[int]):
+        self.path = path
+        self.meta = json.loads((path / "meta.json").read_text())
+        self.start = self.meta["start"]
+        self.n = self.meta["docs"]
+        self.terms = _load(path / "terms.npy")
+        self.term_offsets = _load(path / "term_offsets.npy")
+        self.post_docs = _load(path / "post_docs.npy")
+        self.post_impact = _load(path / "post_impact.npy")
+        self.doc_len = _load(path / "doc_len.npy")
+
+        self._docs_file = open(path / "docs.jsonl", "rb")
+        self._docs = mmap.mmap(self._docs_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._doc_offsets = np.fromfile(path / "docs.idx", dtype=np.uint64)
+
+        vectors_path = path / "vectors.f32"
+        self.vectors = None
+        if dim and vectors_path.exists():
+            self.vectors = np.memmap(vectors_path, dtype=np.float32, mode="r", shape=(self.n, dim)).view(np.ndarray)
+
+        self.ivf_ids = self.ivf_offsets = self.ivf_centroids = None
+        if (path / "ivf_ids.npy").exists():
+            self.ivf_ids = _load(path / "ivf_ids.npy")
+            self.ivf_offsets = np.load(path / "ivf_offsets.npy")
+            self.ivf_centroids = np.load(path / "ivf_centroids.npy")
+
+    def postings(self, hashes: np.ndarray) -> List[Tuple[int, int]]:
+        """쿼리 term 해시별 posting 구간 (없는 term은 (0, 0))"""
+        if len(self.terms) == 0:
+            return [(0, 0)] * len(hashes)
+        pos = np.minimum(np.searchsorted(self.terms, hashes), len(self.terms) - 1)
+        found = self.terms[pos] == hashes
+        return [
+            (int(self.term_offsets[p]), int(self.term_offsets[p + 1])) if ok else (0, 0)
+            for p, ok in zip(pos, found)
+        ]
+
+    def bm25(self, spans, idf: np.ndarray, depth: int) -> Tuple[np.ndarray, np.ndarray]:
+        """BM25 상위 depth개 (shard 내 번호, 점수), idf는 float32"""
+        scores = np.zeros(self.n, dtype=np.float32)
+        touched = False
+        for (a, z), w in zip(spans, idf):
+            if a == z:
+                continue
+            # term 하나의 posting 안에서 문단 번호는 중복 없음 (fancy-index += 가 안전)
+            scores[self.post_docs[a:z]] += w * self.post_impact[a:z]
+            touched = True
+        if not touched:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        top = _top(scores, depth)
+        top = top[scores[top] > 0]
+        return top, scores[top]
+
+    def dense(self, query_vector: np.ndarray, depth: int, n_probe: int = CORPUS_IVF_PROBE,
+              chunk: int = 262_144) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        cosine 상위 depth개 (shard 내 번호, cosine)
+
+        IVF가 있으면 centroid가 가까운 n_probe개 클러스터 구간만, 없으면 전체 벡터를 chunk 단위로 내적
+        """
+        if self.ivf_centroids is not None and n_probe < len(self.ivf_centroids):
+            lists = _top(self.ivf_centroids @ query_vector, n_probe)
+            spans = [(int(self.ivf_offsets[l]), int(self.ivf_offsets[l + 1])) for l in np.sort(lists)]
+        else:
+            spans = [(start, min(start + chunk, self.n)) for start in range(0, self.n, chunk)]
+
+        best_pos, best_scores = [], []
+        for a, z in spans:
+            if a == z:
+                continue
+            scores = self.vectors[a:z] @ query_vector
+            top = _top(scores, depth)
+            best_pos.append(top + a)
+            best_scores.append(scores[top])
+        if not best_pos:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        pos, scores = np.concatenate(best_pos), np.concatenate(best_scores)
+        top = _top(scores, depth)
+        ids = pos[top] if self.ivf_ids is None else self.ivf_ids[pos[top]]  # 재배치된 위치 → 문단 번호
+        return ids, scores[top]
+
+    def doc(self, local: int) -> Tuple[str, List[str]]:
+        a, z = int(self._doc_offsets[local]), int(self._doc_offsets[local + 1])
+        title, sentences = json.loads(self._docs[a:z])
+        return title, sentences
+
+    def close(self) -> None:
+        self._docs.close()
+        self._docs_file.close()
+
+
+class CorpusIndex:
+    """
+    shard 인덱스 검색 (BM25, 선택적으로 BM25 + vector reciprocal rank fusion)
+
+    search(query, k, exclude_titles) → [{"id", "title", "sentences", "score"}]
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        index_path = self.path / "index.json"
+        if not index_path.exists():
+            raise FileNotFoundError(f"Corpus index not found (or incomplete): {self.path}")
+        self.meta = json.loads(index_path.read_text())
+        self.n = self.meta["docs"]
+        self.model = self.meta.get("model")
+        self.shards = [CorpusShard(self.path / name, self.meta.get("dim")) for name in self.meta["shards"]]
+        self.has_vectors = bool(self.shards) and all(s.vectors is not None for s in self.shards)
+
+    def __len__(self) -> int:
+        return self.n
+
+    def bm25(self, query: str, depth: int) -> List[Tuple[int, float]]:
+        """전체 shard BM25 상위 depth개 → [(전역 번호, 점수)]"""
+        hashes = query_hashes(query)
+        if len(hashes) == 0:
+            return []
+        spans = [shard.postings(hashes) for shard in self.shards]
+        df = np.sum([[z - a for a, z in s] for s in spans], axis=0)
+        idf = np.log(1 + (self.n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        hits = []
+        for shard, shard_spans in zip(self.shards, spans):
+            ids, scores = shard.bm25(shard_spans, idf, depth)
+            hits.extend(zip((ids + shard.start).tolist(), scores.tolist()))
+        return sorted(hits, key=lambda x: (-x[1], x[0]))[:depth]
+
+    def dense(self, query_vector: np.ndarray, depth: int) -> List[Tuple[int, float]]:
+        """전체 shard vector 상위 depth개 → [(전역 번호, cosine)]"""
+        hits = []
+        for shard in self.shards:
+            ids, scores = shard.dense(query_vector, depth)
+            hits.extend(zip((ids + shard.start).tolist(), scores.tolist()))
+        return sorted(hits, key=lambda x: (-x[1], x[0]))[:depth]
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """인덱스를 만든 모델로 쿼리 임베딩 (DENSE_MODEL이 달라도 인덱스 모델 사용)"""
+        from src.dense import get_dense_encoder
+        encoder = get_dense_encoder()
+        if encoder.model_name != self.model:
+            encoder = _index_encoder(self.model)
+        return encoder.embed([query], [None])[0]
+
+    def doc(self, gid: int) -> Tuple[str, List[str]]:
+        for shard in reversed(self.shards):
+            if gid >= shard.start:
+                return shard.doc(gid - shard.start)
+        raise IndexError(gid)
+
+    def search(
+        self,
+        query: str,
+        k: int = OPEN_DOMAIN_TOP_K,
+        exclude_titles: Iterable[str] = (),
+        hybrid: bool = OPEN_DOMAIN_HYBRID,
+        query_vector: Optional[np.ndarray] = None,
+    ) -> List[Dict]:
+        """
+        query 상위 k개 문단 (exclude_titles의 제목은 건너뜀)
+
+        hybrid: 방식별 상위 CORPUS_HYBRID_DEPTH개를 reciprocal rank fusion (1 / (CORPUS_RRF_K + 순위) 합),
+                인덱스에 벡터가 없으면 BM25만
+        같은 제목은 한 번만 반환 (덤프에 같은 문단이 여러 번 들어 있어도 후보 k개가 서로 다른 문서가 되도록)
+        """
+        hybrid = hybrid and self.has_vectors
+        if hybrid and query_vector is None:
+            query_vector = self.embed_query(query)
+        depth = max(k + len(set(exclude_titles)), CORPUS_HYBRID_DEPTH if hybrid else 0)
+        while True:
+            ranked, exhausted = self._ranked(query, depth, query_vector if hybrid else None)
+            exclude = set(exclude_titles)
+            results = []
+            for gid, score in ranked:
+                title, sentences = self.doc(gid)
+                if title in exclude:
+                    continue
+                exclude.add(title)
+                results.append({"id": gid, "title": title, "sentences": sentences, "score": score})
+                if len(results) >= k:
+                    return results
+            if exhausted:
+                return results
+            depth *= 2  # 중복 제목이 많아 k개를 못 채움 → 더 깊이
+
+    def _ranked(self, query: str, depth: int, query_vector: Optional[np.ndarray]) -> Tuple[List[Tuple[int, float]], bool]:
+        """BM25 (query_vector가 있으면 + vector RRF) 순위 → (순위, 더 깊이 봐도 후보가 없는지)"""
+        ranked = self.bm25(query, depth)
+        exhausted = len(ranked) < depth
+        if query_vector is not None:
+            dense = self.dense(query_vector, depth)
+            exhausted = exhausted and len(dense) < depth
+            fused: Dict[int, float] = {}
+            for hits in (ranked, dense):
+                for rank, (gid, _) in enumerate(hits):
+                    fused[gid] = fused.get(gid, 0.0) + 1.0 / (CORPUS_RRF_K + rank + 1)
+            ranked = sorted(fused.items(), key=lambda x: (-x[1], x[0]))
+        return ranked, exhausted
+
+    def close(self) -> None:
+        for shard in self.shards:
+            shard.close()
+
+
+_index_encoders: Dict[str, object] = {}
+_index_encoders_lock = threading.Lock()
+
+def _index_encoder(model: str):
+    """DENSE_MODEL과 다른 모델로 만든 인덱스용 쿼리 인코더 (캐시 없음)"""
+    from src.dense import DenseEncoder
+    with _index_encoders_lock:
+        if model not in _index_encoders:
+            _index_encoders[model] = DenseEncoder(model_name=model)
+        return _index_encoders[model]
+
+
+_corpus = None
+_corpus_lock = threading.Lock()
+
+def get_corpus_index() -> CorpusIndex:
+    """프로세스 공용 코퍼스 인덱스 (CORPUS_INDEX)"""
+    global _corpus
+    with _corpus_lock:
+        if _corpus is None:
+            _corpus = CorpusIndex(CORPUS_INDEX)
+            print(f"[INDEX] Opened {CORPUS_INDEX} ({len(_corpus)} paragraphs, {len(_corpus.shards)} shards, "
+                  f"vectors={_corpus.model or 'none'})")
+        return _corpus
+
+
+def is_open_domain(context: Sequence) -> bool:
+    """이 질문을 코퍼스 검색으로 처리할지 (OPEN_DOMAIN + 주어진 context 유무)"""
+    return OPEN_DOMAIN == "on" or (OPEN_DOMAIN == "auto" and not context)
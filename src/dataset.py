@@ -0,0 +1,175 @@
+import os
+import json
+import mmap
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, Union
+
+# ==============================
+# HotpotQA 스트리밍 로더 / 오프셋 인덱스 포맷
+# ==============================
+# - iter_hotpot_json: 원본 JSON 배열을 통째로 올리지 않고 항목 단위로 파싱
+# - convert_hotpot_qa: 한 번만 변환 → <name>.jsonl (항목당 한 줄) + <name>.idx (uint64 오프셋)
+# - HotpotQAIndex: 두 파일을 mmap 해서 index로 필요한 항목만 파싱
+#   → 시작 시간 / RSS가 데이터셋 크기와 무관
+
+_CHUNK_SIZE = 1 << 20
+
+
+def normalize_item(item: Dict) -> Dict:
+    """원본 항목 → 파이프라인에서 쓰는 형태 (context는 (title, sentences) 튜플)"""
+    context = []
+    for ctx in item.get("context", []):
+        if len(ctx) == 2:
+            title, sentences = ctx
+            context.append((title, sentences))
+
+    return {
+        "_id": item.get("_id", ""),
+        "question": item.get("question", "").strip(),
+        "answer": item.get("answer", ""),
+        "context": context,
+        "supporting_facts": item.get("supporting_facts", []),
+        "type": item.get("type", ""),
+        "level": item.get("level", "")
+    }
+
+
+def iter_hotpot_json(path: Path) -> Iterator[Dict]:
+    """최상위 JSON 배열을 청크 단위로 읽으며 항목을 하나씩 yield"""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf = ""
+        pos = 0
+        started = False
+        eof = False
+
+        while True:
+            # 구분자 건너뛰기
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if not started and pos < len(buf):
+                if buf[pos] != "[":
+                    raise ValueError(f"Expected a JSON array: {path}")
+                started = True
+                pos += 1
+                continue
+            if pos < len(buf) and buf[pos] == "]":
+                return
+
+            if pos < len(buf):
+                try:
+                    item, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                else:
+                    yield item
+                    pos = end
+                    continue
+
+            if eof:
+                return
+            chunk = f.read(_CHUNK_SIZE)
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
+
+
+def compact_paths(path: Path):
+    """<name>.json → (<name>.jsonl, <name>.idx)"""
+    path = Path(path)
+    base = path.with_suffix("") if path.suffix in (".json", ".jsonl") else path
+    return base.with_suffix(".jsonl"), base.with_suffix(".idx")
+
+
+def convert_hotpot_qa(src: Path, dst: Path = None) -> Path:
+    """
+    원본 JSON → 오프셋 인덱스 JSONL (한 번만 실행)
+
+    .idx는 항목 시작 오프셋 N개 + 파일 끝 오프셋 1개 (little-endian uint64)
+    """
+    jsonl_path, idx_path = compact_paths(dst or src)
+    tmp_jsonl = jsonl_path.with_suffix(".jsonl.tmp")
+    tmp_idx = idx_path.with_suffix(".idx.tmp")
+
+    offsets = array("Q")
+    with open(tmp_jsonl, "wb") as out:
+        for item in iter_hotpot_json(src):
+            offsets.append(out.tell())
+            line = json.dumps(normalize_item(item), ensure_ascii=False, separators=(",", ":"))
+            out.write(line.encode("utf-8") + b"\n")
+        offsets.append(out.tell())
+
+    if offsets.itemsize != 8:
+        raise RuntimeError("array('Q') must be 8 bytes on this platform")
+    with open(tmp_idx, "wb") as f:
+        f.write(offsets.tobytes())
+
+    os.replace(tmp_jsonl, jsonl_path)
+    os.replace(tmp_idx, idx_path)
+    print(f"[DATA] Converted {len(offsets) - 1} items → {jsonl_path} (+ {idx_path.name})")
+    return jsonl_path
+
+
+class HotpotQAIndex:
+    """
+    mmap 기반 HotpotQA 시퀀스 (len / [i] 지원)
+
+    dataset[i] 호출 시에만 해당 줄을 파싱한다.
+    """
+
+    def __init__(self, jsonl_path: Path):
+        self.jsonl_path, self.idx_path = compact_paths(jsonl_path)
+        self._data_file = open(self.jsonl_path, "rb")
+        self._idx_file = open(self.idx_path, "rb")
+        self._data = mmap.mmap(self._data_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._idx_mm = mmap.mmap(self._idx_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._offsets = memoryview(self._idx_mm).cast("Q")
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> Dict:
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(i)
+        raw = self._data[self._offsets[i]:self._offsets[i + 1]]
+        item = json.loads(raw)
+        item["context"] = [tuple(ctx) for ctx in item["context"]]
+        return item
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def close(self) -> None:
+        self._offsets.release()
+        self._idx_mm.close()
+        self._data.close()
+        self._idx_file.close()
+        self._data_file.close()
+
+
+def open_hotpot_qa(path: Union[str, Path]) -> HotpotQAIndex:
+    """
+    HotpotQA를 lazy 시퀀스로 열기
+
+    원본 .json만 있으면 처음 한 번 compact 포맷으로 변환한 뒤 연다.
+    """
+    path = Path(path)
+    jsonl_path, idx_path = compact_paths(path)
+    if not (jsonl_path.exists() and idx_path.exists()):
+        if not path.exists() or path.suffix == ".jsonl":
+            raise FileNotFoundError(f"Dataset not found: {path}")
+        print(f"[DATA] Converting {path} to indexed JSONL (one-time)...")
+        convert_hotpot_qa(path)
+    elif path.exists() and path.suffix == ".json" and path.stat().st_mtime > jsonl_path.stat().st_mtime:
+        print(f"[DATA] {path} is newer than {jsonl_path}, re-converting...")
+        convert_hotpot_qa(path)
+
+    dataset = HotpotQAIndex(jsonl_path)
+    print(f"[DATA] Opened {jsonl_path} ({len(dataset)} items, lazy)")
+    return dataset
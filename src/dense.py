@@ -0,0 +1,308 @@
+import os
+import time
+import sqlite3
+import asyncio
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.batching import MicroBatcher, AsyncMicroBatcher
+from src.retrieval import rank_key
+from src.paragraph_store import paragraph_digest
+
+# ==============================
+# 질문 단위 dense 인덱스 (임베딩 + cosine)
+# ==============================
+# SEARCHER_MODE=dense / dense_rerank에서 사용.
+# - 문단 = title + sentences, sentence-transformers 인코더로 CPU에서 임베딩 (정규화 → 내적 = cosine)
+# - 쿼리 = build_search_query(현재 step, 이전 답변) (BM25와 같은 쿼리)
+# - 문단 임베딩은 paragraph_hash 키로 SQLite에 캐시: HotpotQA는 같은 위키 문단이 여러 질문에 반복해서 나온다
+# - 인코더 호출 묶기: 한 질문의 캐시에 없는 문단 + 쿼리를 한 번에, 동시에 실행 중인 질문들은 MicroBatcher로 한 번에
+#   (async 노드는 AsyncMicroBatcher로 묶고 인코딩은 executor 스레드에서 → 이벤트 루프를 막지 않음)
+#
+# sentence-transformers / torch는 dense 모드에서만 import한다 (다른 모드는 설치 없이 동작).
+
+DENSE_MODEL = os.getenv("DENSE_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+DENSE_DEVICE = os.getenv("DENSE_DEVICE", "cpu")
+DENSE_CACHE = os.getenv("DENSE_CACHE", "on").lower()  # on | off
+DENSE_CACHE_PATH = Path(os.getenv("DENSE_CACHE_PATH", "cache/embeddings.sqlite"))
+DENSE_ENCODE_BATCH = int(os.getenv("DENSE_ENCODE_BATCH", "64"))  # 인코더 forward 1회당 문장 수
+DENSE_BATCH_SIZE = int(os.getenv("DENSE_BATCH_SIZE", "16"))  # 인코더 호출 1회에 묶는 질문 수
+DENSE_BATCH_WINDOW = float(os.getenv("DENSE_BATCH_WINDOW_MS", "10")) / 1000.0
+
+
+def paragraph_text(title: str, sentences: Sequence[str]) -> str:
+    """인코더 입력 문단 텍스트"""
+    return f"{title}. {' '.join(s.strip() for s in sentences)}"
+
+
+def paragraph_hash(title: str, sentences: Sequence[str]) -> str:
+    """문단 내용 해시 (제목 + 본문, 모델과 무관, src.paragraph_store 행 키와 같은 값)"""
+    return paragraph_digest(title, sentences).hex()
+
+
+class EmbeddingCache:
+    """
+    SQLite 기반 문단 임베딩 캐시
+
+    - key: (모델 이름, paragraph_hash) → float32 벡터 bytes
+    - 한 질문의 문단들을 한 번에 조회 / 저장 (get_many / put_many)
+    """
+
+    def __init__(self, path: Path = DENSE_CACHE_PATH):
+        self.path = Path(path)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                key TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model, key)
+            )"""
+        )
+        self._conn.commit()
+
+    def get_many(self, model: str, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        if not keys:
+            return {}
+        found = {}
+        with self._lock:
+            # SQLite 변수 개수 제한(기본 999) 아래로 나눠서 조회
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE model = ? AND key IN ({','.join('?' * len(chunk))})",
+                    (model, *chunk),
+                ).fetchall()
+                found.update((key, np.frombuffer(blob, dtype=np.float32)) for key, blob in rows)
+            self.hits += len(found)
+            self.misses += len(set(keys)) - len(found)
+        return found
+
+    def put_many(self, model: str, items: Iterable[Tuple[str, np.ndarray]]) -> None:
+        rows = [(model, key, int(vec.shape[0]), vec.astype(np.float32).tobytes()) for key, vec in items]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, key, dim, vector) VALUES (?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class DenseEncoder:
+    """
+    sentence-transformers 인코더 + 임베딩 캐시 + 질문 간 micro-batching
+
+    embed(texts, keys): keys[i]가 있으면 캐시 조회 / 저장 대상, None이면 (쿼리) 항상 인코딩
+    aembed(texts, keys): embed의 async 버전 (이벤트 루프 스레드에서 사용)
+    """
+
+    def __init__(
+        self,
+        model_name: str = DENSE_MODEL,
+        device: str = DENSE_DEVICE,
+        cache: Optional[EmbeddingCache] = None,
+        encode_batch: int = DENSE_ENCODE_BATCH,
+        batch_size: int = DENSE_BATCH_SIZE,
+        window: float = DENSE_BATCH_WINDOW,
+    ):
+        self.model_name = model_name
+        self.device = device
+        self.cache = cache
+        self.encode_batch = encode_batch
+        self._model = None
+        self._load_lock = threading.Lock()
+        self._batcher = MicroBatcher(self._encode_many, max_size=batch_size, window=window)
+        self._abatcher = AsyncMicroBatcher(self._aencode_many, max_size=batch_size, window=window)
+        self.stats = {"calls": 0, "texts": 0, "encode_seconds": 0.0}
+        self._stats_lock = threading.Lock()  # encode()는 batcher leader / executor 스레드들에서 동시에 실행됨
+
+    def _load(self):
+        with self._load_lock:
+            if self._model is None:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                except ImportError as e:
+                    raise ImportError(
+                        "Dense retrieval requires sentence-transformers (pip install -r requirements.txt)"
+                    ) from e
+                self._model = SentenceTransformer(self.model_name, device=self.device)
+        return self._model
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """texts → 정규화된 float32 행렬 (인코더 호출 1회)"""
+        model = self._load()
+        start = time.perf_counter()
+        vectors = model.encode(
+            texts,
+            batch_size=self.encode_batch,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        ).astype(np.float32)
+        self._record_encode(len(texts), time.perf_counter() - start)
+        return vectors
+
+    def _record_encode(self, n_texts: int, seconds: float) -> None:
+        with self._stats_lock:
+            self.stats["calls"] += 1
+            self.stats["texts"] += n_texts
+            self.stats["encode_seconds"] += seconds
+
+    def stats_snapshot(self) -> Dict:
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def _encode_many(self, groups: List[List[str]], contexts=None) -> List[np.ndarray]:
+        """
+        질문별 텍스트 묶음들을 한 번에 인코딩 후 다시 나눔 (MicroBatcher run_batch)
+
+        동시에 실행 중인 질문들이 같은 문단을 공유하는 경우가 많아 같은 텍스트는 한 번만 인코딩
+        """
+        unique = list(dict.fromkeys(text for group in groups for text in group))
+        vectors = self.encode(unique)
+        row = {text: i for i, text in enumerate(unique)}
+        return [vectors[[row[text] for text in group]] for group in groups]
+
+    async def _aencode_many(self, groups: List[List[str]], contexts=None) -> List[np.ndarray]:
+        """AsyncMicroBatcher run_batch: 인코딩(CPU)은 기본 executor 스레드에서"""
+        return await asyncio.get_running_loop().run_in_executor(None, self._encode_many, groups)
+
+    def embed(self, texts: Sequence[str], keys: Sequence[Optional[str]]) -> np.ndarray:
+        cached, todo = self._lookup(keys)
+        vectors = self._batcher.submit([texts[i] for i in todo]) if todo else []
+        return self._combine(keys, cached, todo, vectors)
+
+    async def aembed(self, texts: Sequence[str], keys: Sequence[Optional[str]]) -> np.ndarray:
+        cached, todo = self._lookup(keys)
+        vectors = await self._abatcher.submit([texts[i] for i in todo]) if todo else []
+        return self._combine(keys, cached, todo, vectors)
+
+    def _lookup(self, keys: Sequence[Optional[str]]) -> Tuple[Dict[str, np.ndarray], List[int]]:
+        """캐시 조회 → (캐시된 벡터, 인코딩할 위치 목록)"""
+        cached = self.cache.get_many(self.model_name, [k for k in keys if k]) if self.cache else {}
+        todo = [i for i, key in enumerate(keys) if key is None or key not in cached]
+        return cached, todo
+
+    def _combine(self, keys, cached, todo, vectors) -> np.ndarray:
+        """새로 인코딩한 벡터 캐시 저장 후 keys 순서로 합침"""
+        encoded = dict(zip(todo, vectors))
+        if self.cache and encoded:
+            self.cache.put_many(self.model_name, {keys[i]: encoded[i] for i in todo if keys[i]}.items())
+        return np.stack([encoded[i] if i in encoded else cached[key] for i, key in enumerate(keys)])
+
+
+class DenseIndex:
+    """
+    문서 리스트에 대한 cosine 순위 인덱스 (BM25Index.rank와 같은 인터페이스)
+
+    문단 임베딩은 첫 rank() 때 쿼리와 같은 인코더 호출로 계산하고 이후 재사용
+    (doc_vectors를 주면 (문단 저장소) 쿼리만 인코딩), async 노드는 arank()
+    """
+
+    def __init__(self, context: List[Tuple[str, List[str]]], encoder: "DenseEncoder",
+                 doc_vectors: Optional[np.ndarray] = None):
+        self.titles = [title for title, _ in context]
+        self.texts = [paragraph_text(title, sentences) for title, sentences in context]
+        self.keys = [paragraph_hash(title, sentences) for title, sentences in context]
+        self.encoder = encoder
+        self.doc_vectors = doc_vectors
+        self._lock = threading.Lock()  # 병렬 step sub-loop들이 문단 임베딩을 중복 계산하지 않도록
+        self._alock: Optional[asyncio.Lock] = None  # 같은 이벤트 루프의 sub-loop들용 (첫 arank 때 생성)
+
+    def _embed_query(self, query: str) -> np.ndarray:
+        with self._lock:
+            if self.doc_vectors is None:
+                vectors = self.encoder.embed(self.texts + [query], self.keys + [None])
+                self.doc_vectors = vectors[:-1]
+                return vectors[-1]
+        return self.encoder.embed([query], [None])[0]
+
+    async def _aembed_query(self, query: str) -> np.ndarray:
+        if self._alock is None:
+            self._alock = asyncio.Lock()
+        async with self._alock:
+            if self.doc_vectors is None:
+                vectors = await self.encoder.aembed(self.texts + [query], self.keys + [None])
+                self.doc_vectors = vectors[:-1]
+                return vectors[-1]
+        return (await self.encoder.aembed([query], [None]))[0]
+
+    def rank(self, query: str, titles: Optional[Iterable[str]] = None) -> List[Tuple[int, float]]:
+        """
+        query 기준 문서 순위 → [(문서 위치, cosine)] (점수 내림차순, 동점은 원래 순서)
+
+        titles가 주어지면 해당 제목의 문서만 후보로 사용
+        """
+        if not self.titles:
+            return []
+        return self._rank(self._embed_query(query), titles)
+
+    async def arank(self, query: str, titles: Optional[Iterable[str]] = None) -> List[Tuple[int, float]]:
+        """rank의 async 버전 (쿼리 / 문단 인코딩 동안 이벤트 루프를 막지 않음)"""
+        if not self.titles:
+            return []
+        return self._rank(await self._aembed_query(query), titles)
+
+    def _rank(self, q: np.ndarray, titles: Optional[Iterable[str]]) -> List[Tuple[int, float]]:
+        scores = self.doc_vectors @ q
+        allowed = set(titles) if titles is not None else None
+        scored = [
+            (i, float(scores[i]))
+            for i, title in enumerate(self.titles)
+            if allowed is None or title in allowed
+        ]
+        return sorted(scored, key=rank_key)
+
+
+_encoder = None
+_encoder_lock = threading.Lock()
+
+def get_dense_encoder() -> DenseEncoder:
+    """프로세스 공용 인코더 (모델 / 캐시 / batcher 공유)"""
+    global _encoder
+    with _encoder_lock:
+        if _encoder is None:
+            cache = EmbeddingCache(DENSE_CACHE_PATH) if DENSE_CACHE == "on" else None
+            _encoder = DenseEncoder(cache=cache)
+        return _encoder
+
+
+def dense_stats() -> Optional[Dict]:
+    """인코더 호출 / 질문 묶음 / 임베딩 캐시 통계 (dense 모드를 안 썼으면 None)"""
+    with _encoder_lock:
+        encoder = _encoder
+    if encoder is None:
+        return None
+    stats = {
+        "encoder": encoder.stats_snapshot(),
+        "batching": dict(encoder._batcher.stats),
+        "async_batching": dict(encoder._abatcher.stats),
+    }
+    if encoder.cache is not None:
+        stats["cache"] = encoder.cache.stats()
+    return stats
@@ -1,32 +1,79 @@
+import threading
 from typing import List, Tuple
 from langgraph.graph import StateGraph, END
+from langchain_core.runnables import RunnableLambda
 
 from src.state import QAState
+from src.metrics import span
+from src.recorder import current_recorder, snapshot
 from src.nodes import (
+    FAST_PATH,
+    node_fast_path,
+    anode_fast_path,
     node_planner, 
     node_reasoner, 
     node_searcher, 
     node_extractor, 
-    node_answer
+    node_answer,
+    anode_planner,
+    anode_reasoner,
+    anode_searcher,
+    anode_extractor,
+    anode_answer,
+    node_parallel,
+    anode_parallel
 )
 
 # ==============================
 # 1) Graph Building
 # =============================
 
+def _timed_node(name: str, func, afunc) -> RunnableLambda:
+    """노드 실행 구간을 현재 질문 타임라인에 기록 (sync / async 공통, record_question 중이면 state 변경도 기록)"""
+    def run(state):
+        before = snapshot(state)
+        with span(name, "node"):
+            result = func(state)
+        if before is not None:
+            current_recorder().record_node(name, before, result)
+        return result
+
+    async def arun(state):
+        before = snapshot(state)
+        with span(name, "node"):
+            result = await afunc(state)
+        if before is not None:
+            current_recorder().record_node(name, before, result)
+        return result
+
+    return RunnableLambda(run, afunc=arun, name=name)
+
 def build_graph():
     """Build the Multi-Agent QA graph (간결 버전)"""
     g = StateGraph(QAState)
     
-    # Add nodes
-    g.add_node("planner", node_planner)
-    g.add_node("reasoner", node_reasoner)
-    g.add_node("searcher", node_searcher)
-    g.add_node("extractor", node_extractor)
-    g.add_node("answer", node_answer)  
+    # Add nodes (sync: invoke, async: ainvoke)
+    g.add_node("planner", _timed_node("planner", node_planner, anode_planner))
+    g.add_node("reasoner", _timed_node("reasoner", node_reasoner, anode_reasoner))
+    g.add_node("searcher", _timed_node("searcher", node_searcher, anode_searcher))
+    g.add_node("extractor", _timed_node("extractor", node_extractor, anode_extractor))
+    g.add_node("answer", _timed_node("answer", node_answer, anode_answer))
+    g.add_node("parallel", _timed_node("parallel", node_parallel, anode_parallel))
     
-    # Entry
-    g.set_entry_point("planner")
+    # Entry (FAST_PATH=on/shadow면 fast_path 먼저)
+    if FAST_PATH in ("on", "shadow"):
+        g.add_node("fast_path", _timed_node("fast_path", node_fast_path, anode_fast_path))
+        g.set_entry_point("fast_path")
+        g.add_conditional_edges(
+            "fast_path",
+            lambda s: s.get("action", ""),
+            {
+                "planner": "planner",
+                "finish": END        # 검증 통과 → 바로 종료
+            }
+        )
+    else:
+        g.set_entry_point("planner")
     
     # Planner edges
     g.add_conditional_edges(
@@ -44,6 +91,7 @@ def build_graph():
         lambda s: s.get("action", ""),
         {
             "search": "searcher",
+            "parallel": "parallel",  # 독립 step들 동시 실행 (PARALLEL_STEPS)
             "next_step": "reasoner",
             "finish": "answer",      # → Answer (Chain)
             "planner": "planner"     # ← Planner (재계획)
@@ -53,22 +101,38 @@ def build_graph():
     # Tool edges
     g.add_edge("searcher", "extractor")
     g.add_edge("extractor", "reasoner")
+    g.add_conditional_edges(
+        "parallel",
+        lambda s: s.get("action", ""),
+        {
+            "reasoner": "reasoner",
+            "planner": "planner"     # 막힌 step의 sub-loop가 재계획 요청
+        }
+    )
     
     # Answer → END (단방향)
     g.add_edge("answer", END)
     
     return g.compile()
 
+_app = None
+_app_lock = threading.Lock()
+
+def get_app():
+    """컴파일된 그래프를 한 번만 만들어 재사용 (스레드/async 태스크 간 공유)"""
+    global _app
+    if _app is None:
+        with _app_lock:
+            if _app is None:
+                _app = build_graph()
+    return _app
+
 # ==============================
 # 2) Main Runner
 # ==============================
 
-def run_question(question: str, context: List[Tuple[str, List[str]]]) -> QAState:
-    """Run a single question"""
-    
-    app = build_graph()
-    
-    state: QAState = {
+def _initial_state(question: str, context: List[Tuple[str, List[str]]]) -> QAState:
+    return {
         "question": question,
         "hotpot_context": context,
         "plan": [],
@@ -80,7 +144,23 @@ def run_question(question: str, context: List[Tuple[str, List[str]]]) -> QAState
         "replan_count": 0,  
         "total_iterations": 0
     }
+
+def run_question(question: str, context: List[Tuple[str, List[str]]]) -> QAState:
+    """Run a single question"""
+    
+    app = get_app()
+    state = _initial_state(question, context)
     
     final_state = app.invoke(state, config={"recursion_limit": 75})
     
     return final_state
+
+async def arun_question(question: str, context: List[Tuple[str, List[str]]]) -> QAState:
+    """Run a single question (async, 하나의 이벤트 루프에서 여러 질문 동시 실행)"""
+    
+    app = get_app()
+    state = _initial_state(question, context)
+    
+    final_state = await app.ainvoke(state, config={"recursion_limit": 75})
+    
+    return final_state
@@ -0,0 +1,249 @@
+import os
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# ==============================
+# 질문 단위 LLM 호출 / 토큰 / 비용 통계
+# ==============================
+# track_question() 블록 안에서 실행된 call_llm / acall_llm 호출이 모두 기록된다.
+# contextvar 기반이라 스레드 풀 worker, LangGraph 내부 executor, asyncio 태스크에서도
+# 같은 질문의 QuestionMetrics 객체로 모인다.
+
+_current: contextvars.ContextVar = contextvars.ContextVar("question_metrics", default=None)
+
+# 1M 토큰당 USD (input, output). LLM_PRICE_INPUT / LLM_PRICE_OUTPUT 으로 덮어쓰기 가능
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+}
+
+
+def price_per_million(model: str):
+    if os.getenv("LLM_PRICE_INPUT") or os.getenv("LLM_PRICE_OUTPUT"):
+        return float(os.getenv("LLM_PRICE_INPUT", "0")), float(os.getenv("LLM_PRICE_OUTPUT", "0"))
+    # 날짜 접미사 버전 (gpt-4o-mini-2024-07-18 등)은 가장 긴 접두사로 매칭
+    for name in sorted(MODEL_PRICES, key=len, reverse=True):
+        if model.startswith(name):
+            return MODEL_PRICES[name]
+    return 0.0, 0.0
+
+
+# provider prompt cache에서 읽힌 입력 토큰의 단가 비율 (OpenAI: 50% 할인)
+CACHED_INPUT_RATIO = float(os.getenv("LLM_PRICE_CACHED_RATIO", "0.5"))
+
+
+def _empty_usage() -> Dict:
+    return {"calls": 0, "cache_hits": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0,
+            "latency": 0.0, "cost": 0.0}
+
+
+class QuestionMetrics:
+    """질문 하나의 에이전트별 LLM 호출 수 / 토큰 / 지연 / 비용 + 노드/호출 타임라인"""
+
+    def __init__(self):
+        self.by_agent: Dict[str, Dict] = {}
+        self.spans: List[Dict] = []  # {"name", "cat", "start", "dur", "tid", "args"} (초, 질문 시작 기준)
+        self.t0 = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def record_span(self, name: str, cat: str, start: float, end: float, **args) -> None:
+        """구간 기록 (start / end는 time.perf_counter 값)"""
+        with self._lock:
+            self.spans.append({
+                "name": name,
+                "cat": cat,
+                "start": start - self.t0,
+                "dur": end - start,
+                "tid": threading.get_ident(),
+                "args": args,
+            })
+
+    def span_latencies(self, cat: str) -> Dict[str, List[float]]:
+        """cat("node" / "llm") 구간의 이름별 실행 시간 목록 (초)"""
+        result: Dict[str, List[float]] = {}
+        with self._lock:
+            for span in self.spans:
+                if span["cat"] == cat:
+                    result.setdefault(span["name"], []).append(span["dur"])
+        return result
+
+    def to_chrome_trace(self) -> Dict:
+        """chrome://tracing / Perfetto 에서 열 수 있는 Trace Event 포맷"""
+        with self._lock:
+            spans = list(self.spans)
+        tids = {}
+        events = []
+        for span in spans:
+            tid = tids.setdefault(span["tid"], len(tids) + 1)
+            events.append({
+                "name": span["name"],
+                "cat": span["cat"],
+                "ph": "X",
+                "ts": span["start"] * 1e6,
+                "dur": span["dur"] * 1e6,
+                "pid": 1,
+                "tid": tid,
+                "args": span["args"],
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def record_call(
+        self,
+        agent: str,
+        latency: float,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        model: str = "",
+        cached: bool = False,
+        cached_tokens: int = 0
+    ) -> None:
+        """cached: 로컬 응답 캐시 적중 / cached_tokens: provider prompt cache에서 읽힌 입력 토큰 수"""
+        with self._lock:
+            usage = self.by_agent.setdefault(agent or "unknown", _empty_usage())
+            if cached:
+                usage["cache_hits"] += 1
+                return
+            price_in, price_out = price_per_million(model)
+            usage["calls"] += 1
+            usage["prompt_tokens"] += prompt_tokens
+            usage["cached_tokens"] += cached_tokens
+            usage["completion_tokens"] += completion_tokens
+            usage["latency"] += latency
+            uncached = prompt_tokens - cached_tokens
+            usage["cost"] += (
+                uncached * price_in + cached_tokens * price_in * CACHED_INPUT_RATIO + completion_tokens * price_out
+            ) / 1e6
+
+    def record_share(self, other: "QuestionMetrics", i: int, n: int) -> None:
+        """
+        other에 기록된 호출 사용량 중 n명 중 i번째 몫을 더함 (여러 질문이 한 번에 나눠 쓴 배치 호출)
+
+        - calls / cache_hits: 정수 유지, 첫 번째(i == 0) 질문에만 기록
+        - 토큰: n등분 (나머지는 첫 번째 질문), latency / cost: 1/n
+        → n명 몫을 합하면 원래 사용량과 같음
+        """
+        with other._lock:
+            usages = {agent: dict(u) for agent, u in other.by_agent.items()}
+        with self._lock:
+            for agent, u in usages.items():
+                usage = self.by_agent.setdefault(agent, _empty_usage())
+                for k in usage:
+                    if k in ("calls", "cache_hits"):
+                        usage[k] += u[k] if i == 0 else 0
+                    elif isinstance(u[k], int):
+                        usage[k] += u[k] // n + (u[k] % n if i == 0 else 0)
+                    else:
+                        usage[k] += u[k] / n
+
+    @property
+    def llm_calls(self) -> int:
+        return sum(u["calls"] for u in self.by_agent.values())
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            by_agent = {agent: dict(u) for agent, u in self.by_agent.items()}
+        total = merge_usage(by_agent.values())
+        return {
+            "llm_calls": total["calls"],
+            "cache_hits": total["cache_hits"],
+            "prompt_tokens": total["prompt_tokens"],
+            "cached_tokens": total["cached_tokens"],
+            "completion_tokens": total["completion_tokens"],
+            "llm_time": total["latency"],
+            "cost": total["cost"],
+            "usage_by_agent": by_agent,
+            "node_latencies": self.span_latencies("node"),
+            "llm_latencies": self.span_latencies("llm"),
+        }
+
+
+def merge_usage(usages) -> Dict:
+    """usage dict 여러 개 합산"""
+    total = _empty_usage()
+    for u in usages:
+        for k in total:
+            total[k] += u.get(k, 0)
+    return total
+
+
+def aggregate_by_agent(infos: List[Dict]) -> Dict[str, Dict]:
+    """info 레코드들의 usage_by_agent → 에이전트별 합계 (+ 호출당 평균)"""
+    per_agent: Dict[str, List[Dict]] = {}
+    for info in infos:
+        for agent, u in info.get("usage_by_agent", {}).items():
+            per_agent.setdefault(agent, []).append(u)
+
+    result = {}
+    for agent, usages in sorted(per_agent.items()):
+        total = merge_usage(usages)
+        calls = total["calls"] or 1
+        total["avg_prompt_tokens"] = total["prompt_tokens"] / calls
+        total["avg_completion_tokens"] = total["completion_tokens"] / calls
+        total["avg_latency"] = total["latency"] / calls
+        total["cached_ratio"] = total["cached_tokens"] / total["prompt_tokens"] if total["prompt_tokens"] else 0.0
+        result[agent] = total
+    return result
+
+
+def percentiles(values: List[float], qs=(50, 95, 99)) -> Dict[str, float]:
+    """선형 보간 백분위수 → {"p50": .., "p95": .., "p99": ..}"""
+    if not values:
+        return {f"p{q}": 0.0 for q in qs}
+    xs = sorted(values)
+    result = {}
+    for q in qs:
+        pos = (len(xs) - 1) * q / 100
+        lo = int(pos)
+        hi = min(lo + 1, len(xs) - 1)
+        result[f"p{q}"] = xs[lo] + (xs[hi] - xs[lo]) * (pos - lo)
+    return result
+
+
+def latency_summary(infos: List[Dict], key: str = "node_latencies") -> Dict[str, Dict]:
+    """info 레코드들의 node_latencies (또는 llm_latencies) → 이름별 count / mean / p50 / p95 / p99"""
+    per_name: Dict[str, List[float]] = {}
+    for info in infos:
+        for name, durations in info.get(key, {}).items():
+            per_name.setdefault(name, []).extend(durations)
+
+    return {
+        name: {
+            "count": len(durations),
+            "total": sum(durations),
+            "mean": sum(durations) / len(durations),
+            **percentiles(durations),
+        }
+        for name, durations in sorted(per_name.items())
+    }
+
+
+@contextmanager
+def span(name: str, cat: str, **args):
+    """with span("planner", "node"): ... → 현재 질문 타임라인에 구간 기록"""
+    metrics = _current.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if metrics is not None:
+            metrics.record_span(name, cat, start, time.perf_counter(), **args)
+
+
+def current_metrics() -> Optional[QuestionMetrics]:
+    return _current.get()
+
+
+@contextmanager
+def track_question():
+    """with track_question() as m: ... → m에 블록 안 LLM 호출이 기록됨"""
+    metrics = QuestionMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
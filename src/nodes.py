@@ -1,19 +1,274 @@
+import os
 import json
 import re
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Tuple, Optional
 from src.state import QAState
-from src.utils import call_llm
+from src.utils import call_llm, acall_llm, OPENAI_MODEL
+from src.metrics import span, track_question, current_metrics
+from src.recorder import current_recorder
+from src.batching import MicroBatcher, AsyncMicroBatcher
+from src.streaming import first_integer, first_yes_no
+from src.structured import STRUCTURED_OUTPUT, response_format, extract_json, validate, schema_hint, record_parse
+from src.retrieval import BM25Index, build_search_query, select_evidence_sentences, format_indexed_sentences
+from src.dense import DenseIndex, DENSE_MODEL, get_dense_encoder
+from src.paragraph_store import get_paragraph_store
+from src.corpus_index import OPEN_DOMAIN_TOP_K, OPEN_DOMAIN_HYBRID, get_corpus_index, is_open_domain
 from src.prompts import (
     PLANNER_SYS, ANSWER_SYS, 
     get_replan_prompt, get_synthesize_prompt, get_verify_evidence_prompt,
     get_step_answer_prompt, get_select_doc_prompt, get_extractor_prompt,
-    get_final_answer_prompt
+    get_final_answer_prompt, get_verify_and_answer_prompt, get_fast_path_prompt,
+    get_batch_verify_prompt, get_json_repair_prompt
 )
 
+# Searcher 문서 선택 방식
+#   llm     - 남은 문서 제목 전체를 LLM에 전달 (기본값)
+#   lexical - BM25 top-1을 LLM 호출 없이 바로 선택 (점수 0이면 llm으로 대체)
+#   rerank  - BM25 상위 SEARCHER_TOP_K개 제목 + snippet만 LLM에 전달
+#   dense        - 임베딩 cosine top-1을 LLM 호출 없이 바로 선택 (src.dense, sentence-transformers 필요)
+#   dense_rerank - 임베딩 상위 SEARCHER_TOP_K개 제목 + snippet만 LLM에 전달
+SEARCHER_MODE = os.getenv("SEARCHER_MODE", "llm").lower()
+SEARCHER_TOP_K = int(os.getenv("SEARCHER_TOP_K", "3"))
+_RANKED_MODES = ("lexical", "rerank", "dense", "dense_rerank")
+_DENSE_MODES = ("dense", "dense_rerank")
+
+# Extractor 문서 본문 전달 방식
+#   truncate - 본문 앞 1500자 (기본값)
+#   filter   - step/참조 엔티티와 겹치는 상위 EXTRACTOR_TOP_SENTENCES개 문장만 [인덱스]와 함께 전달
+EXTRACTOR_MODE = os.getenv("EXTRACTOR_MODE", "truncate").lower()
+EXTRACTOR_TOP_SENTENCES = int(os.getenv("EXTRACTOR_TOP_SENTENCES", "4"))
+
+# 이전 step을 참조하지 않는 연속 step들을 동시에 실행 (비교형 질문 등)
+PARALLEL_STEPS = os.getenv("PARALLEL_STEPS", "0") == "1"
+
+# 증거 검증과 step 답변 생성을 JSON 응답 1회 호출로 합침 (기본값: 2회 호출)
+FUSED_JUDGE = os.getenv("FUSED_JUDGE", "0") == "1"
+
+# 동시에 실행 중인 질문들의 증거 검증 요청을 모아 1회 호출로 판정 (micro-batching)
+JUDGE_BATCH = os.getenv("JUDGE_BATCH", "0") == "1"
+JUDGE_BATCH_SIZE = int(os.getenv("JUDGE_BATCH_SIZE", "16"))
+JUDGE_BATCH_WINDOW = float(os.getenv("JUDGE_BATCH_WINDOW_MS", "20")) / 1000.0
+
+# Fast path: 계획 전에 BM25 상위 문서로 단일 호출 추출 + 답변 시도
+#   off    - 사용 안 함 (기본값)
+#   on     - 자신감 + 검증 통과 시 바로 종료, 아니면 전체 루프
+#   shadow - 결과만 기록하고 항상 전체 루프 실행 (EM/F1 비교용)
+FAST_PATH = os.getenv("FAST_PATH", "off").lower()
+FAST_PATH_TOP_K = int(os.getenv("FAST_PATH_TOP_K", "3"))
+FAST_PATH_MIN_CONFIDENCE = float(os.getenv("FAST_PATH_MIN_CONFIDENCE", "0.8"))
+
+# Selector(문서 번호) / Judge(yes·no) 응답을 스트리밍으로 받다가 답이 나오면 바로 끊기
+STREAM_EARLY_STOP = os.getenv("STREAM_EARLY_STOP", "0") == "1"
+
+# ==========================================
+# [0] LLM 호출 드라이버
+# ==========================================
+# 각 에이전트 로직은 LLM 요청을 yield 하는 제너레이터로 작성한다.
+#   out = yield _llm(SYS, PROMPT, temperature=0.1, agent="extractor")
+# 드라이버가 요청을 call_llm(sync) / acall_llm(async)으로 실행해 응답을 돌려주므로
+# 하나의 로직으로 sync 노드와 async 노드를 모두 만든다.
+# LLM 예외는 제너레이터 안으로 던져져 기존 try/except가 그대로 동작한다.
+# LLM 외에 오래 걸리는 작업(인코딩 등)은 _work로 yield → async 드라이버가 이벤트 루프를 막지 않고 실행.
+#   ranked = yield _work(index.rank, query, afn=index.arank)
+
+def _llm(system_prompt: str, user_prompt: str, **kwargs) -> Dict:
+    """LLM 요청 (call_llm 인자)"""
+    return {"system_prompt": system_prompt, "user_prompt": user_prompt, **kwargs}
+
+def _work(fn, *args, afn=None, name: str = "") -> Dict:
+    """
+    LLM 외 작업 요청: sync 드라이버는 fn(*args), async 드라이버는 await afn(*args)
+    (afn이 없으면 fn을 기본 executor 스레드에서 실행)
+    """
+    return {"work": fn, "awork": afn, "args": args, "name": name or fn.__name__}
+
+def _span_args(request: Dict) -> Tuple[str, str]:
+    if "work" in request:
+        return request["name"], "work"
+    return request.get("agent") or "llm", "llm"
+
+def _dispatch(request: Dict) -> str:
+    """요청 1건 실행 (batch_item이 있고 JUDGE_BATCH면 micro-batcher 경유)"""
+    if "work" in request:
+        return request["work"](*request["args"])
+    if JUDGE_BATCH and "batch_item" in request:
+        return _judge_batcher.submit((request, call_llm))
+    return call_llm(**_without_batch_item(request))
+
+async def _adispatch(request: Dict) -> str:
+    if "work" in request:
+        if request["awork"] is not None:
+            return await request["awork"](*request["args"])
+        return await asyncio.to_thread(request["work"], *request["args"])
+    if JUDGE_BATCH and "batch_item" in request:
+        return await _ajudge_batcher.submit((request, acall_llm))
+    return await acall_llm(**_without_batch_item(request))
+
+def _without_batch_item(request: Dict) -> Dict:
+    return {k: v for k, v in request.items() if k != "batch_item"}
+
+def _run_sync(flow):
+    """제너레이터 로직을 call_llm으로 실행"""
+    try:
+        request = next(flow)
+        while True:
+            try:
+                with span(*_span_args(request)):
+                    response = _dispatch(request)
+            except Exception as e:
+                request = flow.throw(e)
+            else:
+                request = flow.send(response)
+    except StopIteration as stop:
+        return stop.value
+
+async def _run_async(flow):
+    """제너레이터 로직을 acall_llm으로 실행"""
+    try:
+        request = next(flow)
+        while True:
+            try:
+                with span(*_span_args(request)):
+                    response = await _adispatch(request)
+            except Exception as e:
+                request = flow.throw(e)
+            else:
+                request = flow.send(response)
+    except StopIteration as stop:
+        return stop.value
+
+def _strip_json_fence(out: str) -> str:
+    """```json ... ``` 코드 펜스 제거 (첫 줄 / 마지막 줄 버림)"""
+    out_clean = out.strip()
+    if out_clean.startswith("```"):
+        lines = out_clean.split("\n")
+        out_clean = "\n".join(lines[1:-1])
+    return out_clean
+
+def _parse_json(out: str):
+    """LLM 응답 → JSON (펜스 제거 후 json.loads, 실패 시 ValueError)"""
+    return json.loads(_strip_json_fence(out))
+
+def _llm_json(system_prompt: str, user_prompt: str, schema: str, **kwargs):
+    """
+    JSON 응답 요청 → (dict, None) 또는 파싱 실패 시 (None, ValueError)
+
+    STRUCTURED_OUTPUT=off면 기존 _parse_json 그대로, tolerant / schema면
+    관대한 추출 + 필수 키 검사 + repair 재요청 1회 (schema는 provider JSON-schema 모드도 요청).
+    LLM 호출 예외는 그대로 전파되므로 호출부는 파싱 실패만 기존 fallback으로 처리하면 된다.
+    """
+    agent = kwargs.get("agent", "")
+    structured = STRUCTURED_OUTPUT in ("tolerant", "schema")
+    if STRUCTURED_OUTPUT == "schema":
+        kwargs["response_format"] = response_format(schema)
+    out = yield _llm(system_prompt, user_prompt, **kwargs)
+
+    try:
+        j = _parse_json(out)
+        if structured:
+            validate(j, schema)
+        record_parse(agent, "ok")
+        return j, None
+    except ValueError as e:
+        error = e
+    if not structured:
+        record_parse(agent, "failed")
+        return None, error
+
+    try:
+        j = validate(extract_json(out), schema)
+        record_parse(agent, "recovered")
+        return j, None
+    except ValueError as e:
+        error = e
+
+    # repair 1회 (원래 요청 + 잘못된 응답 + 오류를 보여주고 JSON만 다시 요청)
+    repair = yield _llm(
+        system_prompt,
+        get_json_repair_prompt(user_prompt, out, str(error), schema_hint(schema)),
+        **{**kwargs, "temperature": 0.0, "agent": f"{agent}_repair"}
+    )
+    try:
+        j = validate(extract_json(repair), schema)
+    except ValueError as e:
+        record_parse(agent, "failed")
+        return None, e
+    record_parse(agent, "repaired")
+    return j, None
+
+# ==========================================
+# [0] Fast Path (pre-pass)
+# ==========================================
+def _fast_path(state: QAState):
+    """
+    Fast Path: BM25 상위 문서만 보고 1회 호출로 답변 시도
+    자신감이 낮거나 인용 근거가 Judge 검증에 실패하면 Planner로 넘김
+    """
+    question = state["question"]
+    context = state["hotpot_context"]
+    
+    if is_open_domain(context):
+        docs = yield from _retrieve_candidates(state, question, [], k=FAST_PATH_TOP_K)
+    else:
+        ranked = _get_doc_index(state).rank(question)[:FAST_PATH_TOP_K]
+        docs = [context[pos] for pos, _ in ranked]
+    docs_text = "\n\n".join(
+        f"[Doc {i}] {title}\n" + format_indexed_sentences(list(enumerate(sentences)))
+        for i, (title, sentences) in enumerate(docs, 1)
+    )
+    
+    print(f"\n⚡ [Fast Path] Top {len(docs)} docs: {[title for title, _ in docs]}")
+    
+    out = yield _llm(
+        "You are a precise answer generator. Answer only from the given documents.",
+        get_fast_path_prompt(question, docs_text),
+        temperature=0.0,
+        agent="fast_path"
+    )
+    
+    result = {"mode": FAST_PATH, "hit": False, "answer": "", "confidence": 0.0, "verified": False,
+              "docs": [title for title, _ in docs]}
+    evidence = []
+    try:
+        j = _parse_json(out)
+        result["answer"] = str(j.get("answer", "")).strip()
+        result["confidence"] = float(j.get("confidence", 0.0))
+        for doc_num, sent_idx in j.get("evidence", []):
+            doc_num, sent_idx = int(doc_num), int(sent_idx)
+            # 0 / 음수는 Python 음수 인덱싱으로 다른 문서·문장을 가리키므로 범위 밖 인용은 근거로 쓰지 않음
+            if not 1 <= doc_num <= len(docs) or not 0 <= sent_idx < len(docs[doc_num - 1][1]):
+                print(f"   ⚠️ Invalid citation [{doc_num}, {sent_idx}] ignored")
+                continue
+            title, sentences = docs[doc_num - 1]
+            evidence.append(f"[{title}] {sentences[sent_idx].strip()}")
+    except (ValueError, TypeError, IndexError, AttributeError) as e:
+        print(f"   ⚠️ JSON parsing error: {e}")
+    
+    print(f"   Answer: {result['answer']} (confidence {result['confidence']:.2f}, {len(evidence)} cited sentences)")
+    
+    if result["answer"] and evidence and result["confidence"] >= FAST_PATH_MIN_CONFIDENCE:
+        result["verified"] = yield from _verify_evidence_with_llm(question, evidence)
+        result["hit"] = result["verified"]
+    
+    state["fast_path"] = result
+    
+    if result["hit"] and FAST_PATH == "on":
+        print(f"   ✅ Fast path hit → skip planning")
+        state["answer"] = result["answer"]
+        state["action"] = "finish"
+    else:
+        print(f"   → Full pipeline ({'shadow' if FAST_PATH == 'shadow' else 'fallback'})")
+        state["action"] = "planner"
+    
+    return state
+
 # ==========================================
 # [1] Planner Agent
 # ==========================================
-def node_planner(state: QAState) -> QAState:
+def _planner(state: QAState):
     """
     Planner Agent: 계획 수립 및 수정 (개선 버전)
     """
@@ -23,15 +278,11 @@ def node_planner(state: QAState) -> QAState:
         print("\n🧠 [Planner] 초기 계획 수립...")
         
         q = state["question"]
-        out = call_llm(PLANNER_SYS, f"Question:\n{q}\nReturn JSON only.")
+        j, error = yield from _llm_json(PLANNER_SYS, f"Question:\n{q}\nReturn JSON only.", "plan", agent="planner")
         
         try:
-            out_clean = out.strip()
-            if out_clean.startswith("```"):
-                lines = out_clean.split("\n")
-                out_clean = "\n".join(lines[1:-1])
-            
-            j = json.loads(out_clean)
+            if error is not None:
+                raise error
             plan = j.get("plan", [])
         except Exception as e:
             print(f"   ⚠️ JSON parsing error: {e}")
@@ -88,7 +339,7 @@ def node_planner(state: QAState) -> QAState:
         # 사용된 문서 중 유용했던 것들
         useful_docs = []
         failed_docs = state.get("failed_documents", {})
-        for title, _ in state.get("hotpot_context", []):
+        for title, _ in _candidate_docs(state):
             if title not in failed_docs.get(current_step_idx, []):
                 # 문서가 실패하지 않았고, 관련 키워드가 있으면 유용
                 if any(keyword in title.lower() for keyword in ["journal", "botanical", "scientific"]):
@@ -125,19 +376,17 @@ def node_planner(state: QAState) -> QAState:
             replan_count=replan_count
         )
         
-        out = call_llm(
+        j, error = yield from _llm_json(
             "You are a strategic replanner. Use found information, don't restart.",
             REPLAN_PROMPT,
-            temperature=0.2
+            "plan",
+            temperature=0.2,
+            agent="replanner"
         )
         
         try:
-            out_clean = out.strip()
-            if out_clean.startswith("```"):
-                lines = out_clean.split("\n")
-                out_clean = "\n".join(lines[1:-1])
-            
-            j = json.loads(out_clean)
+            if error is not None:
+                raise error
             new_plan = j.get("plan", state["plan"])
             
             #  기존 정보 보존하면서 계획 업데이트
@@ -248,51 +497,51 @@ def _generate_dynamic_strategy(
 def _extract_keywords_hybrid(question: str, state: QAState) -> list:
     """하이브리드 키워드 추출: 규칙 + 컨텍스트"""
     
-    keywords = set()
+    keywords = {}  # 순서 있는 set (처음 나온 순서 유지 → 프로세스마다 같은 재계획 프롬프트)
     
     # 1. 정규식으로 기본 추출
     # 고유명사
     proper_nouns = re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b', question)
-    keywords.update(proper_nouns)
+    keywords.update(dict.fromkeys(proper_nouns))
     
     # 숫자
     numbers = re.findall(r'\b\d{4}\b', question)  # 년도
-    keywords.update(numbers)
+    keywords.update(dict.fromkeys(numbers))
     
     # 2. 이미 찾은 정보에서 관련 키워드 추가
     if state.get("step_answers"):
         for ans in state["step_answers"]:
             # 답변에서 명사 추출
             answer_words = ans["answer"].split()
-            keywords.update([w for w in answer_words if w[0].isupper()])
+            keywords.update(dict.fromkeys(w for w in answer_words if w[0].isupper()))
     
     # 3. 문서 제목에서 힌트 얻기
-    doc_titles = [title for title, _ in state.get("hotpot_context", [])]
+    question_lower = question.lower()
+    doc_titles = [title for title, _ in _candidate_docs(state)]
     for title in doc_titles:
         # 질문과 관련있는 문서 제목의 단어들
         title_words = title.split()
         for word in title_words:
-            if word.lower() in question.lower():
-                keywords.add(word)
+            if word.lower() in question_lower:
+                keywords[word] = None
     
     # 4. 질문 타입별 키워드
-    question_lower = question.lower()
     if "when" in question_lower:
-        keywords.add("year")
-        keywords.add("date")
+        keywords["year"] = None
+        keywords["date"] = None
     elif "where" in question_lower:
-        keywords.add("location")
-        keywords.add("place")
+        keywords["location"] = None
+        keywords["place"] = None
     elif "who" in question_lower:
-        keywords.add("person")
-        keywords.add("name")
+        keywords["person"] = None
+        keywords["name"] = None
     
     return list(keywords)
 
 # ==========================================
 # [2] Reasoner Agent
 # ==========================================
-def node_reasoner(state: QAState) -> QAState:
+def _reasoner(state: QAState):
     """
     Reasoner Agent: 실행 제어 및 Planner와 협력
     """
@@ -328,7 +577,7 @@ def node_reasoner(state: QAState) -> QAState:
     
     # 사용 가능한 문서 확인
     failed_docs = state.get("failed_documents", {}).get(step_idx, [])
-    total_docs = len(state.get("hotpot_context", []))
+    total_docs = len(_candidate_docs(state))
     remaining_docs = total_docs - len(failed_docs)
     
     #  재계획 조건 및 제한
@@ -369,23 +618,22 @@ def node_reasoner(state: QAState) -> QAState:
     print(f"   Goal: {current_step}")
     
     # Synthesis step 처리
-    current_step_lower = current_step.lower()
-    is_synthesis = (
-        "from step 1 and 2" in current_step_lower or 
-        "from step 1 and step 2" in current_step_lower or
-        "from steps 1 and 2" in current_step_lower or
-        "what they have in common" in current_step_lower or
-        "determine if they were the same" in current_step_lower or
-        "which was started first" in current_step_lower or
-        "which came first" in current_step_lower
-    )
-    
-    if is_synthesis:
-        return _synthesize_step(state)
+    if _is_synthesis_step(current_step):
+        return (yield from _synthesize_step(state))
     
     # 증거 확인
     evidence = state.get("current_evidence", [])
     
+    # 서로 독립인 연속 step들은 병렬 sub-loop로 (PARALLEL_STEPS)
+    # (sub-loop 안에서는 parallel_steps가 이미 있으므로 다시 나누지 않음)
+    if PARALLEL_STEPS and not evidence and current_retry == 0 and not state.get("parallel_steps"):
+        group = _independent_step_group(plan, step_idx)
+        if len(group) >= 2:
+            print(f"   → Independent steps {[i + 1 for i in group]} → parallel")
+            state["parallel_steps"] = group
+            state["action"] = "parallel"
+            return state
+    
     if not evidence:
         print(f"   → Searching...")
         state["action"] = "search"
@@ -406,8 +654,11 @@ def node_reasoner(state: QAState) -> QAState:
         state["action"] = "search"
         return state
     
-    # LLM 증거 검증
-    is_sufficient = _verify_evidence_with_llm(current_step, evidence)
+    # LLM 증거 검증 (+ fused 모드면 답변까지 한 번에)
+    if FUSED_JUDGE:
+        is_sufficient, answer = yield from _verify_and_answer_with_llm(current_step, evidence)
+    else:
+        is_sufficient = yield from _verify_evidence_with_llm(current_step, evidence)
     
     if not is_sufficient:
         print(f"   → Evidence insufficient")
@@ -417,7 +668,8 @@ def node_reasoner(state: QAState) -> QAState:
         return state
     
     # 답변 생성
-    answer = _generate_step_answer(current_step, evidence)
+    if not FUSED_JUDGE:
+        answer = yield from _generate_step_answer(current_step, evidence)
     print(f"   ✅ Step Answer: {answer}")
     
     state.setdefault("step_answers", []).append({
@@ -445,6 +697,35 @@ def node_reasoner(state: QAState) -> QAState:
     
     return state
 
+_SYNTHESIS_MARKERS = (
+    "from step 1 and 2",
+    "from step 1 and step 2",
+    "from steps 1 and 2",
+    "what they have in common",
+    "determine if they were the same",
+    "which was started first",
+    "which came first",
+)
+_STEP_DEPENDENCY_RE = re.compile(r"from steps? \d", re.IGNORECASE)
+
+def _is_synthesis_step(step: str) -> bool:
+    """이전 step 답변들을 종합하는 step인지 (검색 없이 _synthesize_step으로 처리)"""
+    step_lower = step.lower()
+    return any(marker in step_lower for marker in _SYNTHESIS_MARKERS)
+
+def _is_independent_step(step: str) -> bool:
+    """이전 step 답변을 참조하지 않는 step ("(from step N)" 없음, synthesis 아님)"""
+    return not _STEP_DEPENDENCY_RE.search(step) and not _is_synthesis_step(step)
+
+def _independent_step_group(plan: List[str], step_idx: int) -> List[int]:
+    """step_idx부터 이어지는 독립 step 인덱스들"""
+    group = []
+    for i in range(step_idx, len(plan)):
+        if not _is_independent_step(plan[i]):
+            break
+        group.append(i)
+    return group
+
 # [2.1]
 def _synthesize_step(state: QAState) -> QAState:
     """
@@ -472,10 +753,11 @@ def _synthesize_step(state: QAState) -> QAState:
     # prompt func 호출
     PROMPT = get_synthesize_prompt(current_step, context_text)
     
-    answer = call_llm(
+    answer = yield _llm(
         "You are a precise information synthesizer. Answer based ONLY on the evidence provided.",
         PROMPT,
-        temperature=0.1
+        temperature=0.1,
+        agent="synthesizer"
     )
     
     print(f"   ✅ Synthesized: {answer}")
@@ -510,20 +792,104 @@ def _verify_evidence_with_llm(step: str, evidence: List[str]) -> bool:
     # prompt func 호출
     PROMPT = get_verify_evidence_prompt(step, evidence_text)
 
+    # 호출 실패는 스케줄러 재시도 후에도 실패한 경우 → 기본값으로 덮지 않고 그대로 전파
+    # batch_item: JUDGE_BATCH면 다른 질문들의 검증 요청과 묶여 1회 호출로 판정됨
+    # STREAM_EARLY_STOP: 첫 yes / no가 나오면 스트림 종료 (배치 판정에는 적용 안 됨)
+    result = (yield _llm(
+        "You are a strict but fair evidence judge. Be lenient with partial information.",
+        PROMPT,
+        temperature=0.0,
+        agent="judge",
+        batch_item=(step, evidence_text),
+        stop_when=first_yes_no if STREAM_EARLY_STOP else None
+    )).strip().lower()
+    
+    print(f"   🔍 [LLM Judge] Evidence sufficient: {result}")
+    
+    return "yes" in result
+
+#[2.2.1]
+_JUDGE_BATCH_SYS = "You are a strict but fair evidence judge. Be lenient with partial information. Judge each item independently."
+
+def _parse_batch_verdicts(out: str, n: int) -> Optional[List[str]]:
+    """{"verdicts": [...]} → "yes" / "no" 리스트 (개수가 다르거나 파싱 실패면 None)"""
     try:
-        result = call_llm(
-            "You are a strict but fair evidence judge. Be lenient with partial information.",
-            PROMPT,
-            temperature=0.0
-        ).strip().lower()
-        
-        print(f"   🔍 [LLM Judge] Evidence sufficient: {result}")
-        
-        return "yes" in result
-        
-    except Exception as e:
-        print(f"   ⚠️ [LLM Judge] Error: {e}, defaulting to True")
-        return True  # Error 시 관대하게
+        verdicts = _parse_json(out).get("verdicts", [])
+    except (ValueError, AttributeError):
+        return None
+    if not isinstance(verdicts, list) or len(verdicts) != n:
+        return None
+    return ["yes" if "yes" in str(v).lower() else "no" for v in verdicts]
+
+def _credit_batch_item(usage, i: int, n: int, request: Dict, verdict: str) -> None:
+    """
+    배치 호출의 몫을 호출자 질문에 기록 (호출자 컨텍스트에서 실행)
+    - metrics: 호출 수는 첫 항목 질문에 1회, 토큰 / 지연은 항목 수로 나눠서 (QuestionMetrics.record_share)
+    - recorder: 같은 판정의 단건 검증 호출로 (replay는 질문을 하나씩 실행하므로 단건 프롬프트로 조회됨)
+    """
+    metrics = current_metrics()
+    if metrics is not None:
+        metrics.record_share(usage, i, n)
+    recorder = current_recorder()
+    if recorder is not None:
+        recorder.record_llm(request.get("agent", ""), request["system_prompt"].strip(), request["user_prompt"].strip(),
+                            request.get("model", OPENAI_MODEL), request.get("temperature", 0.2), verdict)
+
+def _judge_batch(items: List[Tuple[Dict, object]], contexts: List[contextvars.Context]) -> List[str]:
+    """
+    묶인 검증 요청들 → 1회 호출 (1건이면 원래 프롬프트 그대로)
+    응답 개수가 맞지 않으면 건별 호출로 대체 (각 호출자 컨텍스트에서 → 사용량 / 기록이 그 질문으로)
+    """
+    requests = [request for request, _ in items]
+    llm = items[0][1]
+    if len(requests) == 1:
+        return [contexts[0].run(llm, **_without_batch_item(requests[0]))]
+    
+    with track_question() as usage:
+        out = llm(_JUDGE_BATCH_SYS, get_batch_verify_prompt([r["batch_item"] for r in requests]),
+                  temperature=0.0, agent="judge_batch")
+    verdicts = _parse_batch_verdicts(out, len(requests))
+    if verdicts is None:
+        print(f"   ⚠️ [LLM Judge] Batch of {len(requests)} unparsable, judging one by one")
+        return [ctx.run(llm, **_without_batch_item(r)) for r, ctx in zip(requests, contexts)]
+    for i, (request, ctx, verdict) in enumerate(zip(requests, contexts, verdicts)):
+        ctx.run(_credit_batch_item, usage, i, len(requests), request, verdict)
+    print(f"   🔍 [LLM Judge] Batched {len(requests)} verdicts: {verdicts}")
+    return verdicts
+
+async def _ajudge_batch(items: List[Tuple[Dict, object]], contexts: List[contextvars.Context]) -> List[str]:
+    """_judge_batch의 async 버전"""
+    requests = [request for request, _ in items]
+    allm = items[0][1]
+    loop = asyncio.get_running_loop()
+    if len(requests) == 1:
+        return [await loop.create_task(allm(**_without_batch_item(requests[0])), context=contexts[0])]
+    
+    with track_question() as usage:
+        out = await allm(_JUDGE_BATCH_SYS, get_batch_verify_prompt([r["batch_item"] for r in requests]),
+                         temperature=0.0, agent="judge_batch")
+    verdicts = _parse_batch_verdicts(out, len(requests))
+    if verdicts is None:
+        print(f"   ⚠️ [LLM Judge] Batch of {len(requests)} unparsable, judging one by one")
+        return list(await asyncio.gather(*(
+            loop.create_task(allm(**_without_batch_item(r)), context=ctx) for r, ctx in zip(requests, contexts)
+        )))
+    for i, (request, ctx, verdict) in enumerate(zip(requests, contexts, verdicts)):
+        ctx.run(_credit_batch_item, usage, i, len(requests), request, verdict)
+    print(f"   🔍 [LLM Judge] Batched {len(requests)} verdicts: {verdicts}")
+    return verdicts
+
+_judge_batcher = MicroBatcher(_judge_batch, max_size=JUDGE_BATCH_SIZE, window=JUDGE_BATCH_WINDOW)
+_ajudge_batcher = AsyncMicroBatcher(_ajudge_batch, max_size=JUDGE_BATCH_SIZE, window=JUDGE_BATCH_WINDOW)
+
+def judge_batch_stats() -> Dict:
+    """묶어서 판정한 검증 요청 수 / 배치 수 / 최대 배치 크기 (sync + async 합산)"""
+    stats = {"items": 0, "batches": 0, "max_batch": 0}
+    for batcher in (_judge_batcher, _ajudge_batcher):
+        stats["items"] += batcher.stats["items"]
+        stats["batches"] += batcher.stats["batches"]
+        stats["max_batch"] = max(stats["max_batch"], batcher.stats["max_batch"])
+    return stats
 
 #[2.3]
 def _generate_step_answer(step: str, evidence: List[str]) -> str:
@@ -534,13 +900,128 @@ def _generate_step_answer(step: str, evidence: List[str]) -> str:
     # prompt func 호출
     PROMPT = get_step_answer_prompt(step, evidence_text)
 
-    return call_llm("You are a precise extractor.", PROMPT, temperature=0.1).strip()
+    answer = yield _llm("You are a precise extractor.", PROMPT, temperature=0.1, agent="step_answer")
+    return answer.strip()
+
+#[2.4]
+def _verify_and_answer_with_llm(step: str, evidence: List[str]):
+    """
+    증거 검증 + 답변 생성을 1회 호출로 (FUSED_JUDGE)
+    JSON 파싱 실패 시 기존 2회 호출 경로로 대체
+    """
+    if not evidence:
+        return False, ""
+    
+    evidence_text = "\n".join([f"- {e}" for e in evidence])
+    PROMPT = get_verify_and_answer_prompt(step, evidence_text)
+    
+    out = yield _llm(
+        "You are a strict but fair evidence judge and precise extractor. Be lenient with partial information.",
+        PROMPT,
+        temperature=0.0,
+        agent="judge"
+    )
+    
+    try:
+        j = _parse_json(out)
+        sufficient = j.get("sufficient")
+        if isinstance(sufficient, str):
+            sufficient = sufficient.strip().lower() in ("yes", "true")
+        answer = str(j.get("answer", "")).strip()
+        
+    except (ValueError, AttributeError) as e:
+        print(f"   ⚠️ [LLM Judge+Answer] JSON parsing error: {e}, falling back to 2 calls")
+        is_sufficient = yield from _verify_evidence_with_llm(step, evidence)
+        if not is_sufficient:
+            return False, ""
+        answer = yield from _generate_step_answer(step, evidence)
+        return True, answer
+    
+    print(f"   🔍 [LLM Judge+Answer] Evidence sufficient: {bool(sufficient)}")
+    
+    if sufficient and not answer:
+        answer = yield from _generate_step_answer(step, evidence)
+    return bool(sufficient), answer
+
+#[2.5]
+def _parallel_substates(state: QAState) -> List[QAState]:
+    """
+    독립 step마다 sub-loop용 상태 복사본
+    (step별 검색 / 재시도 기록은 따로, 문서 인덱스 등 읽기 전용 필드는 공유)
+    """
+    if is_open_domain(state["hotpot_context"]):
+        state.setdefault("retrieved_docs", [])  # sub-loop들이 가져온 문단을 같은 리스트에 누적
+    elif SEARCHER_MODE in _RANKED_MODES:
+        _get_doc_index(state)  # sub-loop들이 동시에 만들지 않도록 미리 생성
+        if SEARCHER_MODE in _DENSE_MODES:
+            _get_dense_index(state)
+    
+    substates = []
+    for i in state["parallel_steps"]:
+        sub = dict(state)
+        sub["step_idx"] = i
+        sub["step_answers"] = list(state.get("step_answers", []))
+        sub["current_evidence"] = []
+        sub["current_doc"] = {}
+        sub["retry_count"] = {}
+        sub["failed_documents"] = {k: list(v) for k, v in state.get("failed_documents", {}).items()}
+        substates.append(sub)
+    return substates
+
+def _step_subloop(sub: QAState):
+    """
+    step 하나에 대한 Reasoner → Searcher → Extractor 루프 (그래프 edge와 같은 순서)
+    step 답변이 나오거나 Reasoner가 재계획 / 종료를 요청하면 끝
+    """
+    step_idx = sub["step_idx"]
+    while True:
+        sub = yield from _reasoner(sub)
+        if sub["step_idx"] != step_idx or sub["action"] != "search":
+            return sub
+        sub = yield from _searcher(sub)
+        sub = yield from _extractor(sub)
+
+def _merge_parallel(state: QAState, results: List[QAState]) -> QAState:
+    """
+    sub-loop 결과를 step 순서대로 step_answers에 병합
+    답을 못 낸 step이 있으면 그 step부터 기존 순차 루프가 이어받음 (재시도 / 재계획 기록 포함)
+    그 step의 sub-loop가 재계획을 요청했으면 바로 Planner로 (Reasoner가 다시 판단하면 재계획 횟수가 두 번 증가)
+    """
+    base_iterations = state.get("total_iterations", 0)
+    state["total_iterations"] = base_iterations + sum(
+        sub.get("total_iterations", 0) - base_iterations for sub in results
+    )
+    failed_docs = state.setdefault("failed_documents", {})
+    
+    # LangGraph는 노드가 반환하지 않은 키의 이전 값을 유지하므로 pop이 아니라 비워야 다음 step들도 병렬 판단
+    parallel_steps, state["parallel_steps"] = state["parallel_steps"], []
+    state["action"] = "reasoner"
+    for i, sub in zip(parallel_steps, results):
+        failed_docs.update({k: v for k, v in sub.get("failed_documents", {}).items() if k == i})
+        answer = next((a for a in sub.get("step_answers", []) if a["step_idx"] == i), None)
+        if answer is None:
+            print(f"   ⚠️ [Parallel] Step {i + 1} unresolved → sequential loop")
+            state["step_idx"] = i
+            state["current_evidence"] = []
+            state.setdefault("retry_count", {}).update(sub.get("retry_count", {}))
+            if sub.get("reasoner_request") == "replan":
+                # 순차 루프였어도 이 step에서 처음 재계획했을 것 (뒤 step들의 요청은 버림)
+                state["reasoner_request"] = "replan"
+                state["replan_count"] = sub["replan_count"]
+                state["action"] = "planner"
+            break
+        state.setdefault("step_answers", []).append(answer)
+        state["step_idx"] = i + 1
+        state["current_evidence"] = []
+    
+    print(f"\n🔀 [Parallel] Merged {len(state.get('step_answers', []))} step answers, next step {state['step_idx'] + 1}")
+    return state
 
 # ==========================================
 # [3] Searcher Agent
 # ==========================================
 # tool?
-def node_searcher(state: QAState) -> QAState:
+def _searcher(state: QAState):
     """
     Tool: Context에서 문서 선택 (사용한 문서 제외)
     """
@@ -554,12 +1035,13 @@ def node_searcher(state: QAState) -> QAState:
     #  이미 실패한 문서들 가져오기
     failed_docs = state.get("failed_documents", {}).get(step_idx, [])
     
-    #  사용 가능한 문서만 필터링
-    available_context = [
-        (title, sentences) 
-        for title, sentences in context 
-        if title not in failed_docs
-    ]
+    #  사용 가능한 문서만 필터링 (open-domain이면 코퍼스에서 실패 문서를 뺀 상위 후보)
+    open_domain = is_open_domain(context)
+    if open_domain:
+        query = build_search_query(current_step, state.get("step_answers", []))
+        available_context = yield from _retrieve_candidates(state, query, failed_docs)
+    else:
+        available_context = _available_docs(context, failed_docs)
     
     if not available_context:
         print(f"   ❌ 모든 문서 시도 완료, 사용 가능한 문서 없음")
@@ -567,14 +1049,52 @@ def node_searcher(state: QAState) -> QAState:
         state["action"] = "reasoner"
         return state
     
-    print(f"   📚 사용 가능한 문서: {len(available_context)}/{len(context)}")
+    if not open_domain:
+        print(f"   📚 사용 가능한 문서: {len(available_context)}/{len(context)}")
+    
+    selected_doc = None
+    candidates, snippets = available_context, None
+    
+    if open_domain:
+        # 코퍼스 검색 순위를 그대로 사용 (snippet은 후보들만으로 만든 BM25 기준)
+        if SEARCHER_MODE in ("lexical", "dense"):
+            selected_doc = available_context[0]
+            print(f"   📐 Corpus top-1")
+        elif SEARCHER_MODE in ("rerank", "dense_rerank"):
+            candidates = available_context[:SEARCHER_TOP_K]
+            index = BM25Index(candidates)
+            snippets = [index.snippet(i, query) for i in range(len(candidates))]
+            print(f"   📐 Corpus top-{len(candidates)}: {[title for title, _ in candidates]}")
+    # 어휘 / dense 인덱스로 후보 순위화
+    elif SEARCHER_MODE in _RANKED_MODES:
+        index = _get_doc_index(state)
+        dense = SEARCHER_MODE in _DENSE_MODES
+        ranker = _get_dense_index(state) if dense else index
+        label = "Dense" if dense else "Lexical"
+        query = build_search_query(current_step, state.get("step_answers", []))
+        titles = [title for title, _ in available_context]
+        # dense는 인코딩이 있으므로 async 노드에서는 arank (이벤트 루프를 막지 않음)
+        ranked = (yield _work(ranker.rank, query, titles, afn=ranker.arank)) if dense else index.rank(query, titles)
+        
+        if SEARCHER_MODE in ("lexical", "dense") and ranked and ranked[0][1] > 0:
+            # top-1 바로 선택 (LLM 호출 없음)
+            selected_doc = context[ranked[0][0]]
+            print(f"   📐 {label} top-1 (score={ranked[0][1]:.2f})")
+        elif SEARCHER_MODE in ("rerank", "dense_rerank"):
+            # 상위 k개 제목 + snippet만 LLM에 전달 (snippet은 BM25 문장 겹침 기준)
+            top = ranked[:SEARCHER_TOP_K]
+            candidates = [context[i] for i, _ in top]
+            snippets = [index.snippet(i, query) for i, _ in top]
+            print(f"   📐 {label} top-{len(top)}: {[title for title, _ in candidates]}")
     
     # LLM으로 문서 선택
-    selected_doc = _select_doc_with_llm(
-        current_step, 
-        available_context,  # 🆕 필터링된 문서만 전달
-        state.get("step_answers", [])
-    )   
+    if selected_doc is None:
+        selected_doc = yield from _select_doc_with_llm(
+            current_step, 
+            candidates,  # 🆕 필터링된 문서만 전달
+            state.get("step_answers", []),
+            snippets
+        )   
 
     if not selected_doc:
         print(f"   ❌ No document found")
@@ -593,28 +1113,95 @@ def node_searcher(state: QAState) -> QAState:
     
     state["current_doc"] = {
         "title": title,
-        "text": " ".join(sentences)
+        "text": " ".join(sentences),
+        "sentences": list(sentences)
     }
     
     state["action"] = "extract"
     
     return state
 
+def _available_docs(context, failed_docs) -> list:
+    """이미 실패한 제목을 뺀 (title, sentences) 목록 (원래 순서 유지)"""
+    failed = set(failed_docs)
+    return [(title, sentences) for title, sentences in context if title not in failed]
+
+def _retrieve_candidates(state: QAState, query: str, exclude_titles, k: int = None):
+    """
+    Open-domain: 코퍼스 상위 문단 (title, sentences) 목록 (가져온 문단은 retrieved_docs에 누적)
+    검색(mmap 읽기 + 쿼리 인코딩)은 _work로 → async 노드에서는 스레드에서 실행
+    dense 검색 모드면 BM25 + vector hybrid (인덱스에 벡터가 없으면 BM25만)
+    """
+    hybrid = OPEN_DOMAIN_HYBRID or SEARCHER_MODE in _DENSE_MODES
+    hits = yield _work(_search_corpus, query, k or OPEN_DOMAIN_TOP_K, list(exclude_titles), hybrid, name="corpus_search")
+    docs = [(hit["title"], hit["sentences"]) for hit in hits]
+    retrieved = state.setdefault("retrieved_docs", [])
+    known = {title for title, _ in retrieved}
+    retrieved.extend(doc for doc in docs if doc[0] not in known)
+    print(f"   🌐 Corpus top-{len(docs)} / {len(get_corpus_index())}: {[title for title, _ in docs]}")
+    return docs
+
+def _search_corpus(query: str, k: int, exclude_titles: List[str], hybrid: bool) -> List[Dict]:
+    return get_corpus_index().search(query, k=k, exclude_titles=exclude_titles, hybrid=hybrid)
+
+def _candidate_docs(state: QAState) -> list:
+    """문서 후보 전체 (open-domain이면 지금까지 코퍼스에서 가져온 문단)"""
+    if is_open_domain(state.get("hotpot_context", [])):
+        return state.get("retrieved_docs", [])
+    return state.get("hotpot_context", [])
+
+def _get_doc_index(state: QAState) -> BM25Index:
+    """질문 단위 BM25 인덱스 (질문당 한 번만 생성, 문단 저장소에 있으면 저장소 통계로)"""
+    index = state.get("doc_index")
+    if index is None:
+        store = get_paragraph_store()
+        if store is not None:
+            index = store.bm25_index(state["hotpot_context"])
+        if index is None:
+            index = BM25Index(state["hotpot_context"])
+        state["doc_index"] = index
+    return index
+
+def _get_dense_index(state: QAState) -> DenseIndex:
+    """질문 단위 dense 인덱스 (문단 임베딩은 저장소에서 읽거나 첫 검색 때 계산)"""
+    index = state.get("dense_index")
+    if index is None:
+        store = get_paragraph_store()
+        vectors = store.paragraph_vectors(state["hotpot_context"], DENSE_MODEL) if store is not None else None
+        index = DenseIndex(state["hotpot_context"], get_dense_encoder(), doc_vectors=vectors)
+        state["dense_index"] = index
+    return index
+
+def _select_evidence_sentences(doc: Dict, step: str, entities: List[str]) -> List[Tuple[int, str]]:
+    """Extractor 문장 필터 (문단 저장소에 있으면 저장된 문장 토큰으로)"""
+    store = get_paragraph_store()
+    if store is not None:
+        selected = store.select_evidence_sentences(
+            doc["title"], doc["sentences"], step, entities, top_n=EXTRACTOR_TOP_SENTENCES
+        )
+        if selected is not None:
+            return selected
+    return select_evidence_sentences(doc["sentences"], step, entities, top_n=EXTRACTOR_TOP_SENTENCES)
+
 # [3.1]
 def _select_doc_with_llm(
     step: str,
     context: List[Tuple[str, List[str]]],
-    previous_answers: List[Dict]
+    previous_answers: List[Dict],
+    snippets: Optional[List[str]] = None
 ) -> Optional[Tuple[str, List[str]]]:
     """
-    LLM으로 문서 선택 (이전 답변 활용)
+    LLM으로 문서 선택 (이전 답변 활용, snippets가 있으면 제목 옆에 함께 표시)
     """
     
     if not context:
         return None
     
     titles = [title for title, _ in context]
-    titles_str = "\n".join([f"{i+1}. {title}" for i, title in enumerate(titles)])
+    if snippets:
+        titles_str = "\n".join([f"{i+1}. {title} — {snip}" for i, (title, snip) in enumerate(zip(titles, snippets))])
+    else:
+        titles_str = "\n".join([f"{i+1}. {title}" for i, title in enumerate(titles)])
     
     # 🆕 이전 답변 명시
     prev_str = ""
@@ -634,11 +1221,13 @@ def _select_doc_with_llm(
     PROMPT = get_select_doc_prompt(step, prev_str, titles_str, len(titles))
     
     try:
-        result = call_llm(
+        result = (yield _llm(
             "You are a document selector who tracks entity references.",
             PROMPT,
-            temperature=0.2
-        ).strip()
+            temperature=0.2,
+            agent="selector",
+            stop_when=first_integer if STREAM_EARLY_STOP else None  # 첫 숫자가 끝나면 스트림 종료
+        )).strip()
         
         match = re.search(r'\d+', result)
         if match:
@@ -657,7 +1246,7 @@ def _select_doc_with_llm(
 # ==========================================
 # [4] Extractor Agent
 # ==========================================
-def node_extractor(state: QAState) -> QAState:
+def _extractor(state: QAState):
     """
     Tool: 문서에서 증거 추출 (이전 step 답변 활용)
     """
@@ -710,17 +1299,26 @@ Example:
 - DO NOT: Find what other ships carry
 """
     task_text = f"Find information about: {', '.join(reference_entities[-2:])}" if references_prev_step and reference_entities else "Extract information that answers the current step"
+    
+    # 문서 본문: 앞부분 자르기 or 관련 문장만 선별
+    if EXTRACTOR_MODE == "filter" and doc.get("sentences"):
+        selected = _select_evidence_sentences(doc, current_step, reference_entities[-2:])
+        doc_text = format_indexed_sentences(selected)
+        print(f"   🧹 Sentences kept: {[i for i, _ in selected]} / {len(doc['sentences'])}")
+    else:
+        doc_text = doc['text'][:1500]
+    
     # prompt func 호출
     PROMPT = get_extractor_prompt(
         current_step=current_step,
         prev_context=prev_context,
         reference_instruction=reference_instruction,
         doc_title=doc['title'],
-        doc_text=doc['text'][:1500],
+        doc_text=doc_text,
         task_text=task_text
     )
     
-    evidence = call_llm("You are a precise extractor who carefully tracks entity references across steps.", PROMPT, temperature=0.1).strip()
+    evidence = (yield _llm("You are a precise extractor who carefully tracks entity references across steps.", PROMPT, temperature=0.1, agent="extractor")).strip()
     print(f"   ✅ Evidence: {evidence[:100]}...")
     state.setdefault("current_evidence", []).append(evidence)
     state["action"] = "reasoner"
@@ -753,20 +1351,18 @@ def _generate_final_answer(state: QAState) -> str:
     # prompt func 호출
     PROMPT = get_final_answer_prompt(question, steps_text)
     
-    response = call_llm(
+    result, error = yield from _llm_json(
         ANSWER_SYS,
         PROMPT,
-        temperature=0.1
+        "final_answer",
+        temperature=0.1,
+        agent="answer"
     )
     
     # JSON 파싱
     try:
-        response = response.strip()
-        if response.startswith("```"):
-            lines = response.split("\n")
-            response = "\n".join(lines[1:-1])
-        
-        result = json.loads(response)
+        if error is not None:
+            raise error
         final_answer = result.get("final_answer", "")
         
         print(f"\n🎯 [Answer Generator]")
@@ -783,18 +1379,74 @@ def _generate_final_answer(state: QAState) -> str:
         return "Unable to generate answer"
 
 # [5]
-def node_answer(state: QAState) -> QAState:
+def _answer(state: QAState):
     """
     Answer Node: 최종 답변 생성 (단순 변환)
     """
     print(f"\n🎯 [Answer] Generating final answer")
     
     # 단순히 최종 답변만 생성
-    final_answer = _generate_final_answer(state)
+    final_answer = yield from _generate_final_answer(state)
     
     print(f"    Final Answer: {final_answer}")
     
     state["answer"] = final_answer
     state["action"] = "finish"
     
-    return state
\ No newline at end of file
+    return state
+
+# ==========================================
+# [6] Node Entry Points (sync / async)
+# ==========================================
+def node_fast_path(state: QAState) -> QAState:
+    return _run_sync(_fast_path(state))
+
+def node_planner(state: QAState) -> QAState:
+    return _run_sync(_planner(state))
+
+def node_reasoner(state: QAState) -> QAState:
+    return _run_sync(_reasoner(state))
+
+def node_searcher(state: QAState) -> QAState:
+    return _run_sync(_searcher(state))
+
+def node_extractor(state: QAState) -> QAState:
+    return _run_sync(_extractor(state))
+
+def node_answer(state: QAState) -> QAState:
+    return _run_sync(_answer(state))
+
+def node_parallel(state: QAState) -> QAState:
+    """독립 step sub-loop들을 스레드로 동시 실행 (contextvar는 스레드마다 복사)"""
+    substates = _parallel_substates(state)
+    with ThreadPoolExecutor(max_workers=len(substates)) as executor:
+        futures = [
+            executor.submit(contextvars.copy_context().run, _run_sync, _step_subloop(sub))
+            for sub in substates
+        ]
+        results = [f.result() for f in futures]
+    return _merge_parallel(state, results)
+
+async def anode_fast_path(state: QAState) -> QAState:
+    return await _run_async(_fast_path(state))
+
+async def anode_planner(state: QAState) -> QAState:
+    return await _run_async(_planner(state))
+
+async def anode_reasoner(state: QAState) -> QAState:
+    return await _run_async(_reasoner(state))
+
+async def anode_searcher(state: QAState) -> QAState:
+    return await _run_async(_searcher(state))
+
+async def anode_extractor(state: QAState) -> QAState:
+    return await _run_async(_extractor(state))
+
+async def anode_answer(state: QAState) -> QAState:
+    return await _run_async(_answer(state))
+
+async def anode_parallel(state: QAState) -> QAState:
+    """독립 step sub-loop들을 같은 이벤트 루프에서 동시 실행"""
+    substates = _parallel_substates(state)
+    results = await asyncio.gather(*(_run_async(_step_subloop(sub)) for sub in substates))
+    return _merge_parallel(state, list(results))
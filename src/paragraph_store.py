@@ -0,0 +1,330 @@
+import os
+import json
+import hashlib
+import threading
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.retrieval import tokenize, evidence_query_tokens, top_sentence_ids, rank_key
+
+# ==============================
+# 데이터셋 전체 문단 저장소 (paragraph store)
+# ==============================
+# HotpotQA distractor 항목들은 같은 위키 문단을 많이 공유하는데, 질문마다 10개 문단을 새로 토큰화 / 인덱싱한다.
+# 한 번 오프라인으로 (scripts/build_paragraph_store.py) 데이터셋 전체 문단을 title + 본문 해시로 중복 제거해
+# 토큰화 결과(어휘 통계)와 선택적으로 임베딩을 mmap 가능한 NumPy 파일로 저장해 두고,
+# 질문 단위 검색은 "해시 → 행 번호 조회 + 벡터 연산"만 한다.
+#
+# 저장소 디렉터리 (meta.json이 마지막에 써지므로 meta.json이 있으면 완성된 저장소):
+#   meta.json            {"paragraphs", "input_paragraphs", "sentences", "terms", "title_weight", "model", "dim", "sources"}
+#   vocab.json           토큰 목록 (위치 = term id)
+#   keys.npy             (n,) S20   정렬된 문단 sha1 digest
+#   key_rows.npy         (n,) int32 keys 위치 → 행 번호
+#   tf_offsets.npy       (n+1,) int64   행별 (term id, 가중 빈도) 구간 (CSR)
+#   tf_terms.npy         int32
+#   tf_counts.npy        float32        title 토큰은 title_weight배 (BM25Index와 같은 규칙)
+#   doc_len.npy          (n,) float32
+#   sent_offsets.npy     (n+1,) int64   행별 문장 구간
+#   sent_tok_offsets.npy (S+1,) int64   문장별 고유 term id 구간
+#   sent_tok_terms.npy   int32
+#   vectors.npy          (n, dim) float32, 선택 (meta.model 인코더로 정규화된 문단 임베딩)
+#
+# BM25 idf는 기존과 같이 질문의 문단들만으로 계산한다 (순위가 BM25Index와 같음).
+# 질문의 문단이 하나라도 저장소에 없으면 기존 방식(BM25Index / 인코딩)으로 대체.
+
+PARAGRAPH_STORE = os.getenv("PARAGRAPH_STORE", "")  # 저장소 디렉터리, 비우면 사용 안 함
+
+_ARRAYS = (
+    "keys", "key_rows", "tf_offsets", "tf_terms", "tf_counts", "doc_len",
+    "sent_offsets", "sent_tok_offsets", "sent_tok_terms",
+)
+
+
+def paragraph_digest(title: str, sentences: Sequence[str]) -> bytes:
+    """문단 내용 sha1 (src.dense.paragraph_hash의 bytes 형태)"""
+    payload = title + "\x00" + "\x00".join(sentences)
+    return hashlib.sha1(payload.encode("utf-8")).digest()
+
+
+class ParagraphStore:
+    """mmap으로 연 문단 저장소 (행 조회 + 질문 단위 인덱스 생성)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        meta_path = self.path / "meta.json"
+        if not meta_path.exists():
+            raise FileNotFoundError(f"Paragraph store not found (or incomplete): {self.path}")
+        self.meta = json.loads(meta_path.read_text())
+        self.vocab = {term: i for i, term in enumerate(json.loads((self.path / "vocab.json").read_text()))}
+        # np.memmap 서브클래스는 슬라이스마다 비용이 커서 같은 매핑을 보는 일반 ndarray view로 사용
+        for name in _ARRAYS:
+            setattr(self, name, np.load(self.path / f"{name}.npy", mmap_mode="r").view(np.ndarray))
+        vectors_path = self.path / "vectors.npy"
+        self.vectors = np.load(vectors_path, mmap_mode="r").view(np.ndarray) if vectors_path.exists() else None
+        self.model = self.meta.get("model")
+        self.title_weight = self.meta["title_weight"]
+
+    def __len__(self) -> int:
+        return int(self.meta["paragraphs"])
+
+    def lookup(self, context: Iterable[Tuple[str, Sequence[str]]]) -> Optional[np.ndarray]:
+        """(title, sentences) 목록 → 행 번호 배열 (하나라도 없으면 None)"""
+        digests = np.array([paragraph_digest(title, sentences) for title, sentences in context], dtype="S20")
+        if len(digests) == 0 or len(self.keys) == 0:
+            return None
+        pos = np.searchsorted(self.keys, digests)
+        pos[pos >= len(self.keys)] = 0
+        if not np.array_equal(self.keys[pos], digests):
+            return None
+        return np.asarray(self.key_rows[pos])
+
+    def term_ids(self, tokens: Iterable[str]) -> np.ndarray:
+        """토큰 → 정렬된 고유 term id 배열 (저장소에 없는 토큰은 어떤 문단과도 겹치지 않으므로 버림)"""
+        vocab = self.vocab
+        return np.array(sorted({vocab[t] for t in tokens if t in vocab}), dtype=np.int32)
+
+    def sentence_terms(self, row: int) -> Tuple[np.ndarray, np.ndarray]:
+        """행의 (문장별 고유 term id 이어 붙인 배열, 각 항목의 문장 번호)"""
+        first, last = int(self.sent_offsets[row]), int(self.sent_offsets[row + 1])
+        offsets = np.asarray(self.sent_tok_offsets[first:last + 1])
+        terms = np.asarray(self.sent_tok_terms[offsets[0]:offsets[-1]])
+        sent_ids = np.repeat(np.arange(last - first), np.diff(offsets))
+        return terms, sent_ids
+
+    def sentence_overlap(self, row: int, term_ids: np.ndarray) -> np.ndarray:
+        """문장별 term_ids와 겹치는 고유 토큰 수"""
+        terms, sent_ids = self.sentence_terms(row)
+        n = int(self.sent_offsets[row + 1] - self.sent_offsets[row])
+        return np.bincount(sent_ids[_member(terms, term_ids)], minlength=n)
+
+    def select_evidence_sentences(
+        self,
+        title: str,
+        sentences: List[str],
+        step: str,
+        entities: List[str],
+        top_n: int = 4,
+        lead_bonus: float = 0.5,
+    ) -> Optional[List[Tuple[int, str]]]:
+        """src.retrieval.select_evidence_sentences와 같은 결과 (문단이 저장소에 없으면 None)"""
+        rows = self.lookup([(title, sentences)])
+        if rows is None:
+            return None
+        step_toks, ent_toks = evidence_query_tokens(step, entities)
+        scores = (self.sentence_overlap(rows[0], self.term_ids(step_toks))
+                  + 2 * self.sentence_overlap(rows[0], self.term_ids(ent_toks))).astype(float)
+        if len(scores):
+            scores[0] += lead_bonus
+        return [(i, sentences[i]) for i in top_sentence_ids(scores.tolist(), top_n)]
+
+    def bm25_index(self, context: List[Tuple[str, List[str]]], **kwargs) -> Optional["StoreBM25Index"]:
+        rows = self.lookup(context)
+        return StoreBM25Index(self, rows, context, **kwargs) if rows is not None else None
+
+    def paragraph_vectors(self, context: List[Tuple[str, List[str]]], model: str) -> Optional[np.ndarray]:
+        """같은 모델로 만든 임베딩이 있으면 질문 문단들의 (n, dim) 행렬"""
+        if self.vectors is None or self.model != model:
+            return None
+        rows = self.lookup(context)
+        return np.asarray(self.vectors[rows], dtype=np.float32) if rows is not None else None
+
+
+def _member(values: np.ndarray, sorted_ids: np.ndarray) -> np.ndarray:
+    """values의 각 항목이 sorted_ids에 있는지 (작은 배열에서 np.isin보다 빠른 이진 탐색)"""
+    if len(sorted_ids) == 0:
+        return np.zeros(len(values), dtype=bool)
+    pos = np.minimum(np.searchsorted(sorted_ids, values), len(sorted_ids) - 1)
+    return sorted_ids[pos] == values
+
+
+class StoreBM25Index:
+    """
+    저장소 어휘 통계로 만든 질문 단위 BM25 (BM25Index와 같은 rank / snippet 인터페이스, 같은 점수)
+
+    질문 문단들의 (term, 빈도) 항목으로 (문서 × 질문 내 term) BM25 기여도 행렬을 한 번 만들고,
+    rank는 쿼리 term 열 조회 → 행 합만 한다.
+    """
+
+    def __init__(self, store: ParagraphStore, rows: np.ndarray, context: List[Tuple[str, List[str]]],
+                 k1: float = 1.5, b: float = 0.75):
+        self.store = store
+        self.rows = rows
+        self.titles = [title for title, _ in context]
+        self.sentences = [list(sentences) for _, sentences in context]
+
+        offsets = store.tf_offsets
+        spans = [(offsets[r], offsets[r + 1]) for r in rows]
+        terms = np.concatenate([store.tf_terms[a:z] for a, z in spans])
+        counts = np.concatenate([store.tf_counts[a:z] for a, z in spans]).astype(np.float64)
+        doc_pos = np.repeat(np.arange(len(rows)), [z - a for a, z in spans])
+
+        doc_len = store.doc_len[rows].astype(np.float64)
+        avg_len = doc_len.mean()
+        norm = k1 * (1 - b + b * doc_len / (avg_len or 1.0))
+
+        # 질문 내 term 번호 (열) + 문서 빈도 → 질문 단위 idf (BM25Index와 같은 식)
+        self.terms, cols, df = np.unique(terms, return_inverse=True, return_counts=True)
+        n = len(rows)
+        idf = np.log(1 + (n - df + 0.5) / (df + 0.5))
+        self.weights = np.zeros((n, len(self.terms)))
+        self.weights[doc_pos, cols] = idf[cols] * counts * (k1 + 1) / (counts + norm[doc_pos])
+
+    def rank(self, query: str, titles: Optional[Iterable[str]] = None) -> List[Tuple[int, float]]:
+        """
+        query 기준 문서 순위 → [(문서 위치, 점수)] (점수 내림차순, 동점은 원래 순서)
+
+        titles가 주어지면 해당 제목의 문서만 후보로 사용
+        """
+        q = self.store.term_ids(tokenize(query))
+        cols = np.searchsorted(self.terms, q)
+        cols = cols[_member(q, self.terms)]
+        scores = self.weights[:, cols].sum(axis=1).tolist()
+        allowed = set(titles) if titles is not None else None
+        scored = [
+            (i, scores[i])
+            for i, title in enumerate(self.titles)
+            if allowed is None or title in allowed
+        ]
+        return sorted(scored, key=rank_key)
+
+    def snippet(self, doc: int, query: str, max_chars: int = 200) -> str:
+        """query와 가장 많이 겹치는 문장 (없으면 첫 문장)"""
+        sentences = self.sentences[doc]
+        if not sentences:
+            return ""
+        overlap = self.store.sentence_overlap(self.rows[doc], self.store.term_ids(tokenize(query)))
+        text = sentences[int(np.argmax(overlap))].strip()
+        return text if len(text) <= max_chars else text[:max_chars].rstrip() + "..."
+
+
+# ---------- 빌드 ----------
+
+def build_paragraph_store(
+    items: Iterable[Dict],
+    out_dir: Path,
+    title_weight: int = 2,
+    encoder=None,
+    chunk_size: int = 4096,
+    sources: Sequence[str] = (),
+) -> Dict:
+    """
+    HotpotQA 항목들 → 문단 저장소 (중복 문단은 한 번만)
+
+    encoder(src.dense.DenseEncoder)를 주면 vectors.npy도 만든다 (DenseEncoder 임베딩 캐시 재사용).
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    meta_path = out_dir / "meta.json"
+    if meta_path.exists():
+        meta_path.unlink()  # 빌드 도중 실패하면 미완성 저장소로 남도록
+
+    vocab: Dict[str, int] = {}
+    digests: List[bytes] = []
+    seen = set()
+    paragraphs: List[Tuple[str, List[str]]] = []  # 임베딩용 (encoder가 있을 때만)
+    tf_offsets, tf_terms, tf_counts, doc_len = array("q", [0]), array("i"), array("f"), array("f")
+    sent_offsets, sent_tok_offsets, sent_tok_terms = array("q", [0]), array("q", [0]), array("i")
+
+    def term_id(token: str) -> int:
+        tid = vocab.get(token)
+        if tid is None:
+            tid = vocab[token] = len(vocab)
+        return tid
+
+    total = 0
+    for item in items:
+        for title, sentences in item["context"]:
+            total += 1
+            digest = paragraph_digest(title, sentences)
+            if digest in seen:
+                continue
+            seen.add(digest)
+            digests.append(digest)
+            if encoder is not None:
+                paragraphs.append((title, list(sentences)))
+
+            sent_toks = [tokenize(s) for s in sentences]
+            tf = Counter(tokenize(title) * title_weight)
+            for toks in sent_toks:
+                tf.update(toks)
+                sent_tok_terms.extend(sorted({term_id(t) for t in toks}))
+                sent_tok_offsets.append(len(sent_tok_terms))
+            sent_offsets.append(len(sent_tok_offsets) - 1)
+
+            for token, count in tf.items():
+                tf_terms.append(term_id(token))
+                tf_counts.append(count)
+            tf_offsets.append(len(tf_terms))
+            doc_len.append(sum(tf.values()))
+
+    n = len(digests)
+    keys = np.array(digests, dtype="S20")
+    order = np.argsort(keys, kind="stable")
+    arrays = {
+        "keys": keys[order],
+        "key_rows": order.astype(np.int32),
+        "tf_offsets": np.frombuffer(tf_offsets, dtype=np.int64),
+        "tf_terms": np.frombuffer(tf_terms, dtype=np.int32),
+        "tf_counts": np.frombuffer(tf_counts, dtype=np.float32),
+        "doc_len": np.frombuffer(doc_len, dtype=np.float32),
+        "sent_offsets": np.frombuffer(sent_offsets, dtype=np.int64),
+        "sent_tok_offsets": np.frombuffer(sent_tok_offsets, dtype=np.int64),
+        "sent_tok_terms": np.frombuffer(sent_tok_terms, dtype=np.int32),
+    }
+    for name, arr in arrays.items():
+        np.save(out_dir / f"{name}.npy", arr)
+    (out_dir / "vocab.json").write_text(json.dumps(list(vocab), ensure_ascii=False))
+
+    meta = {
+        "paragraphs": n,
+        "input_paragraphs": total,
+        "sentences": len(sent_tok_offsets) - 1,
+        "terms": len(vocab),
+        "title_weight": title_weight,
+        "model": None,
+        "dim": None,
+        "sources": list(sources),
+    }
+
+    vectors_path = out_dir / "vectors.npy"
+    if vectors_path.exists():
+        vectors_path.unlink()
+    if encoder is not None and n:
+        from src.dense import paragraph_text, paragraph_hash
+        vectors = None
+        for start in range(0, n, chunk_size):
+            chunk = paragraphs[start:start + chunk_size]
+            block = encoder.embed(
+                [paragraph_text(t, s) for t, s in chunk], [paragraph_hash(t, s) for t, s in chunk]
+            )
+            if vectors is None:
+                vectors = np.lib.format.open_memmap(vectors_path, mode="w+", dtype=np.float32, shape=(n, block.shape[1]))
+            vectors[start:start + len(chunk)] = block
+            print(f"[STORE] Embedded {min(start + chunk_size, n)}/{n} paragraphs")
+        vectors.flush()
+        meta["model"] = encoder.model_name
+        meta["dim"] = int(vectors.shape[1])
+
+    meta_path.write_text(json.dumps(meta, indent=2))
+    return meta
+
+
+_store = None
+_store_loaded = False
+_store_lock = threading.Lock()
+
+def get_paragraph_store() -> Optional[ParagraphStore]:
+    """PARAGRAPH_STORE가 설정되어 있으면 프로세스 공용 저장소 (없으면 None)"""
+    global _store, _store_loaded
+    with _store_lock:
+        if not _store_loaded:
+            _store_loaded = True
+            if PARAGRAPH_STORE:
+                _store = ParagraphStore(Path(PARAGRAPH_STORE))
+                print(f"[STORE] Opened {PARAGRAPH_STORE} ({len(_store)} paragraphs, "
+                      f"vectors={_store.model or 'none'})")
+        return _store
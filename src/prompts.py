@@ -1,3 +1,6 @@
+import os
+from typing import List, Tuple
+
 PLANNER_SYS = """
 You are a planner that decomposes a multi-hop QA question into 2-3 simple, ordered subgoals.
 Each subgoal must be a "lookup" step to find a new entity or fact.
@@ -221,13 +224,33 @@ Return JSON:
 # ==========================================
 # Dynamic Prompt Functions
 # ==========================================
+# PROMPT_LAYOUT
+#   default - 기존 순서 (질문 / 근거가 규칙보다 앞)
+#   prefix  - 고정 지시문 / 예시를 앞에, 호출마다 바뀌는 내용(_Volatile)을 마지막 출력 형식 직전에 배치
+#             → 같은 에이전트의 요청들이 긴 공통 prefix를 가져 provider 측 prompt caching 적중
+PROMPT_LAYOUT = os.getenv("PROMPT_LAYOUT", "default").lower()
+
+class _Volatile(str):
+    """호출마다 바뀌는 프롬프트 조각 (질문, 근거, 문서 등)"""
+
+def _layout(*pieces: str) -> str:
+    """프롬프트 조각 조립 (마지막 조각 = 출력 형식 지시, 항상 끝에 유지)"""
+    if PROMPT_LAYOUT != "prefix":
+        return "".join(pieces)
+    *body, tail = pieces
+    static = [p for p in body if not isinstance(p, _Volatile)]
+    volatile = [p for p in body if isinstance(p, _Volatile)]
+    return "\n\n".join(p.strip("\n") for p in static + volatile + [tail])
+
 # 1. planner
 def get_replan_prompt(question: str, plan_str: str, current_step_idx: int, progress_str: str, 
                       found_entities_str: str, promising_evidence_str: str, useful_docs_str: str, 
                       failure_analysis: str, dynamic_strategy: str, replan_count: int) -> str:
-    return f"""
+    return _layout(
+        f"""
 You need to create a NEW plan because the current approach is stuck.
-This is replan attempt {replan_count + 1}/2.
+""",
+        _Volatile(f"""This is replan attempt {replan_count + 1}/2.
 
 **ORIGINAL QUESTION:**
 {question}
@@ -248,7 +271,8 @@ Useful Documents: {useful_docs_str}
 **SUGGESTED STRATEGY:**
 {dynamic_strategy}
 
-**CRITICAL RULES FOR NEW PLAN:**
+"""),
+        f"""**CRITICAL RULES FOR NEW PLAN:**
 1. MUST use the information already found (don't start from scratch)
 2. If you found relevant entities (like "New York Botanical Garden, Bronx"), USE THEM
 3. Focus on finding missing pieces, not re-discovering what we know
@@ -262,21 +286,26 @@ Useful Documents: {useful_docs_str}
 - Original: "Find actor born in 1955..." → Found: "Gary Sinise"  
 - New plan: "Find awards Gary Sinise was nominated for"
 
-Return ONLY valid JSON:
+""",
+        f"""Return ONLY valid JSON:
 {{"plan": ["step 1", "step 2", ...]}}
 """
+    )
 # 2. Reasoner
 ## [2.1]
 def get_synthesize_prompt(current_step: str, context_text: str) -> str:
-    return f"""Analyze all the information and answer the question.
+    return _layout(
+        f"""Analyze all the information and answer the question.
 
-**CURRENT QUESTION:**
+""",
+        _Volatile(f"""**CURRENT QUESTION:**
 {current_step}
 
 **ALL INFORMATION GATHERED:**
 {context_text}
 
-**CRITICAL INSTRUCTIONS:**
+"""),
+        f"""**CRITICAL INSTRUCTIONS:**
 1. Read ALL the evidence carefully
 2. The answer is DIRECTLY stated in the evidence
 3. Look for exact matches to the question
@@ -292,18 +321,23 @@ Think step by step:
 2. What relevant information is in the evidence?
 3. What is the direct answer based on evidence?
 
-Return ONLY the direct answer (very concise):"""
+""",
+        f"""Return ONLY the direct answer (very concise):"""
+    )
 ## [2.2]
 def get_verify_evidence_prompt(step: str, evidence_text: str) -> str:
-    return f"""Judge if the evidence is sufficient to answer the question.
+    return _layout(
+        f"""Judge if the evidence is sufficient to answer the question.
 
-**QUESTION:**
+""",
+        _Volatile(f"""**QUESTION:**
 {step}
 
 **EVIDENCE:**
 {evidence_text}
 
-**CRITICAL RULES:**
+"""),
+        f"""**CRITICAL RULES:**
 1. Evidence is SUFFICIENT if it contains the specific information being asked
 2. Evidence is INSUFFICIENT only if it clearly lacks the required information
 3. Partial information is better than no information - mark as SUFFICIENT
@@ -322,17 +356,22 @@ Think step by step:
 If you can extract ANY answer (even if incomplete), say "yes".
 If evidence explicitly says "no information" or "document does not provide", say "no".
 
-Answer ONLY "yes" or "no":"""
+""",
+        f"""Answer ONLY "yes" or "no":"""
+    )
 ## [2.3]
 def get_step_answer_prompt(step: str, evidence_text: str) -> str:
-    return f"""Extract the answer from evidence for this step.
+    return _layout(
+        f"""Extract the answer from evidence for this step.
 
-Step Question: {step}
+""",
+        _Volatile(f"""Step Question: {step}
 
 Evidence:
 {evidence_text}
 
-**CRITICAL RULES:**
+"""),
+        f"""**CRITICAL RULES:**
 1. Read the step question CAREFULLY
 2. Extract what the question is ASKING FOR:
    - "Find the position" → Extract POSITION (not person name)
@@ -347,30 +386,123 @@ Look at the step question: what is it asking for?
 - If it asks for "name" or "actress", extract the person's name
 - If it asks for "location", extract the place
 
-Answer (extract what the question asks for):"""
+""",
+        f"""Answer (extract what the question asks for):"""
+    )
+
+## [2.4] 증거 검증 + step 답변 (fused, 1회 호출)
+def get_verify_and_answer_prompt(step: str, evidence_text: str) -> str:
+    return _layout(
+        f"""Judge if the evidence is sufficient to answer the question, and if so, extract the answer.
+
+""",
+        _Volatile(f"""**QUESTION:**
+{step}
+
+**EVIDENCE:**
+{evidence_text}
+
+"""),
+        f"""**JUDGING RULES:**
+1. Evidence is SUFFICIENT if it contains the specific information being asked
+2. Evidence is INSUFFICIENT only if it clearly lacks the required information
+3. Partial information is better than no information - mark as SUFFICIENT
+4. If evidence says "document does not provide", mark as INSUFFICIENT
+
+**ANSWER RULES (only when sufficient):**
+1. Extract what the question is ASKING FOR:
+   - "Find the position" → Extract POSITION (not person name)
+   - "Find the name" → Extract NAME
+   - "Find the location" → Extract LOCATION
+2. Keep answer SHORT and DIRECT, no explanations
+
+""",
+        f"""Return ONLY valid JSON:
+{{"sufficient": true, "answer": "short answer"}}
+or
+{{"sufficient": false, "answer": ""}}"""
+    )
+
+# 0. Fast path (단일 호출 추출 + 답변)
+def get_fast_path_prompt(question: str, docs_text: str) -> str:
+    return _layout(
+        f"""Answer the question directly from the documents below, if they are enough.
+
+""",
+        _Volatile(f"""**QUESTION:**
+{question}
+
+**DOCUMENTS:**
+{docs_text}
+
+"""),
+        f"""**RULES:**
+1. Use ONLY the documents above - no outside knowledge
+2. Keep answer MINIMAL (1-10 words), no explanations
+   - YES/NO confirmation questions → "yes" or "no"
+   - "Which of A or B ...?" / "Who was older, A or B?" → the selected entity
+3. Cite every sentence you used as [document number, sentence index]
+4. confidence (0.0-1.0): how sure you are that the cited sentences fully answer the question
+   - If a needed fact is missing from the documents, confidence must be below 0.5
+
+""",
+        f"""Return ONLY valid JSON:
+{{"answer": "minimal answer", "confidence": 0.9, "evidence": [[1, 0], [2, 3]]}}"""
+    )
+
+## [2.5] 증거 검증 여러 건을 1회 호출로 (JUDGE_BATCH)
+def get_batch_verify_prompt(items: List[Tuple[str, str]]) -> str:
+    blocks = "\n\n".join(
+        f"### Item {i}\n**QUESTION:**\n{step}\n\n**EVIDENCE:**\n{evidence_text}"
+        for i, (step, evidence_text) in enumerate(items, 1)
+    )
+    return _layout(
+        f"""For EACH item below, judge if the evidence is sufficient to answer its question.
+Judge every item independently - do not use one item's evidence for another.
+
+**CRITICAL RULES:**
+1. Evidence is SUFFICIENT if it contains the specific information being asked
+2. Evidence is INSUFFICIENT only if it clearly lacks the required information
+3. Partial information is better than no information - mark as SUFFICIENT
+4. If evidence says "no information" or "document does not provide", mark as INSUFFICIENT
+
+""",
+        _Volatile(f"""{blocks}
+
+"""),
+        f"""Return ONLY valid JSON with exactly {len(items)} verdicts, in item order:
+{{"verdicts": ["yes", "no", ...]}}"""
+    )
 
 # 3.Searcher
 def get_select_doc_prompt(step: str, prev_str: str, titles_str: str, num_titles: int) -> str:
-    return f"""Select the BEST document for this search goal.
+    return _layout(
+        f"""Select the BEST document for this search goal.
 
-**Current Goal:** {step}{prev_str}
+""",
+        _Volatile(f"""**Current Goal:** {step}{prev_str}
 
 **Available Documents:**
 {titles_str}
 
-**INSTRUCTIONS:**
+"""),
+        f"""**INSTRUCTIONS:**
 1. Read goal carefully - what specific information do we need?
 2. If goal references previous findings, look for documents about THOSE entities
 3. Choose the most directly relevant document
 
 Think: Which title best matches what we're looking for?
 
-Return ONLY the number (1-{num_titles}):"""
+""",
+        f"""Return ONLY the number (1-{num_titles}):"""
+    )
 # 4.Extractor
 def get_extractor_prompt(current_step: str, prev_context: str, reference_instruction: str, doc_title: str, doc_text: str, task_text: str) -> str:
-    return f"""Extract relevant information from the document.
+    return _layout(
+        f"""Extract relevant information from the document.
 
-**CURRENT STEP:**
+""",
+        _Volatile(f"""**CURRENT STEP:**
 {current_step}
 {prev_context}
 {reference_instruction}
@@ -380,7 +512,8 @@ Title: {doc_title}
 Content:
 {doc_text}
 
-**EXTRACTION RULES:**
+"""),
+        f"""**EXTRACTION RULES:**
 1. 🚨 If current question references "those/these/that/from step X":
    - The question is asking about the ENTITIES from previous steps
    - Look for information specifically about those entities
@@ -390,21 +523,27 @@ Content:
 
 3. Extract specific, relevant information (1-2 sentences)
 
-**YOUR TASK:**
+""",
+        _Volatile(f"""**YOUR TASK:**
 {task_text}
 
-Extracted information (1-2 sentences):"""
+"""),
+        f"""Extracted information (1-2 sentences):"""
+    )
 # 5. Answer
 def get_final_answer_prompt(question: str, steps_text: str) -> str:
-    return f"""Analyze the question and generate the final answer.
+    return _layout(
+        f"""Analyze the question and generate the final answer.
 
-**ORIGINAL QUESTION:**
+""",
+        _Volatile(f"""**ORIGINAL QUESTION:**
 {question}
 
 **STEP-BY-STEP ANALYSIS (with evidence):**
 {steps_text}
 
-🔥 **CRITICAL - CHECK EVIDENCE FIRST:**
+"""),
+        f"""🔥 **CRITICAL - CHECK EVIDENCE FIRST:**
 
 Before deciding the answer:
 1. READ THE EVIDENCE carefully - evidence contains the raw facts
@@ -463,10 +602,30 @@ If evidence contains the exact answer, use it directly!
 3. Identify question type (yes/no, which, what, etc.)
 4. Extract the answer from evidence (or step answer if no evidence)
 
-Return ONLY valid JSON:
+""",
+        f"""Return ONLY valid JSON:
 {{
   "question_type": "yes_no / what / who / where / when / which_select",
   "final_answer": "minimal answer",
   "reasoning": "Found in evidence: [brief quote or explanation]"
 }}
-"""
\ No newline at end of file
+"""
+    )
+# 6. 구조화 출력 repair (STRUCTURED_OUTPUT=tolerant / schema, 파싱 실패 시 1회)
+def get_json_repair_prompt(user_prompt: str, bad_reply: str, error: str, format_hint: str) -> str:
+    return _layout(
+        f"""Your previous reply to the request below could not be used because it was not valid JSON in the required format.
+
+""",
+        _Volatile(f"""**ORIGINAL REQUEST:**
+{user_prompt}
+
+**YOUR PREVIOUS REPLY:**
+{bad_reply[:2000]}
+
+**PROBLEM:** {error}
+
+"""),
+        f"""Return ONLY valid JSON, no explanation or code fences, in this format:
+{format_hint}"""
+    )
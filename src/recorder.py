@@ -0,0 +1,145 @@
+import json
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from src.cache import make_cache_key
+
+# ==============================
+# 질문 단위 실행 기록 (record / replay)
+# ==============================
+# record_question() 블록 안에서 실행된 call_llm / acall_llm 요청·응답과 노드 전이(변경된 state 키)를
+# 순서대로 모은다. metrics와 같은 contextvar 방식이라 스레드 풀 / asyncio 태스크에서도 같은 질문으로 모인다.
+#
+# 파일 포맷 (JSONL, 질문 여러 개를 이어 붙임):
+#   {"type": "question", "q": 0, "question", "context", "config"}
+#   {"type": "node", "q": 0, "name": "planner", "update": {...}}
+#   {"type": "llm", "q": 0, "agent", "system_prompt", "user_prompt", "model", "temperature", "key", "response"}
+#   {"type": "final", "q": 0, "state": {...}}
+# llm 줄은 src.backends.load_replay 형식과 같다 → MockBackend(strict)로 네트워크 없이 재실행
+
+_current: contextvars.ContextVar = contextvars.ContextVar("question_recorder", default=None)
+
+# 최종 state 비교 / 기록에서 제외 (입력 그대로이거나 입력에서 다시 만들어지는 값)
+_SKIP_KEYS = ("hotpot_context", "doc_index", "dense_index")
+_MISSING = object()
+
+
+def jsonable(obj: Any) -> Any:
+    """tuple → list, set → 정렬된 list 등 JSON 왕복 후와 같은 형태로 정규화"""
+    return json.loads(json.dumps(obj, ensure_ascii=False, default=_default))
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj, key=repr)
+    return repr(obj)
+
+
+def comparable_state(state: Dict) -> Dict:
+    """비교용 최종 state (hotpot_context / 인덱스 객체 제외, JSON 정규화)"""
+    return jsonable({k: v for k, v in state.items() if k not in _SKIP_KEYS})
+
+
+class QuestionRecorder:
+    """질문 하나의 LLM 요청·응답 / 노드 전이 / 최종 state 기록"""
+
+    def __init__(self, question: str, context, config: Optional[Dict] = None):
+        self.question = question
+        self.context = context
+        self.config = config or {}
+        self.nodes: List[Dict] = []
+        self.llm: List[Dict] = []
+        self.final: Optional[Dict] = None
+        self._lock = threading.Lock()
+
+    def record_llm(self, agent: str, system_prompt: str, user_prompt: str, model: str, temperature: float,
+                   response: str) -> None:
+        """system / user는 call_llm이 strip한 뒤의 값 (캐시 / replay 키와 같은 입력)"""
+        record = {
+            "agent": agent,
+            "system_prompt": system_prompt,
+            "user_prompt": user_prompt,
+            "model": model,
+            "temperature": temperature,
+            "key": make_cache_key(system_prompt, user_prompt, model, temperature),
+            "response": response,
+        }
+        with self._lock:
+            self.llm.append(record)
+
+    def record_node(self, name: str, before: Dict, after: Dict) -> None:
+        """노드 실행 전후 state → 바뀐 키만 기록 (노드들이 state를 제자리에서 고치므로 before는 스냅샷)"""
+        after = comparable_state(after)
+        update = {k: v for k, v in after.items() if before.get(k, _MISSING) != v}
+        with self._lock:
+            self.nodes.append({"name": name, "update": update})
+
+    def record_final(self, state: Dict) -> None:
+        self.final = comparable_state(state)
+
+    @property
+    def node_sequence(self) -> List[str]:
+        return [n["name"] for n in self.nodes]
+
+    def to_records(self, q: int) -> List[Dict]:
+        records = [{"type": "question", "q": q, "question": self.question,
+                    "context": jsonable(self.context), "config": self.config}]
+        records += [{"type": "node", "q": q, **n} for n in self.nodes]
+        records += [{"type": "llm", "q": q, **r} for r in self.llm]
+        if self.final is not None:
+            records.append({"type": "final", "q": q, "state": self.final})
+        return records
+
+    def write(self, f, q: int) -> None:
+        for record in self.to_records(q):
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+@contextmanager
+def record_question(question: str, context, config: Optional[Dict] = None):
+    """
+    with record_question(q, ctx) as rec:
+        state = run_question(q, ctx)
+        rec.record_final(state)
+    """
+    recorder = QuestionRecorder(question, context, config)
+    token = _current.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current.reset(token)
+
+
+def current_recorder() -> Optional[QuestionRecorder]:
+    return _current.get()
+
+
+def snapshot(state: Dict) -> Optional[Dict]:
+    """기록 중일 때만 노드 실행 전 state 스냅샷 (아니면 None → 비용 없음)"""
+    if _current.get() is None:
+        return None
+    return comparable_state(state)
+
+
+def load_traces(path) -> List[Dict]:
+    """기록 파일 → 질문별 {"question", "context", "config", "nodes", "llm", "final"} (q 순서)"""
+    traces: Dict[int, Dict] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            q = record.pop("q")
+            kind = record.pop("type")
+            if kind == "question":
+                traces[q] = {**record, "nodes": [], "llm": [], "final": None}
+            elif kind == "node":
+                traces[q]["nodes"].append(record)
+            elif kind == "llm":
+                traces[q]["llm"].append(record)
+            elif kind == "final":
+                traces[q]["final"] = record["state"]
+    return [traces[q] for q in sorted(traces)]
@@ -0,0 +1,96 @@
+import os
+import json
+import threading
+from pathlib import Path
+from typing import Dict, List
+
+# ==============================
+# 결과 스트리밍 저장 (JSONL, 이어서 실행 가능)
+# ==============================
+# 샘플 하나가 끝날 때마다 한 줄씩 append → 저장 비용 O(1)/샘플.
+# 중간에 죽어도 이미 기록된 index는 다음 실행에서 건너뛴다.
+
+
+class JsonlResultWriter:
+    """
+    info 레코드를 한 줄씩 append 하는 writer
+
+    fsync_every:
+        0 - flush만 (OS 버퍼에 맡김)
+        1 - 매 레코드 fsync (가장 안전)
+        N - N개마다 fsync
+    """
+
+    def __init__(self, path, fsync_every: int = 1):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fsync_every = fsync_every
+        self._count = 0
+        self._lock = threading.Lock()
+        _truncate_partial_line(self.path)
+        self._f = open(self.path, "a", encoding="utf-8")
+
+    def write(self, record: Dict) -> None:
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._f.write(line)
+            self._f.flush()
+            self._count += 1
+            if self.fsync_every and self._count % self.fsync_every == 0:
+                os.fsync(self._f.fileno())
+
+    def close(self) -> None:
+        with self._lock:
+            if self._f.closed:
+                return
+            self._f.flush()
+            if self.fsync_every:
+                os.fsync(self._f.fileno())
+            self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _truncate_partial_line(path: Path) -> None:
+    """비정상 종료로 잘린 마지막 줄 제거 (다음 append가 이어 붙지 않도록)"""
+    if not path.exists() or path.stat().st_size == 0:
+        return
+    with open(path, "rb+") as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) == b"\n":
+            return
+        f.seek(0)
+        data = f.read()
+        f.truncate(data.rfind(b"\n") + 1)
+
+
+def read_jsonl_results(path) -> Dict[int, Dict]:
+    """
+    JSONL 결과 읽기 → {index: info}
+
+    같은 index가 여러 번 있으면 마지막 레코드가 우선 (에러 후 재실행한 경우)
+    """
+    path = Path(path)
+    records = {}
+    if not path.exists():
+        return records
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                info = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # 잘린 줄
+            records[info["index"]] = info
+    return records
+
+
+def completed_indices(records: Dict[int, Dict]) -> List[int]:
+    """에러 없이 끝난 index (에러 레코드는 다시 실행 대상)"""
+    return [idx for idx, info in records.items() if "error" not in info]
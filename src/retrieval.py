@@ -0,0 +1,158 @@
+import re
+import math
+from collections import Counter
+from typing import List, Tuple, Dict, Optional, Iterable
+
+# ==============================
+# 질문 단위 어휘 인덱스 (BM25)
+# ==============================
+# hotpot_context의 문서(title + sentences)를 질문 시작 시 한 번 인덱싱하고,
+# Searcher가 현재 step + 이전 답변으로 후보 문서를 순위화하는 데 사용한다.
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# 계획 문장에 반복적으로 등장하는 단어들 (순위에 도움이 안 됨)
+STOPWORDS = frozenset("""
+a an the of in on at to for from by with and or as is was were are be been being
+that this those these it its their they them he she his her who whom whose which what
+when where why how did does do find determine identify step steps information about
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """소문자 영숫자 토큰 (불용어 제외)"""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def rank_key(scored: Tuple[int, float]):
+    """점수 내림차순, 동점은 원래 순서 (합산 순서에 따른 마지막 자리 오차는 동점으로 취급)"""
+    return -round(scored[1], 9), scored[0]
+
+
+class BM25Index:
+    """
+    문서 리스트에 대한 Okapi BM25 인덱스
+
+    - 문서 = title + 모든 sentence (title 토큰은 title_weight배 가중)
+    - 문장별 토큰도 보관해 snippet 선택에 재사용
+    """
+
+    def __init__(self, context: List[Tuple[str, List[str]]], k1: float = 1.5, b: float = 0.75, title_weight: int = 2):
+        self.titles = [title for title, _ in context]
+        self.sentences = [list(sentences) for _, sentences in context]
+        self.k1 = k1
+        self.b = b
+
+        self.doc_tf: List[Counter] = []
+        self.sent_tokens: List[List[List[str]]] = []
+        for title, sentences in context:
+            sent_toks = [tokenize(s) for s in sentences]
+            tf = Counter(tokenize(title) * title_weight)
+            for toks in sent_toks:
+                tf.update(toks)
+            self.doc_tf.append(tf)
+            self.sent_tokens.append(sent_toks)
+
+        self.doc_len = [sum(tf.values()) for tf in self.doc_tf]
+        self.avg_len = (sum(self.doc_len) / len(self.doc_len)) if self.doc_len else 0.0
+
+        df = Counter()
+        for tf in self.doc_tf:
+            df.update(tf.keys())
+        n = len(self.doc_tf)
+        self.idf = {t: math.log(1 + (n - d + 0.5) / (d + 0.5)) for t, d in df.items()}
+
+    def score(self, query_tokens: Iterable[str], doc: int) -> float:
+        tf = self.doc_tf[doc]
+        norm = self.k1 * (1 - self.b + self.b * self.doc_len[doc] / (self.avg_len or 1.0))
+        s = 0.0
+        for t in query_tokens:
+            f = tf.get(t)
+            if f:
+                s += self.idf[t] * f * (self.k1 + 1) / (f + norm)
+        return s
+
+    def rank(self, query: str, titles: Optional[Iterable[str]] = None) -> List[Tuple[int, float]]:
+        """
+        query 기준 문서 순위 → [(문서 위치, 점수)] (점수 내림차순, 동점은 원래 순서)
+
+        titles가 주어지면 해당 제목의 문서만 후보로 사용
+        """
+        q = set(tokenize(query))
+        allowed = set(titles) if titles is not None else None
+        scored = [
+            (i, self.score(q, i))
+            for i, title in enumerate(self.titles)
+            if allowed is None or title in allowed
+        ]
+        return sorted(scored, key=rank_key)
+
+    def snippet(self, doc: int, query: str, max_chars: int = 200) -> str:
+        """query와 가장 많이 겹치는 문장 (없으면 첫 문장)"""
+        sentences = self.sentences[doc]
+        if not sentences:
+            return ""
+        q = set(tokenize(query))
+        best = max(
+            range(len(sentences)),
+            key=lambda i: (len(q.intersection(self.sent_tokens[doc][i])), -i)
+        )
+        text = sentences[best].strip()
+        return text if len(text) <= max_chars else text[:max_chars].rstrip() + "..."
+
+
+_STEP_REF_RE = re.compile(r"\(from steps?[\d\s,and]*\)", re.IGNORECASE)
+
+
+def build_search_query(step: str, previous_answers: List[Dict]) -> str:
+    """현재 step + 최근 이전 답변으로 검색 쿼리 구성 ("(from step N)" 표기는 제거)"""
+    parts = [_STEP_REF_RE.sub(" ", step)]
+    parts.extend(a["answer"] for a in previous_answers[-2:])
+    return " ".join(parts)
+
+
+# ==============================
+# 문장 단위 증거 필터 (Extractor 앞단)
+# ==============================
+
+def evidence_query_tokens(step: str, entities: List[str]) -> Tuple[set, set]:
+    """문장 점수용 (step 토큰, 참조 엔티티 토큰) ("(from step N)" 표기는 제거)"""
+    return set(tokenize(_STEP_REF_RE.sub(" ", step))), set(tokenize(" ".join(entities)))
+
+
+def score_sentences(sentences: List[str], step: str, entities: List[str], lead_bonus: float = 0.5) -> List[float]:
+    """
+    문장별 점수 = step 토큰 겹침 + 2 × 참조 엔티티 토큰 겹침 (+ 첫 문장 보너스)
+
+    HotpotQA 문서의 첫 문장은 대상 정의문인 경우가 많아 약간의 가중치를 준다.
+    """
+    step_toks, ent_toks = evidence_query_tokens(step, entities)
+    scores = []
+    for i, sentence in enumerate(sentences):
+        toks = set(tokenize(sentence))
+        score = len(toks & step_toks) + 2 * len(toks & ent_toks)
+        if i == 0:
+            score += lead_bonus
+        scores.append(score)
+    return scores
+
+
+def select_evidence_sentences(
+    sentences: List[str],
+    step: str,
+    entities: List[str],
+    top_n: int = 4
+) -> List[Tuple[int, str]]:
+    """점수 상위 top_n 문장 → [(문장 인덱스, 문장)] (원래 순서 유지)"""
+    scores = score_sentences(sentences, step, entities)
+    return [(i, sentences[i]) for i in top_sentence_ids(scores, top_n)]
+
+
+def top_sentence_ids(scores, top_n: int) -> List[int]:
+    """점수 상위 top_n 문장 인덱스 (동점은 앞 문장 우선, 반환은 원래 순서)"""
+    keep = sorted(range(len(scores)), key=lambda i: (-scores[i], i))[:top_n]
+    return sorted(keep)
+
+
+def format_indexed_sentences(selected: List[Tuple[int, str]]) -> str:
+    return "\n".join(f"[{i}] {sentence.strip()}" for i, sentence in selected)
@@ -0,0 +1,284 @@
+import os
+import time
+import random
+import asyncio
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+
+from src.metrics import span
+
+# ==============================
+# LLM 호출 스케줄러 (RPM / TPM 제한 + 재시도)
+# ==============================
+# call_llm / acall_llm 이 모든 요청을 이 스케줄러로 보낸다.
+# - 토큰 버킷 2개 (분당 요청 수 / 분당 토큰 수), 0이면 제한 없음
+# - 429 / 408 / 409 / 5xx / 타임아웃 / 연결 오류는 지수 백오프 + full jitter로 재시도
+# - Retry-After (retry-after-ms) 헤더가 있으면 그 시간 이상 대기
+# - 대기 중 / 실행 중 요청 수를 stats()로 노출 (queue depth)
+#
+# OpenAI 클라이언트 자체 재시도(max_retries)는 끄고 여기서만 재시도한다.
+
+LLM_RPM = float(os.getenv("LLM_RPM", "0"))
+LLM_TPM = float(os.getenv("LLM_TPM", "0"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "6"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "30"))
+
+RETRYABLE_STATUS = {408, 409, 429}
+
+
+class TokenBucket:
+    """
+    분당 rate_per_min 만큼 채워지는 버킷 (용량 = 1분치)
+
+    reserve(n)은 즉시 n을 차감하고 (음수 허용) 잔량이 0 이상이 될 때까지의 대기 시간을 반환한다.
+    → 요청 순서대로 대기 시간이 늘어나므로 락을 잡은 채 잠들 필요가 없다 (sync / async 공용).
+    """
+
+    def __init__(self, rate_per_min: float):
+        self.rate = rate_per_min / 60.0
+        self.capacity = rate_per_min
+        self.level = rate_per_min
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, n: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.level -= min(n, self.capacity)  # 한 요청이 버킷 용량보다 커도 영원히 막히지 않도록
+            return 0.0 if self.level >= 0 else -self.level / self.rate
+
+    def adjust(self, n: float) -> None:
+        """예약량과 실제 사용량 차이 보정 (n > 0: 더 씀, n < 0: 돌려받음)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.level = min(self.capacity, self.level - n)
+
+
+def _status_code(e: Exception) -> Optional[int]:
+    status = getattr(e, "status_code", None)
+    if status is None:
+        response = getattr(e, "response", None)
+        status = getattr(response, "status_code", None)
+    return status
+
+
+def is_retryable(e: Exception) -> bool:
+    """재시도 가능한 오류인지 (HTTP 상태 코드 / 타임아웃 / 연결 오류)"""
+    status = _status_code(e)
+    if status is not None:
+        return status in RETRYABLE_STATUS or status >= 500
+    try:
+        import openai
+        if isinstance(e, (openai.APITimeoutError, openai.APIConnectionError)):
+            return True
+    except ImportError:
+        pass
+    return isinstance(e, (TimeoutError, ConnectionError))
+
+
+def retry_after_seconds(e: Exception) -> Optional[float]:
+    """오류 응답의 retry-after-ms / retry-after 헤더 → 초 (없으면 None)"""
+    response = getattr(e, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000.0
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMScheduler:
+    """RPM / TPM 토큰 버킷 + 재시도 정책 (프로세스 전역 하나, 스레드 / 이벤트 루프 공용)"""
+
+    def __init__(
+        self,
+        rpm: float = LLM_RPM,
+        tpm: float = LLM_TPM,
+        max_retries: int = LLM_MAX_RETRIES,
+        backoff_base: float = LLM_BACKOFF_BASE,
+        backoff_max: float = LLM_BACKOFF_MAX
+    ):
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0,        # 성공한 요청
+            "attempts": 0,        # 재시도 포함 전송 횟수
+            "retries": 0,
+            "rate_limited": 0,    # 429 응답 수
+            "failed": 0,          # 재시도 후에도 실패
+            "queued": 0,          # 현재 대기 중 (버킷 / 백오프)
+            "in_flight": 0,       # 현재 전송 중
+            "max_queued": 0,
+            "max_in_flight": 0,
+            "wait_time": 0.0,     # 버킷 대기 누적 (초)
+            "backoff_time": 0.0,  # 백오프 대기 누적 (초)
+        }
+
+    # ---------- 통계 ----------
+    def _count(self, key: str, n=1) -> None:
+        with self._lock:
+            self._stats[key] += n
+            if key in ("queued", "in_flight"):
+                peak = "max_" + key
+                self._stats[peak] = max(self._stats[peak], self._stats[key])
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self._stats)
+
+    # ---------- 정책 ----------
+    def _reserve(self, est_tokens: int) -> float:
+        wait = 0.0
+        if self.requests is not None:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.reserve(est_tokens))
+        return wait
+
+    def settle(self, est_tokens: int, used_tokens: int) -> None:
+        """응답의 실제 토큰 수로 TPM 버킷 보정"""
+        if self.tokens is not None and used_tokens:
+            self.tokens.adjust(used_tokens - est_tokens)
+
+    def release(self, est_tokens: int) -> None:
+        """실패한 시도의 TPM 예약 반환 (재시도하면 다시 예약하므로 429가 몰려도 버킷이 실제 사용량보다 빨리 줄지 않음)"""
+        if self.tokens is not None and est_tokens:
+            self.tokens.adjust(-est_tokens)
+
+    def _backoff(self, attempt: int, e: Exception) -> float:
+        """full jitter 지수 백오프, Retry-After가 있으면 그보다 짧게 기다리지 않음"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        retry_after = retry_after_seconds(e)
+        if retry_after is not None:
+            delay = max(delay, retry_after + random.uniform(0, self.backoff_base))
+        return delay
+
+    def _should_retry(self, attempt: int, e: Exception) -> bool:
+        if _status_code(e) == 429:
+            self._count("rate_limited")
+        if attempt >= self.max_retries or not is_retryable(e):
+            self._count("failed")
+            return False
+        self._count("retries")
+        return True
+
+    # ---------- 실행 ----------
+    def call(self, fn: Callable, est_tokens: int = 0):
+        """fn()을 제한 / 재시도 정책 아래 실행 (sync)"""
+        attempt = 0
+        while True:
+            wait = self._reserve(est_tokens)
+            if wait > 0:
+                self._count("queued")
+                self._count("wait_time", wait)
+                try:
+                    with span("rate_limit", "wait"):
+                        time.sleep(wait)
+                finally:
+                    self._count("queued", -1)
+
+            self._count("attempts")
+            self._count("in_flight")
+            try:
+                result = fn()
+            except Exception as e:
+                self.release(est_tokens)
+                if not self._should_retry(attempt, e):
+                    raise
+                delay = self._backoff(attempt, e)
+                print(f"   ⏳ [Scheduler] {type(e).__name__}, retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+            else:
+                self._count("requests")
+                return result
+            finally:
+                self._count("in_flight", -1)
+
+            self._count("queued")
+            self._count("backoff_time", delay)
+            try:
+                with span("backoff", "wait"):
+                    time.sleep(delay)
+            finally:
+                self._count("queued", -1)
+            attempt += 1
+
+    async def acall(self, afn: Callable, est_tokens: int = 0):
+        """await afn()을 제한 / 재시도 정책 아래 실행 (async, 이벤트 루프를 막지 않음)"""
+        attempt = 0
+        while True:
+            wait = self._reserve(est_tokens)
+            if wait > 0:
+                self._count("queued")
+                self._count("wait_time", wait)
+                try:
+                    with span("rate_limit", "wait"):
+                        await asyncio.sleep(wait)
+                finally:
+                    self._count("queued", -1)
+
+            self._count("attempts")
+            self._count("in_flight")
+            try:
+                result = await afn()
+            except Exception as e:
+                self.release(est_tokens)
+                if not self._should_retry(attempt, e):
+                    raise
+                delay = self._backoff(attempt, e)
+                print(f"   ⏳ [Scheduler] {type(e).__name__}, retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+            else:
+                self._count("requests")
+                return result
+            finally:
+                self._count("in_flight", -1)
+
+            self._count("queued")
+            self._count("backoff_time", delay)
+            try:
+                with span("backoff", "wait"):
+                    await asyncio.sleep(delay)
+            finally:
+                self._count("queued", -1)
+            attempt += 1
+
+
+_scheduler: Optional[LLMScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> LLMScheduler:
+    """프로세스 전역 스케줄러 (LLM_RPM / LLM_TPM / LLM_MAX_RETRIES ... 환경 변수로 설정)"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = LLMScheduler()
+    return _scheduler
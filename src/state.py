@@ -23,4 +23,15 @@ class QAState(TypedDict, total=False):
     failed_documents: Dict[int, List[str]]  # Step별 실패한 문서들
     preserved_findings: Dict[str, List[str]] #  재계획 시 찾은 정보 보존용 
     replan_count: int  # 재계획 횟수
-    total_iterations: int  # 전체 반복 횟수
\ No newline at end of file
+    total_iterations: int  # 전체 반복 횟수
+    
+    # 병렬 실행
+    parallel_steps: List[int]  # 동시에 실행할 독립 step 인덱스들 (Reasoner → parallel 노드)
+    
+    # 검색 보조
+    doc_index: Any  # 질문 단위 BM25 인덱스 (BM25Index / 문단 저장소 StoreBM25Index), 첫 검색 시 생성
+    dense_index: Any  # 질문 단위 dense 인덱스 (src.dense.DenseIndex), SEARCHER_MODE=dense* 첫 검색 시 생성
+    retrieved_docs: List[Tuple[str, List[str]]]  # open-domain 모드에서 코퍼스에서 가져온 후보 문단 (누적)
+    
+    # Fast path
+    fast_path: Dict  # {"mode", "hit", "answer", "confidence", "verified", "docs"}
@@ -0,0 +1,43 @@
+import re
+from typing import Callable, Iterable, Optional, Tuple
+
+# ==============================
+# 스트리밍 응답 조기 종료 (stop predicate)
+# ==============================
+# call_llm(..., stop_when=first_integer) 처럼 넘기면 백엔드가 응답을 스트리밍으로 받으면서
+# 지금까지 받은 텍스트에 predicate가 참이 되는 순간 스트림을 닫고 그때까지의 텍스트를 돌려준다.
+# 숫자 하나 / yes·no 하나만 필요한 에이전트(selector, judge)의 time-to-answer 단축용.
+#
+# predicate는 "답이 확정됐는가"만 판단한다: 토큰이 잘려 들어올 수 있으므로
+# 뒤에 다른 글자가 붙어 답이 바뀔 수 있는 동안은 False (예: "1" 다음에 "2"가 올 수 있음).
+# 스트림이 끝나면 predicate와 상관없이 전체 텍스트를 그대로 사용한다.
+
+StopPredicate = Callable[[str], bool]
+
+_INTEGER_RE = re.compile(r"\d+\D")
+_YES_NO_RE = re.compile(r"\b(yes|no)[^a-z]", re.IGNORECASE)
+
+
+def first_integer(text: str) -> bool:
+    """첫 정수가 끝났는지 (숫자 뒤에 숫자가 아닌 글자가 옴)"""
+    return _INTEGER_RE.search(text) is not None
+
+
+def first_yes_no(text: str) -> bool:
+    """첫 yes / no 단어가 끝났는지 ("not" / "none" / "yesterday"는 제외)"""
+    return _YES_NO_RE.search(text) is not None
+
+
+def read_until(chunks: Iterable[str], stop_when: Optional[StopPredicate]) -> Tuple[str, bool]:
+    """텍스트 조각들을 이어 붙이다가 stop_when이 참이 되면 멈춤 → (텍스트, 조기 종료 여부)"""
+    text = ""
+    for chunk in chunks:
+        text += chunk
+        if stop_when is not None and stop_when(text):
+            return text, True
+    return text, False
+
+
+def split_tokens(text: str):
+    """스트리밍 흉내용 토큰 분할 (단어 + 뒤 공백 / 구두점 단위)"""
+    return re.findall(r"\w+|[^\w\s]|\s+", text)
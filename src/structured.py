@@ -0,0 +1,173 @@
+import os
+import re
+import json
+import threading
+from typing import Any, Dict, Optional
+
+# ==============================
+# 구조화 출력 (planner / replanner / answer의 JSON 응답)
+# ==============================
+# STRUCTURED_OUTPUT
+#   off      - 기존 방식: 코드 펜스 제거 후 json.loads, 실패하면 각 에이전트의 fallback (기본값)
+#   tolerant - 응답 어디에 있든 JSON 객체를 찾아 파싱 (설명문 / 펜스 / 잘린 끝 괄호 허용)
+#              + 필수 키 검사, 그래도 실패하면 repair 재요청 1회
+#   schema   - tolerant + 백엔드가 지원하면 provider JSON-schema 모드 (response_format)
+#
+# 모드와 상관없이 에이전트별 파싱 실패 / 복구 횟수를 집계한다 (structured_stats).
+
+STRUCTURED_OUTPUT = os.getenv("STRUCTURED_OUTPUT", "off").lower()
+
+# 에이전트 응답 스키마 (OpenAI strict json_schema 규칙: 모든 속성 required, additionalProperties false)
+SCHEMAS: Dict[str, Dict] = {
+    "plan": {
+        "type": "object",
+        "properties": {"plan": {"type": "array", "items": {"type": "string"}}},
+        "required": ["plan"],
+        "additionalProperties": False,
+    },
+    "final_answer": {
+        "type": "object",
+        "properties": {
+            "question_type": {"type": "string"},
+            "final_answer": {"type": "string"},
+            "reasoning": {"type": "string"},
+        },
+        "required": ["question_type", "final_answer", "reasoning"],
+        "additionalProperties": False,
+    },
+}
+
+_TYPES = {"object": dict, "array": list, "string": str}
+
+# 최소 필수 키 (provider 스키마보다 느슨하게: 없어도 되는 키는 에이전트 코드가 기본값 처리)
+_REQUIRED = {"plan": ("plan",), "final_answer": ("final_answer",)}
+
+
+def response_format(schema: str) -> Dict:
+    """OpenAI chat completions response_format (json_schema, strict)"""
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": schema, "strict": True, "schema": SCHEMAS[schema]},
+    }
+
+
+def schema_hint(schema: str) -> str:
+    """repair 프롬프트용 한 줄 형식 설명"""
+    props = SCHEMAS[schema]["properties"]
+    return json.dumps({k: ([v["items"]["type"]] if v["type"] == "array" else v["type"]) for k, v in props.items()})
+
+
+# ---------- 관대한 JSON 추출 ----------
+
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*\n?(.*?)```", re.DOTALL)
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def _close_truncated(text: str) -> Optional[str]:
+    """
+    앞에서부터 괄호 / 문자열 상태를 추적해, 끝이 잘린 JSON이면 닫는 괄호를 채운 문자열
+    (이미 닫혀 있거나 구조가 어긋나면 None)
+    """
+    stack = []
+    in_string = escape = False
+    for ch in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in _CLOSERS:
+            stack.append(_CLOSERS[ch])
+        elif ch in "}]":
+            if not stack or stack.pop() != ch:
+                return None
+            if not stack:
+                return None  # 이미 완결된 값 → 잘린 게 아님
+    if not stack:
+        return None
+    tail = text.rstrip()
+    if in_string:
+        tail += '"'
+    tail = re.sub(r"[,:]\s*$", "", tail)  # 값 없이 끝난 구분자 제거
+    return tail + "".join(reversed(stack))
+
+
+def extract_json(text: str) -> Any:
+    """
+    LLM 응답에서 첫 번째 JSON 객체 / 배열 → 파이썬 값 (못 찾으면 ValueError)
+
+    1) 코드 펜스 안쪽 우선, 2) 앞뒤 설명문을 건너뛰며 '{' / '[' 위치마다 raw_decode,
+    3) 끝이 잘린 응답이면 닫는 괄호를 채워 한 번 더 시도
+    """
+    decoder = json.JSONDecoder()
+    candidates = [m.group(1) for m in _FENCE_RE.finditer(text)] + [text]
+    for candidate in candidates:
+        for m in re.finditer(r"[{\[]", candidate):
+            try:
+                value, _ = decoder.raw_decode(candidate, m.start())
+                return value
+            except ValueError:
+                continue
+    start = re.search(r"[{\[]", text)
+    if start is not None:
+        closed = _close_truncated(text[start.start():])
+        if closed is not None:
+            try:
+                return json.loads(closed)
+            except ValueError:
+                pass
+    raise ValueError(f"No JSON object found in reply ({len(text)} chars)")
+
+
+def validate(value: Any, schema: str) -> Dict:
+    """최상위 dict + 필수 키 / 타입 검사 (실패 시 ValueError)"""
+    if not isinstance(value, dict):
+        raise ValueError(f"Expected a JSON object, got {type(value).__name__}")
+    props = SCHEMAS[schema]["properties"]
+    for key in _REQUIRED[schema]:
+        if key not in value:
+            raise ValueError(f"Missing key: {key}")
+        expected = _TYPES[props[key]["type"]]
+        if not isinstance(value[key], expected):
+            raise ValueError(f"Key {key} should be {props[key]['type']}, got {type(value[key]).__name__}")
+    return value
+
+
+# ---------- 에이전트별 파싱 통계 ----------
+
+_stats: Dict[str, Dict[str, int]] = {}
+_stats_lock = threading.Lock()
+
+
+def record_parse(agent: str, outcome: str) -> None:
+    """
+    outcome:
+      ok        - 첫 응답을 엄격 파싱(펜스 제거 + json.loads)으로 바로 사용
+      recovered - 엄격 파싱은 실패했지만 관대한 추출로 사용
+      repaired  - 첫 응답은 못 쓰고 repair 재요청으로 복구
+      failed    - 최종 실패 (에이전트 fallback으로 넘어감 = 그동안의 호출이 헛수고가 될 수 있음)
+    """
+    with _stats_lock:
+        stats = _stats.setdefault(agent or "unknown", {"calls": 0, "ok": 0, "recovered": 0, "repaired": 0, "failed": 0})
+        stats["calls"] += 1
+        stats[outcome] += 1
+
+
+def structured_stats() -> Dict[str, Dict]:
+    """에이전트별 {calls, ok, recovered, repaired, failed, failure_rate, first_try_failure_rate}"""
+    with _stats_lock:
+        result = {agent: dict(s) for agent, s in sorted(_stats.items())}
+    for s in result.values():
+        s["failure_rate"] = s["failed"] / s["calls"] if s["calls"] else 0.0
+        # 첫 응답이 엄격 파싱을 통과하지 못한 비율 (관대한 추출로 살린 recovered 포함)
+        s["first_try_failure_rate"] = (s["recovered"] + s["repaired"] + s["failed"]) / s["calls"] if s["calls"] else 0.0
+    return result
+
+
+def reset_structured_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
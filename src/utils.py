@@ -1,27 +1,175 @@
 import os
 import re
 import json
+import time
+import atexit
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 from collections import Counter
 from dotenv import load_dotenv
 load_dotenv()
 
+from src.cache import get_llm_cache, make_cache_key, CacheMiss
+from src.metrics import current_metrics
+from src.recorder import current_recorder
+from src.scheduler import get_scheduler
+from src.backends import get_backend, peek_backend
+from src.streaming import StopPredicate
+from src.dataset import normalize_item
+
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 
-def call_llm(system_prompt: str, user_prompt: str, model: str = OPENAI_MODEL, temperature: float = 0.2) -> str:
-    """LLM 호출"""
-    from openai import OpenAI
-    client = OpenAI()
-    resp = client.chat.completions.create(
-        model=model,
-        temperature=temperature,
-        messages=[
-            {"role": "system", "content": system_prompt.strip()},
-            {"role": "user", "content": user_prompt.strip()},
-        ],
+def close_llm_client() -> None:
+    """현재 백엔드의 커넥션 풀 정리 (프로세스 종료 시 자동 호출, 백엔드를 쓴 적이 없으면 아무것도 안 함)"""
+    backend = peek_backend()
+    if backend is not None:
+        backend.close()
+
+atexit.register(close_llm_client)
+
+async def aclose_llm_client() -> None:
+    """현재 이벤트 루프의 async 커넥션 풀 정리 (루프 종료 전에 호출)"""
+    backend = peek_backend()
+    if backend is not None:
+        await backend.aclose()
+
+def call_llm(
+    system_prompt: str,
+    user_prompt: str,
+    model: str = OPENAI_MODEL,
+    temperature: float = 0.2,
+    agent: str = "",
+    response_format: Optional[Dict] = None,
+    stop_when: Optional[StopPredicate] = None
+) -> str:
+    """
+    LLM 호출 (LLM_CACHE 설정 시 디스크 캐시 우선 조회, agent 태그로 사용량 기록)
+
+    response_format: provider 구조화 출력 (src.structured.response_format), 백엔드가 지원할 때만 전달
+    stop_when: 스트리밍으로 받다가 참이 되면 끊기 (src.streaming). 잘린 응답은 trace에만 기록하고 캐시에는
+               저장하지 않음 (키에 stop_when이 없으므로 같은 요청의 전체 응답 자리를 차지하면 안 됨)
+    """
+    system_prompt, user_prompt = system_prompt.strip(), user_prompt.strip()
+
+    metrics = current_metrics()
+    cache, key, cached = _cache_lookup(system_prompt, user_prompt, model, temperature)
+    if cached is not None:
+        if metrics is not None:
+            metrics.record_call(agent, 0.0, model=model, cached=True)
+        _record_trace(agent, system_prompt, user_prompt, model, temperature, cached)
+        return cached
+
+    backend = get_backend()
+    scheduler = get_scheduler()
+    est_tokens = _estimate_tokens(system_prompt, user_prompt)
+    start = time.perf_counter()
+    completion = scheduler.call(
+        lambda: backend.complete(system_prompt, user_prompt, model, temperature, agent, response_format, stop_when),
+        est_tokens
     )
-    return resp.choices[0].message.content.strip()
+    latency = time.perf_counter() - start
+    content = completion.content.strip()
+
+    scheduler.settle(est_tokens, completion.total_tokens)
+    _record_usage(metrics, agent, completion, system_prompt, user_prompt, content, model, latency)
+    if cache is not None and not completion.truncated:
+        cache.put(key, content)
+    _record_trace(agent, system_prompt, user_prompt, model, temperature, content)
+    return content
+
+async def acall_llm(
+    system_prompt: str,
+    user_prompt: str,
+    model: str = OPENAI_MODEL,
+    temperature: float = 0.2,
+    agent: str = "",
+    response_format: Optional[Dict] = None,
+    stop_when: Optional[StopPredicate] = None
+) -> str:
+    """LLM 호출 (async 버전, call_llm과 같은 캐시 공유)"""
+    system_prompt, user_prompt = system_prompt.strip(), user_prompt.strip()
+
+    metrics = current_metrics()
+    cache, key, cached = _cache_lookup(system_prompt, user_prompt, model, temperature)
+    if cached is not None:
+        if metrics is not None:
+            metrics.record_call(agent, 0.0, model=model, cached=True)
+        _record_trace(agent, system_prompt, user_prompt, model, temperature, cached)
+        return cached
+
+    backend = get_backend()
+    scheduler = get_scheduler()
+    est_tokens = _estimate_tokens(system_prompt, user_prompt)
+    start = time.perf_counter()
+    completion = await scheduler.acall(
+        lambda: backend.acomplete(system_prompt, user_prompt, model, temperature, agent, response_format, stop_when),
+        est_tokens
+    )
+    latency = time.perf_counter() - start
+    content = completion.content.strip()
+
+    scheduler.settle(est_tokens, completion.total_tokens)
+    _record_usage(metrics, agent, completion, system_prompt, user_prompt, content, model, latency)
+    if cache is not None and not completion.truncated:
+        cache.put(key, content)
+    _record_trace(agent, system_prompt, user_prompt, model, temperature, content)
+    return content
+
+# TPM 예약용 토큰 추정 (응답 후 usage로 보정)
+LLM_EST_COMPLETION_TOKENS = int(os.getenv("LLM_EST_COMPLETION_TOKENS", "200"))
+
+def _estimate_tokens(system_prompt: str, user_prompt: str) -> int:
+    return (len(system_prompt) + len(user_prompt)) // 4 + LLM_EST_COMPLETION_TOKENS
+
+def _record_usage(metrics, agent: str, completion, system_prompt: str, user_prompt: str, content: str, model: str, latency: float) -> None:
+    """백엔드가 알려준 토큰 수 기록 (없으면 tiktoken으로 로컬 계산)"""
+    if metrics is None:
+        return
+    if completion.prompt_tokens is not None:
+        prompt_tokens, completion_tokens = completion.prompt_tokens, completion.completion_tokens or 0
+    else:
+        prompt_tokens = count_tokens(system_prompt, model) + count_tokens(user_prompt, model)
+        completion_tokens = count_tokens(content, model)
+    # cached_tokens: provider prompt cache 적중분 (usage.prompt_tokens_details.cached_tokens)
+    metrics.record_call(agent, latency, prompt_tokens, completion_tokens, model=model, cached_tokens=completion.cached_tokens)
+
+def _record_trace(agent: str, system_prompt: str, user_prompt: str, model: str, temperature: float, content: str) -> None:
+    """record_question() 블록 안이면 요청 / 응답 기록 (replay용)"""
+    recorder = current_recorder()
+    if recorder is not None:
+        recorder.record_llm(agent, system_prompt, user_prompt, model, temperature, content)
+
+def _cache_lookup(system_prompt: str, user_prompt: str, model: str, temperature: float):
+    """캐시 조회 → (cache, key, cached). replay 모드 miss면 CacheMiss"""
+    cache = get_llm_cache()
+    if cache is None:
+        return None, None, None
+    # openai 이외 백엔드(local / mock) 응답은 별도 키 공간에 저장 (실제 응답과 섞이지 않도록)
+    backend = get_backend().name
+    key = make_cache_key(system_prompt, user_prompt, model if backend == "openai" else f"{backend}:{model}", temperature)
+    cached = cache.get(key)
+    if cached is None and cache.readonly:
+        raise CacheMiss(f"Replay cache miss: {key}")
+    return cache, key, cached
+
+_encodings = {}
+
+def count_tokens(text: str, model: str = OPENAI_MODEL) -> int:
+    """tiktoken 토큰 수 (tiktoken/인코딩 파일을 못 쓰면 글자 수 / 4 근사)"""
+    enc = _encodings.get(model)
+    if enc is None:
+        try:
+            import tiktoken
+            try:
+                enc = tiktoken.encoding_for_model(model)
+            except KeyError:
+                enc = tiktoken.get_encoding("o200k_base")
+        except Exception:  # ImportError, 오프라인 환경에서 BPE 다운로드 실패 등
+            enc = False
+        _encodings[model] = enc
+    if enc is False:
+        return max(1, len(text) // 4)
+    return len(enc.encode(text))
 
 from pathlib import Path
 import json
@@ -30,7 +178,7 @@ DATASET_PATH = Path("data/hotpot_dev_distractor_v1.json")
 
 def load_hotpot_qa(path: Path = DATASET_PATH) -> List[Dict]:
     """
-    HotpotQA 데이터셋 로드
+    HotpotQA 데이터셋 로드 (전체를 메모리에 올림, 배치 실행은 src.dataset.open_hotpot_qa 사용)
     
     Returns:
         List of items, each with:
@@ -50,27 +198,8 @@ def load_hotpot_qa(path: Path = DATASET_PATH) -> List[Dict]:
     with open(path, "r", encoding="utf-8") as f:
         data = json.load(f)
     
-    items = []
-    for item in data:
-        # Context 파싱: [title, [sentences]] 형태로
-        context = []
-        for ctx in item.get("context", []):
-            if len(ctx) == 2:
-                title, sentences = ctx
-                context.append((title, sentences))
-        
-        # Supporting facts 파싱
-        supporting_facts = item.get("supporting_facts", [])
-        
-        items.append({
-            "_id": item.get("_id", ""),
-            "question": item.get("question", "").strip(),
-            "answer": item.get("answer", ""),
-            "context": context,
-            "supporting_facts": supporting_facts,
-            "type": item.get("type", ""),
-            "level": item.get("level", "")
-        })
+    # Context 파싱: [title, [sentences]] → (title, sentences)
+    items = [normalize_item(item) for item in data]
     
     print(f"[DATA] Loaded {len(items)} items")
     
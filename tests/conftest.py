@@ -0,0 +1,69 @@
+"""
+공용 fixture (네트워크 / API 키 없이 실행)
+
+- stub_server: 로컬 OpenAI 호환 Stub 서버 (scripts.stub_llm_server), 옵션은 stub_server(...)로 지정
+- backend: 프로세스 전역 LLM 백엔드 교체 후 복원
+- scheduler: 프로세스 전역 스케줄러를 테스트용 (짧은 백오프)으로 교체 후 복원
+- judge_batching: JUDGE_BATCH를 켜고 새 micro-batcher로 (질문 간 검증 호출 묶기)
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import src.backends as backends
+import src.nodes as nodes
+import src.scheduler as scheduler_module
+from src.scheduler import LLMScheduler
+from src.batching import MicroBatcher
+from scripts.stub_llm_server import StubLLMServer
+
+
+@pytest.fixture
+def stub_server():
+    servers = []
+
+    def start(**kwargs) -> StubLLMServer:
+        server = StubLLMServer(**kwargs).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def backend():
+    previous = backends._backend
+    installed = []
+
+    def install(b):
+        installed.append(b)
+        backends.set_backend(b)
+        return b
+
+    yield install
+    for b in installed:
+        b.close()
+    backends.set_backend(previous)
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    def install(**kwargs) -> LLMScheduler:
+        kwargs.setdefault("backoff_base", 0.001)
+        kwargs.setdefault("backoff_max", 0.01)
+        s = LLMScheduler(**kwargs)
+        monkeypatch.setattr(scheduler_module, "_scheduler", s)
+        return s
+
+    return install
+
+
+@pytest.fixture
+def judge_batching(monkeypatch):
+    monkeypatch.setattr(nodes, "JUDGE_BATCH", True)
+    monkeypatch.setattr(nodes, "_judge_batcher", MicroBatcher(nodes._judge_batch, max_size=8, window=0.05))
@@ -0,0 +1,180 @@
+import json
+import time
+import asyncio
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import src.nodes as nodes
+from src.backends import MockBackend, DEFAULT_RULES
+from src.batching import MicroBatcher, AsyncMicroBatcher
+from src.graph import run_question
+from src.metrics import track_question
+from src.recorder import record_question, comparable_state
+from scripts.bench_concurrency import make_dataset
+
+caller = contextvars.ContextVar("caller", default=None)
+
+
+def submit_all(batcher, items, delay=0.0):
+    """items를 스레드마다 하나씩 submit (delay 간격) → 결과 리스트"""
+    def one(item):
+        caller.set(item)
+        return batcher.submit(item)
+
+    with ThreadPoolExecutor(max_workers=len(items)) as ex:
+        futures = []
+        for item in items:
+            futures.append(ex.submit(one, item))
+            time.sleep(delay)
+        return [f.result() for f in futures]
+
+
+# ---------- MicroBatcher ----------
+
+def test_results_fan_back_in_order():
+    batches = []
+
+    def run_batch(items, contexts):
+        batches.append(list(items))
+        return [x * 10 for x in items]
+
+    batcher = MicroBatcher(run_batch, max_size=4, window=0.05)
+    assert submit_all(batcher, list(range(10))) == [x * 10 for x in range(10)]
+    assert sorted(x for batch in batches for x in batch) == list(range(10))
+    assert max(len(b) for b in batches) <= 4
+    assert batcher.stats["items"] == 10 and batcher.stats["max_batch"] > 1
+
+
+def test_batch_runs_outside_callers_context_and_fallback_uses_each_context():
+    seen = {}
+
+    def run_batch(items, contexts):
+        seen["batch"] = caller.get()
+        return [ctx.run(caller.get) for ctx in contexts]
+
+    batcher = MicroBatcher(run_batch, max_size=8, window=0.05)
+    assert submit_all(batcher, ["a", "b", "c", "d"]) == ["a", "b", "c", "d"]
+    assert seen["batch"] is None  # leader 컨텍스트가 아님
+
+
+def test_leader_returns_once_its_own_result_is_ready():
+    def run_batch(items, contexts):
+        time.sleep(0.1)
+        return items
+
+    batcher = MicroBatcher(run_batch, max_size=2, window=0.01)
+    finished = {}
+
+    def one(item):
+        start = time.perf_counter()
+        batcher.submit(item)
+        finished[item] = time.perf_counter() - start
+
+    threads = [threading.Thread(target=one, args=(i,)) for i in range(6)]
+    for t in threads:
+        t.start()
+        time.sleep(0.002)
+    for t in threads:
+        t.join()
+
+    # 첫 호출자(leader)는 첫 배치만 기다림 (이전에는 6개 / 2 = 3 배치를 모두 실행하고 나서 반환)
+    assert finished[0] < 0.2
+    assert max(finished.values()) >= 0.25
+    assert batcher.stats["batches"] == 3
+
+
+def test_batch_exception_reaches_every_caller():
+    def run_batch(items, contexts):
+        raise RuntimeError("boom")
+
+    batcher = MicroBatcher(run_batch, max_size=4, window=0.01)
+    with pytest.raises(RuntimeError):
+        submit_all(batcher, [1, 2])
+
+
+# ---------- AsyncMicroBatcher ----------
+
+def test_async_results_and_contexts():
+    async def arun_batch(items, contexts):
+        assert caller.get() is None
+        return [ctx.run(caller.get) for ctx in contexts]
+
+    batcher = AsyncMicroBatcher(arun_batch, max_size=3, window=0.02)
+
+    async def one(item):
+        caller.set(item)
+        return await batcher.submit(item)
+
+    async def main():
+        return await asyncio.gather(*(one(i) for i in range(7)))
+
+    assert asyncio.run(main()) == list(range(7))
+    assert batcher.stats["batches"] == 3
+    assert not batcher._tasks
+
+
+def test_size_flush_cancels_stale_window_timer():
+    flushed_at = []
+
+    async def arun_batch(items, contexts):
+        flushed_at.append((list(items), time.perf_counter()))
+        return items
+
+    batcher = AsyncMicroBatcher(arun_batch, max_size=2, window=0.2)
+
+    async def main():
+        start = time.perf_counter()
+        first = asyncio.gather(batcher.submit("a"), batcher.submit("b"))  # 크기로 바로 flush
+        await asyncio.sleep(0.05)
+        third = await batcher.submit("c")  # 자기 window(0.2초)가 끝나야 flush
+        await first
+        return start, third
+
+    start, third = asyncio.run(main())
+    assert third == "c"
+    (_, t_ab), (batch_c, t_c) = flushed_at
+    assert batch_c == ["c"]
+    assert t_ab - start < 0.1
+    assert t_c - start >= 0.24  # 이전 타이머(0.2초)가 남아 있으면 0.2초에 flush
+
+
+# ---------- Judge batching across questions ----------
+
+def test_batched_judge_usage_and_traces_stay_per_question(backend, judge_batching, capsys):
+    batch_calls = []
+
+    def judge_batch(s, u):
+        batch_calls.append(u)
+        return DEFAULT_RULES["judge_batch"](s, u)
+
+    backend(MockBackend(rules={"judge_batch": judge_batch}, latency="uniform:0.001,0.01"))
+    dataset = make_dataset(6)
+
+    def one(item):
+        with track_question() as qm, record_question(item["question"], item["context"]) as rec:
+            rec.record_final(run_question(item["question"], item["context"]))
+        return qm, rec
+
+    with ThreadPoolExecutor(max_workers=6) as ex:
+        runs = list(ex.map(one, dataset))
+
+    assert nodes._judge_batcher.stats["max_batch"] > 1
+    # 배치 호출은 한 질문에만 1회로 세고 토큰은 나눠 기록 (호출 수 / 토큰 모두 정수, 합 = 실제 배치 호출)
+    shared = [qm.by_agent.get("judge_batch", {}) for qm, _ in runs]
+    assert sum(u.get("calls", 0) for u in shared) == len(batch_calls)
+    assert all(isinstance(u[k], int) for u in shared if u for k in ("calls", "cache_hits", "prompt_tokens"))
+    assert all(isinstance(qm.llm_calls, int) for qm, _ in runs)
+    for (qm, rec), item in zip(runs, dataset):
+        # 다른 질문의 요청이 섞이지 않음 (배치 프롬프트 대신 자기 단건 판정만)
+        assert all(r["agent"] != "judge_batch" for r in rec.llm)
+        assert any(r["agent"] == "judge" for r in rec.llm)
+        assert all(item["question"] in r["user_prompt"] for r in rec.llm if r["agent"] == "planner")
+
+    # 기록만으로 질문 하나씩 replay → 같은 최종 state
+    responses = {r["key"]: r["response"] for _, rec in runs for r in rec.llm}
+    backend(MockBackend(replay=responses, strict=True))
+    for (_, rec), item in zip(runs, dataset):
+        assert comparable_state(run_question(item["question"], item["context"])) == rec.final
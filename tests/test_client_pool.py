@@ -0,0 +1,58 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import src.backends as backends
+from src.backends import OpenAIBackend
+from src.utils import call_llm, acall_llm, close_llm_client, aclose_llm_client
+
+
+def test_sync_calls_reuse_pooled_connections(stub_server, backend, scheduler):
+    server = stub_server(reply="yes")
+    b = backend(OpenAIBackend(base_url=server.base_url, api_key="stub"))
+    scheduler()
+
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        replies = list(ex.map(lambda i: call_llm("sys", f"q{i}"), range(40)))
+
+    assert replies == ["yes"] * 40
+    assert server.stats["requests"] == 40
+    assert server.stats["connections"] <= 4  # 스레드 수 이하 (요청마다 새 커넥션이면 40)
+    assert b.client() is b.client()
+
+
+def test_close_drops_pool_and_reconnects(stub_server, backend, scheduler):
+    server = stub_server(reply="yes")
+    b = backend(OpenAIBackend(base_url=server.base_url, api_key="stub"))
+    scheduler()
+
+    call_llm("sys", "first")
+    b.close()
+    call_llm("sys", "second")
+
+    assert server.stats["connections"] == 2
+
+
+def test_async_calls_share_one_client_per_loop(stub_server, backend, scheduler):
+    server = stub_server(reply="yes")
+    b = backend(OpenAIBackend(base_url=server.base_url, api_key="stub"))
+    scheduler()
+
+    async def main():
+        replies = []
+        for batch in range(4):
+            replies += await asyncio.gather(*(acall_llm("sys", f"q{batch}-{i}") for i in range(5)))
+        client = b.async_client()
+        await b.aclose()
+        return replies, client
+
+    replies, client = asyncio.run(main())
+    assert replies == ["yes"] * 20
+    assert server.stats["connections"] <= 5
+    assert client is not None
+
+
+def test_close_without_backend_does_not_create_one(monkeypatch):
+    monkeypatch.setattr(backends, "_backend", None)
+    close_llm_client()
+    asyncio.run(aclose_llm_client())
+    assert backends.peek_backend() is None
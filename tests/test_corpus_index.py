@@ -0,0 +1,70 @@
+import json
+import asyncio
+import threading
+
+import pytest
+
+import src.corpus_index as corpus_index
+import src.nodes as nodes
+from src.backends import MockBackend
+from src.corpus_index import CorpusIndex, build_corpus_index, iter_corpus
+from src.graph import arun_question
+
+PARAGRAPHS = [
+    {"title": "Paris", "text": ["Paris is the capital and largest city of France."]},
+    {"title": "Lyon", "text": ["Lyon is a city in France on the Rhone."]},
+    {"title": "Berlin", "text": ["Berlin is the capital of Germany."]},
+]
+
+
+@pytest.fixture
+def corpus(tmp_path, capsys):
+    """같은 3개 문단이 세 번 들어 있는 덤프로 만든 인덱스"""
+    dump = tmp_path / "abstracts.jsonl"
+    dump.write_text("".join(json.dumps(p) + "\n" for p in PARAGRAPHS * 3))
+    build_corpus_index(iter_corpus([dump]), tmp_path / "index", shard_size=4)
+    index = CorpusIndex(tmp_path / "index")
+    yield index
+    index.close()
+
+
+def test_search_returns_each_title_once(corpus):
+    hits = corpus.search("capital city of France", k=3)
+    assert [hit["title"] for hit in hits] == ["Paris", "Lyon", "Berlin"]
+    hits = corpus.search("capital city of France", k=3, exclude_titles=["Paris"])
+    assert sorted(hit["title"] for hit in hits) == ["Berlin", "Lyon"]
+
+
+def test_iter_corpus_dedupes_across_dataset_files(tmp_path, capsys):
+    context = [[p["title"], p["text"]] for p in PARAGRAPHS]
+    paths = []
+    for split in ("train", "dev"):
+        path = tmp_path / split / "hotpot.json"
+        path.parent.mkdir()
+        path.write_text(json.dumps([
+            {"_id": f"{split}{i}", "question": "q", "answer": "a", "type": "bridge", "level": "easy",
+             "supporting_facts": [], "context": context}
+            for i in range(2)
+        ]))
+        paths.append(path)
+
+    assert [title for title, _ in iter_corpus(paths)] == ["Paris", "Lyon", "Berlin"]
+
+
+def test_async_open_domain_search_runs_off_loop_with_hybrid(corpus, backend, monkeypatch, capsys):
+    calls = []
+    search = corpus.search
+
+    def recording_search(*args, **kwargs):
+        calls.append((threading.current_thread() is threading.main_thread(), kwargs["hybrid"]))
+        return search(*args, **kwargs)
+
+    monkeypatch.setattr(corpus, "search", recording_search)
+    monkeypatch.setattr(nodes, "get_corpus_index", lambda: corpus)
+    monkeypatch.setattr(corpus_index, "OPEN_DOMAIN", "on")
+    monkeypatch.setattr(nodes, "SEARCHER_MODE", "dense")
+    backend(MockBackend())
+
+    asyncio.run(arun_question("Which city is the capital of France?", []))
+
+    assert calls and all(not on_loop_thread and hybrid for on_loop_thread, hybrid in calls)
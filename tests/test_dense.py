@@ -0,0 +1,95 @@
+import time
+import asyncio
+import threading
+import zlib
+
+import numpy as np
+
+import src.nodes as nodes
+from src.backends import MockBackend
+from src.dense import DenseEncoder, DenseIndex
+from src.graph import arun_question
+from src.metrics import track_question
+from scripts.bench_concurrency import make_dataset
+
+CONTEXT = [
+    ("Paris", ["Paris is the capital of France."]),
+    ("Berlin", ["Berlin is the capital of Germany."]),
+    ("Rome", ["Rome is the capital of Italy."]),
+]
+
+
+class SlowEncoder(DenseEncoder):
+    """sentence-transformers 대신 단어 해시 bag-of-words (모델 forward처럼 스레드를 잡고 있음)"""
+
+    def encode(self, texts):
+        time.sleep(0.05)
+        vectors = np.zeros((len(texts), 509), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().replace(".", " ").split():
+                vectors[row, zlib.crc32(word.encode()) % 509] += 1.0
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        self._record_encode(len(texts), 0.05)
+        return vectors
+
+
+def test_arank_matches_rank():
+    encoder = SlowEncoder(window=0.001)
+    sync_ranked = DenseIndex(CONTEXT, encoder).rank("capital of Italy")
+    async_ranked = asyncio.run(DenseIndex(CONTEXT, encoder).arank("capital of Italy"))
+    assert async_ranked == sync_ranked
+    assert CONTEXT[sync_ranked[0][0]][0] == "Rome"
+
+
+def test_arank_keeps_event_loop_responsive_and_batches_questions():
+    encoder = SlowEncoder(window=0.01)
+
+    async def heartbeat(ticks, stop):
+        while not stop.is_set():
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.005)
+
+    async def main():
+        ticks, stop = [], asyncio.Event()
+        beat = asyncio.create_task(heartbeat(ticks, stop))
+        indexes = [DenseIndex(CONTEXT, encoder) for _ in range(4)]
+        ranked = await asyncio.gather(*(index.arank("capital of Germany") for index in indexes))
+        stop.set()
+        await beat
+        return ranked, ticks
+
+    ranked, ticks = asyncio.run(main())
+    assert all(CONTEXT[r[0][0]][0] == "Berlin" for r in ranked)
+    # 질문 4개가 인코더 호출 1회로 묶이고, 인코딩(50ms) 동안에도 루프가 계속 돎
+    assert encoder.stats["calls"] == 1 and encoder._abatcher.stats["max_batch"] == 4
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.04
+
+
+def test_async_dense_searcher_uses_arank(backend, monkeypatch, capsys):
+    encoder = SlowEncoder(window=0.001)
+    monkeypatch.setattr(nodes, "SEARCHER_MODE", "dense")
+    monkeypatch.setattr(nodes, "get_dense_encoder", lambda: encoder)
+    backend(MockBackend())
+    item = make_dataset(1)[0]
+
+    with track_question() as qm:
+        final = asyncio.run(arun_question(item["question"], item["context"]))
+
+    assert final["answer"] == "1970"
+    assert encoder._abatcher.stats["items"] > 0 and encoder._batcher.stats["items"] == 0
+    assert "rank" in qm.span_latencies("work")
+
+
+def test_encoder_stats_are_exact_under_concurrent_encodes():
+    encoder = DenseEncoder()
+
+    def record():
+        for _ in range(5_000):
+            encoder._record_encode(2, 0.0)
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert encoder.stats_snapshot()["calls"] == 40_000 and encoder.stats_snapshot()["texts"] == 80_000
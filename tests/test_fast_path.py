@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+import src.nodes as nodes
+from src.backends import MockBackend
+from scripts.bench_concurrency import make_dataset
+
+
+def run_fast_path(backend, evidence):
+    judged = []
+
+    def judge(s, u):
+        judged.append(u)
+        return "yes"
+
+    reply = json.dumps({"answer": "1970", "confidence": 0.9, "evidence": evidence})
+    backend(MockBackend(rules={"fast_path": lambda s, u: reply, "judge": judge}))
+    item = make_dataset(1)[0]
+    state = nodes.node_fast_path({"question": item["question"], "hotpot_context": item["context"]})
+    return state["fast_path"], judged
+
+
+@pytest.fixture(autouse=True)
+def fast_path_on(monkeypatch):
+    monkeypatch.setattr(nodes, "FAST_PATH", "on")
+
+
+@pytest.mark.parametrize("evidence", [[[0, 0]], [[-1, 0]], [[1, -1]], [[4, 0]], [[1, 4]]])
+def test_out_of_range_citations_are_not_evidence(backend, capsys, evidence):
+    result, judged = run_fast_path(backend, evidence)
+    assert not result["hit"] and not judged
+    assert "Invalid citation" in capsys.readouterr().out
+
+
+def test_valid_citation_is_kept_next_to_invalid_ones(backend, capsys):
+    result, judged = run_fast_path(backend, [[0, 0], [-1, -1], [1, 2]])
+    assert result["hit"]
+    docs = result["docs"]
+    # 유효한 [1, 2]만 근거로 검증 (0 / -1이 마지막 문서·문장으로 감기지 않음)
+    assert len(judged) == 1
+    assert f"[{docs[0]}]" in judged[0] and f"[{docs[-1]}]" not in judged[0]
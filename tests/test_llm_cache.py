@@ -0,0 +1,104 @@
+import asyncio
+import itertools
+from types import SimpleNamespace
+
+import pytest
+
+import src.cache as cache_module
+from src.backends import MockBackend, OpenAIBackend
+from src.cache import LLMCache, CacheMiss
+from src.streaming import first_yes_no
+from src.utils import call_llm, acall_llm
+
+REPLY = "yes, the documents name the birth year."
+
+
+@pytest.fixture
+def llm_cache(monkeypatch, tmp_path):
+    cache = LLMCache(path=tmp_path / "llm_cache.sqlite")
+    monkeypatch.setattr(cache_module, "LLM_CACHE", "on")
+    monkeypatch.setattr(cache_module, "_cache", cache)
+    yield cache
+    cache.close()
+
+
+def test_hit_miss_counters(llm_cache):
+    assert llm_cache.get("k") is None
+    llm_cache.put("k", "v")
+    assert llm_cache.get("k") == "v"
+    stats = llm_cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"], stats["entries"]) == (1, 1, 0.5, 1)
+
+
+def test_evicts_least_recently_used_under_size_limit(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(time=itertools.count().__next__))
+    path = tmp_path / "llm_cache.sqlite"
+    cache = LLMCache(path=path, max_mb=1000 / 1024 / 1024)
+    for i in range(4):
+        cache.put(f"k{i}", "x" * 200)
+    for i in range(4, 8):
+        cache.get("k0")  # 계속 사용 → 남아야 함
+        cache.put(f"k{i}", "x" * 200)
+
+    assert cache.stats()["size_bytes"] <= 1000
+    assert cache.get("k0") is not None and cache.get("k7") is not None
+    assert cache.get("k1") is None
+    cache.close()
+
+    # 다시 열면 저장된 총 크기부터 이어서 셈
+    reopened = LLMCache(path=path, max_mb=1000 / 1024 / 1024)
+    reopened.put("k8", "x" * 200)
+    assert reopened.stats()["size_bytes"] <= 1000
+    reopened.close()
+
+
+def test_replay_mode_serves_hits_and_raises_on_miss(backend, monkeypatch, tmp_path):
+    path = tmp_path / "llm_cache.sqlite"
+    writer = LLMCache(path=path)
+    monkeypatch.setattr(cache_module, "LLM_CACHE", "on")
+    monkeypatch.setattr(cache_module, "_cache", writer)
+    backend(MockBackend(rules={"judge": lambda s, u: REPLY}))
+    call_llm("sys", "recorded", agent="judge")
+    writer.close()
+
+    replay = LLMCache(path=path, readonly=True)
+    monkeypatch.setattr(cache_module, "LLM_CACHE", "replay")
+    monkeypatch.setattr(cache_module, "_cache", replay)
+    mock = backend(MockBackend(strict=True))
+
+    assert call_llm("sys", "recorded", agent="judge") == REPLY
+    with pytest.raises(CacheMiss):
+        call_llm("sys", "not recorded", agent="judge")
+    assert mock.stats["calls"] == 0
+    replay.close()
+
+
+def test_truncated_reply_is_not_cached(backend, llm_cache):
+    mock = backend(MockBackend(rules={"judge": lambda s, u: REPLY}))
+
+    assert call_llm("sys", "q", agent="judge", stop_when=first_yes_no) == "yes,"
+    assert llm_cache.stats()["entries"] == 0
+    # 같은 키의 전체 응답 요청은 잘린 응답이 아니라 전체 응답을 받음
+    assert call_llm("sys", "q", agent="judge") == REPLY
+    assert call_llm("sys", "q", agent="judge") == REPLY
+    assert mock.stats["calls"] == 2 and llm_cache.stats()["entries"] == 1
+
+
+def test_async_truncated_reply_is_not_cached(backend, llm_cache):
+    backend(MockBackend(rules={"judge": lambda s, u: REPLY}))
+
+    async def main():
+        truncated = await acall_llm("sys", "q", agent="judge", stop_when=first_yes_no)
+        return truncated, await acall_llm("sys", "q", agent="judge")
+
+    assert asyncio.run(main()) == ("yes,", REPLY)
+
+
+def test_streamed_early_stop_is_not_cached(stub_server, backend, scheduler, llm_cache):
+    server = stub_server(reply=REPLY)
+    backend(OpenAIBackend(base_url=server.base_url, api_key="stub"))
+    scheduler()
+
+    assert call_llm("sys", "q", stop_when=first_yes_no).startswith("yes")
+    assert llm_cache.stats()["entries"] == 0
+    assert call_llm("sys", "q") == REPLY
@@ -0,0 +1,77 @@
+import json
+import asyncio
+
+import pytest
+
+import src.nodes as nodes
+from src.backends import MockBackend
+from src.graph import run_question, arun_question
+from scripts.bench_concurrency import make_dataset
+
+INDEPENDENT_PLAN = json.dumps({"plan": ["Find the birth year of Alice.", "Find the birth year of Bob."]})
+
+
+def independent_steps_backend(replans: list = None, **rules) -> MockBackend:
+    """두 step이 서로 독립인 계획 (재계획해도 같은 계획), replans에 재계획 호출마다 하나씩 추가"""
+    def replanner(s, u):
+        if replans is not None:
+            replans.append(u)
+        return INDEPENDENT_PLAN
+
+    return MockBackend(rules={"planner": lambda s, u: INDEPENDENT_PLAN, "replanner": replanner, **rules})
+
+
+def never_sufficient() -> dict:
+    return {
+        "judge": lambda s, u: '{"sufficient": false, "answer": ""}' if '"sufficient"' in u else "no",
+        "judge_batch": lambda s, u: json.dumps({"verdicts": ["no"] * u.count("### Item ")}),
+    }
+
+
+def run(parallel: bool, use_async: bool = False):
+    item = make_dataset(1)[0]
+    item["context"] = item["context"][:2]  # 문서가 적어야 step이 막혔을 때 빨리 재계획
+    nodes.PARALLEL_STEPS = parallel
+    if use_async:
+        return asyncio.run(arun_question(item["question"], item["context"]))
+    return run_question(item["question"], item["context"])
+
+
+@pytest.fixture(autouse=True)
+def restore_parallel_steps():
+    saved = nodes.PARALLEL_STEPS
+    yield
+    nodes.PARALLEL_STEPS = saved
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_parallel_steps_are_cleared_after_merge(backend, capsys, use_async):
+    backend(independent_steps_backend())
+    final = run(parallel=True, use_async=use_async)
+
+    assert not final.get("parallel_steps")
+    assert [a["step_idx"] for a in final["step_answers"]] == [0, 1]
+    assert "parallel" in capsys.readouterr().out.lower()
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_parallel_and_sequential_use_same_replan_budget(backend, capsys, use_async):
+    sequential, parallel = [], []
+    backend(independent_steps_backend(sequential, **never_sufficient()))
+    seq_final = run(parallel=False, use_async=use_async)
+
+    backend(independent_steps_backend(parallel, **never_sufficient()))
+    par_final = run(parallel=True, use_async=use_async)
+
+    assert len(sequential) == 2  # MAX_REPLANS만큼 재계획 후 한계 도달
+    assert len(parallel) == len(sequential)
+    assert par_final["replan_count"] == seq_final["replan_count"]
+
+
+def test_parallel_runs_again_after_replan(backend, capsys):
+    backend(independent_steps_backend(**never_sufficient()))
+    run(parallel=True)
+
+    out = capsys.readouterr().out
+    # 첫 계획과 재계획된 계획 모두 병렬로 시작해야 함
+    assert out.count("→ parallel") >= 2
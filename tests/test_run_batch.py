@@ -0,0 +1,85 @@
+import random
+import asyncio
+
+import src.nodes as nodes
+from src.backends import MockBackend
+from src.graph import run_question
+from src.metrics import aggregate_by_agent
+from scripts.bench_concurrency import make_dataset
+from scripts.run_batch import run_samples, arun_samples, _print_usage_by_agent
+
+
+def shuffled_indices(n: int):
+    idxs = list(range(n))
+    random.Random(7).shuffle(idxs)
+    return idxs
+
+
+def test_concurrent_results_arrive_in_index_order(backend, capsys):
+    backend(MockBackend(latency="uniform:0.001,0.02"))
+    dataset = make_dataset(12)
+    idxs = shuffled_indices(12)
+
+    calls = []
+    run_samples(dataset, idxs, lambda k, info: calls.append((k, info)), num_workers=4)
+
+    assert [k for k, _ in calls] == list(range(1, 13))
+    assert [info["index"] for _, info in calls] == idxs
+    assert all(info["predicted"] == "1970" and info["em"] == 1 for _, info in calls)
+
+
+def test_async_results_arrive_in_index_order(backend, capsys):
+    backend(MockBackend(latency="uniform:0.001,0.02"))
+    dataset = make_dataset(12)
+    idxs = shuffled_indices(12)
+
+    calls = []
+    asyncio.run(arun_samples(dataset, idxs, lambda k, info: calls.append((k, info)), concurrency=4))
+
+    assert [k for k, _ in calls] == list(range(1, 13))
+    assert [info["index"] for _, info in calls] == idxs
+
+
+def test_failed_sample_keeps_its_slot(backend, capsys):
+    backend(MockBackend(latency="uniform:0.001,0.01"))
+    dataset = make_dataset(6)
+
+    def run_fn(question, context):
+        if question.endswith("film 2 born?"):
+            raise RuntimeError("boom")
+        return run_question(question, context)
+
+    calls = []
+    run_samples(dataset, list(range(6)), lambda k, info: calls.append(info), num_workers=3, run_fn=run_fn)
+
+    assert [info["index"] for info in calls] == list(range(6))
+    assert "error" in calls[2] and calls[2]["f1"] == 0.0
+    assert all("error" not in info for i, info in enumerate(calls) if i != 2)
+
+
+def test_sequential_and_concurrent_runs_agree(backend, capsys):
+    backend(MockBackend(latency="uniform:0.001,0.01"))
+    dataset = make_dataset(6)
+    idxs = list(range(6))
+
+    def collect(**kwargs):
+        out = []
+        run_samples(dataset, idxs, lambda k, info: out.append((info["predicted"], info["plan"])), **kwargs)
+        return out
+
+    assert collect(num_workers=1) == collect(num_workers=6)
+
+
+def test_judge_batching_keeps_usage_counts_integral(backend, judge_batching, capsys):
+    mock = backend(MockBackend(latency="uniform:0.001,0.01"))
+    dataset = make_dataset(12)
+
+    infos = []
+    run_samples(dataset, list(range(12)), lambda k, info: infos.append(info), num_workers=6)
+
+    assert nodes._judge_batcher.stats["max_batch"] > 1
+    assert all(isinstance(info["llm_calls"], int) for info in infos)
+    usage = aggregate_by_agent(infos)
+    assert sum(u["calls"] for u in usage.values()) == mock.stats["calls"]
+    _print_usage_by_agent(usage, sum(u["cost"] for u in usage.values()))  # 정수 포맷 (:5d) 그대로 출력됨
+    assert "judge_batch" in capsys.readouterr().out
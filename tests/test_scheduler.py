@@ -0,0 +1,99 @@
+import time
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.backends import OpenAIBackend
+from src.scheduler import LLMScheduler, is_retryable, retry_after_seconds
+from src.utils import call_llm
+
+
+class FakeHTTPError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+def failing(n_failures, error):
+    """처음 n_failures번은 error, 그 다음부터 "ok" (호출 수는 calls[0])"""
+    calls = [0]
+
+    def fn():
+        calls[0] += 1
+        if calls[0] <= n_failures:
+            raise error
+        return "ok"
+    return fn, calls
+
+
+def test_retries_rate_limited_calls_until_success():
+    s = LLMScheduler(backoff_base=0.001, backoff_max=0.01)
+    fn, calls = failing(3, FakeHTTPError(429))
+    assert s.call(fn) == "ok"
+    stats = s.stats()
+    assert calls[0] == 4
+    assert (stats["attempts"], stats["retries"], stats["rate_limited"], stats["requests"]) == (4, 3, 3, 1)
+    assert stats["queued"] == 0 and stats["in_flight"] == 0
+
+
+def test_gives_up_after_max_retries():
+    s = LLMScheduler(max_retries=2, backoff_base=0.001, backoff_max=0.01)
+    fn, calls = failing(10, FakeHTTPError(503))
+    with pytest.raises(FakeHTTPError):
+        s.call(fn)
+    assert calls[0] == 3
+    assert s.stats()["failed"] == 1
+
+
+def test_non_retryable_error_is_raised_immediately():
+    s = LLMScheduler(backoff_base=0.001)
+    fn, calls = failing(1, FakeHTTPError(400))
+    with pytest.raises(FakeHTTPError):
+        s.call(fn)
+    assert calls[0] == 1
+    assert s.stats()["retries"] == 0
+
+
+def test_retry_after_header_sets_minimum_backoff():
+    s = LLMScheduler(backoff_base=0.001, backoff_max=0.001)
+    fn, _ = failing(1, FakeHTTPError(429, {"retry-after": "0.2"}))
+    start = time.perf_counter()
+    s.call(fn)
+    assert time.perf_counter() - start >= 0.2
+    assert retry_after_seconds(FakeHTTPError(429, {"retry-after-ms": "1500"})) == 1.5
+    assert is_retryable(TimeoutError()) and not is_retryable(ValueError())
+
+
+def test_failed_attempts_release_tpm_reservation():
+    s = LLMScheduler(tpm=60_000, backoff_base=0.001, backoff_max=0.01)
+    fn, _ = failing(5, FakeHTTPError(429))
+    s.call(fn, est_tokens=5_000)
+    # 성공한 1회분만 예약된 채 남아야 함 (실패 5회분까지 남으면 60000 - 30000)
+    assert s.tokens.level == pytest.approx(55_000, abs=500)
+
+
+def test_async_retries_and_releases_reservation():
+    s = LLMScheduler(tpm=60_000, backoff_base=0.001, backoff_max=0.01)
+    fn, calls = failing(2, FakeHTTPError(429))
+
+    async def afn():
+        return fn()
+
+    assert asyncio.run(s.acall(afn, est_tokens=5_000)) == "ok"
+    assert calls[0] == 3
+    assert s.tokens.level == pytest.approx(55_000, abs=500)
+
+
+def test_call_llm_recovers_from_injected_429s(stub_server, backend, scheduler):
+    server = stub_server(reply="yes", error_rate=0.5, retry_after=0.01)
+    backend(OpenAIBackend(base_url=server.base_url, api_key="stub"))
+    s = scheduler(max_retries=20)
+
+    replies = [call_llm("sys", f"question {i}") for i in range(10)]
+
+    assert replies == ["yes"] * 10
+    assert server.stats["errors"] > 0
+    assert s.stats()["rate_limited"] == server.stats["errors"]
+    assert server.stats["requests"] == 10 + server.stats["errors"]